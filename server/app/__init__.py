@@ -1,8 +1,14 @@
+import threading
 from flask import Flask
 from .extensions import db, jwt, mail, cloudinary_client, mongo_client, migrate, cors, bcrypt, oauth, limiter, socketio
 from .models import *
 from .routes import auth, admin_routes, candidate_routes, ai_routes, mfa_routes, sso_routes, analytics_routes, chat_routes, offer_routes  # import sso_routes
 from .websocket_handler import register_websocket_handlers
+from .services.analysis_queue import analysis_queue
+from .commands import register_commands
+from .services.candidate_index import register_candidate_index_hooks
+from .services.leaderboard import register_leaderboard_hooks
+from .services.rollups import register_rollup_hooks
 
 def create_app():
     app = Flask(__name__)
@@ -17,11 +23,13 @@ def create_app():
     cloudinary_client.init_app(app)
     migrate.init_app(app, db)
     limiter.init_app(app)
+    analysis_queue.init_app(app)
     socketio.init_app(
         app,
         cors_allowed_origins="*",
         async_mode='eventlet',  # or 'gevent' depending on your setup
         manage_session=False,
+        message_queue=app.config.get("SOCKETIO_MESSAGE_QUEUE"),
         ping_timeout=60,
         ping_interval=25
     )
@@ -50,4 +58,17 @@ def create_app():
     # ---------------- Register WebSocket Handlers ----------------
     register_websocket_handlers(app)
 
+    # ---------------- Register CLI Commands ----------------
+    register_commands(app)
+
+    # ---------------- Candidate Embedding Index ----------------
+    register_candidate_index_hooks(db.session)
+    register_leaderboard_hooks(db.session)
+    register_rollup_hooks(db.session)
+
+    # ---------------- Warm Up NLP Models ----------------
+    if app.config.get("MODEL_WARMUP_ON_STARTUP"):
+        from .services.model_registry import model_registry
+        threading.Thread(target=model_registry.warm_up, name="model-warmup", daemon=True).start()
+
     return app
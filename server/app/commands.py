@@ -0,0 +1,79 @@
+# app/commands.py
+"""
+Flask CLI commands (`flask <command>`).
+"""
+import click
+
+
+def register_commands(app):
+    """Attach project CLI commands to the Flask app."""
+
+    @app.cli.command("analysis-worker")
+    def analysis_worker():
+        """Consume resume analysis jobs (requires the sqlite or redis queue backend)."""
+        from app.services.analysis_queue import analysis_queue
+
+        backend = app.config.get("ANALYSIS_QUEUE_BACKEND", "memory")
+        if backend == "memory":
+            raise click.ClickException(
+                "The memory queue backend is per-process; set ANALYSIS_QUEUE_BACKEND to sqlite or redis."
+            )
+
+        click.echo(f"Analysis worker started ({backend} backend). Press Ctrl+C to stop.")
+        try:
+            analysis_queue.run_worker()
+        except KeyboardInterrupt:
+            click.echo("Analysis worker stopped.")
+
+    @app.cli.command("backfill-job-embeddings")
+    @click.option("--batch-size", default=64, show_default=True, help="Requisitions encoded per batch.")
+    @click.option("--force", is_flag=True, help="Recompute embeddings that are already current.")
+    def backfill_job_embeddings(batch_size, force):
+        """Compute stored description embeddings for requisitions missing one."""
+        from app.services.embedding_service import backfill_job_embeddings as backfill
+
+        try:
+            updated = backfill(batch_size=batch_size, force=force)
+        except RuntimeError as e:
+            raise click.ClickException(str(e))
+        click.echo(f"Updated embeddings for {updated} requisition(s).")
+
+    @app.cli.command("build-candidate-index")
+    @click.option("--batch-size", default=64, show_default=True, help="CVs encoded per batch.")
+    def build_candidate_index(batch_size):
+        """Rebuild the candidate CV embedding index from Candidate.cv_text."""
+        from app.services.candidate_index import candidate_index
+        from app.services.model_registry import get_embedding_model
+
+        if get_embedding_model() is None:
+            raise click.ClickException("Embedding model is not available")
+        indexed = candidate_index.rebuild(batch_size=batch_size)
+        click.echo(f"Indexed {indexed} candidate CV(s) in {candidate_index.directory}.")
+
+    @app.cli.command("export-embedding-onnx")
+    @click.option("--no-quantize", is_flag=True, help="Skip the int8 quantized copy.")
+    @click.option("--output", default=None, help="Export root (default: EMBEDDING_ONNX_DIR).")
+    def export_embedding_onnx(no_quantize, output):
+        """Export EMBEDDING_MODEL to ONNX for EMBEDDING_BACKEND=onnx (needs torch + transformers)."""
+        from app.services.model_registry import EMBEDDING_MODEL
+        from app.services.onnx_embedding import EMBEDDING_ONNX_DIR, export_onnx
+
+        try:
+            model_dir = export_onnx(EMBEDDING_MODEL, root=output or EMBEDDING_ONNX_DIR, quantize=not no_quantize)
+        except ImportError as e:
+            raise click.ClickException(f"Export needs torch, transformers and onnxruntime: {e}")
+        click.echo(f"Exported {EMBEDDING_MODEL} to {model_dir}.")
+
+    @app.cli.command("rebuild-rollups")
+    @click.option("--days", type=int, default=None, help="Only rebuild the last N days (default: everything).")
+    @click.option("--requisition-id", type=int, default=None, help="Only rebuild one requisition's rollups.")
+    def rebuild_rollups(days, requisition_id):
+        """Backfill or recompute the daily analytics rollup tables from the source tables."""
+        from datetime import datetime, timedelta
+        from app.extensions import db
+        from app.services.rollups import rebuild_rollups as rebuild
+
+        start = (datetime.utcnow() - timedelta(days=days)).date() if days else None
+        written = rebuild(start=start, requisition_id=requisition_id)
+        db.session.commit()
+        click.echo("Rebuilt rollups: " + ", ".join(f"{rows} {table} row(s)" for table, rows in written.items()) + ".")
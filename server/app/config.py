@@ -45,6 +45,19 @@ class Config:
     # CV Processing
     CV_UPLOAD_FOLDER = os.getenv('CV_UPLOAD_FOLDER', 'uploads/cvs')
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB max file size
+
+    # NLP / embedding models (loaded once per worker by the model registry)
+    MODEL_WARMUP_ON_STARTUP = os.getenv('MODEL_WARMUP_ON_STARTUP', 'False').lower() == 'true'
+
+    # Resume analysis job queue: memory | sqlite | redis
+    ANALYSIS_QUEUE_BACKEND = os.getenv('ANALYSIS_QUEUE_BACKEND', 'memory')
+    ANALYSIS_QUEUE_URL = os.getenv('ANALYSIS_QUEUE_URL')  # SQLite file path or Redis URL
+    ANALYSIS_QUEUE_WORKERS = int(os.getenv('ANALYSIS_QUEUE_WORKERS', 2))  # in-process workers, 0 = external only
+    ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv('ANALYSIS_JOB_MAX_ATTEMPTS', 3))
+    ANALYSIS_JOB_RETRY_DELAY = int(os.getenv('ANALYSIS_JOB_RETRY_DELAY', 5))  # seconds, doubled per retry
+
+    # Socket.IO message queue so worker processes can push to connected clients
+    SOCKETIO_MESSAGE_QUEUE = os.getenv('SOCKETIO_MESSAGE_QUEUE')
     
     # Frontend URL
     FRONTEND_URL = os.getenv('FRONTEND_URL')
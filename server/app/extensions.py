@@ -5,10 +5,8 @@ from flask_jwt_extended import JWTManager
 from flask_mail import Mail
 from flask_migrate import Migrate
 from flask_cors import CORS
-from pymongo import MongoClient
 from authlib.integrations.flask_client import OAuth  # <-- updated
-import redis
-import firebase_admin
+import threading
 from flask_socketio import SocketIO
 from flask_bcrypt import Bcrypt
 from flask_socketio import SocketIO
@@ -50,19 +48,56 @@ cloudinary_client = CloudinaryClient()
 
 
 limiter = Limiter(key_func=get_remote_address)
-# ------------------- MongoDB Client -------------------
-mongo_client = MongoClient('mongodb://localhost:27017/')
-mongo_db = mongo_client['recruitment_cv']
+# ------------------- Lazy Network Clients -------------------
+class LazyClient:
+    """
+    Proxy that builds a client (and imports its driver) on first attribute or
+    item access, so importing the app opens no connections and pays no import
+    cost for drivers a worker never uses.
+    """
 
+    def __init__(self, factory):
+        self._factory = factory
+        self._client = None
+        self._lock = threading.Lock()
+
+    def _get(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    @property
+    def initialized(self):
+        return self._client is not None
+
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+
+    def __getitem__(self, key):
+        return self._get()[key]
 
-# ------------------- Redis Client -------------------
-redis_client = redis.Redis(
-    host='localhost',  # update if using a different host
-    port=6379,         # default Redis port
-    db=0,
-    decode_responses=True  # makes Redis return strings instead of bytes
-)
 
+def _mongo_client():
+    from pymongo import MongoClient
+    return MongoClient('mongodb://localhost:27017/')
 
 
+def _redis_client():
+    import redis
+    return redis.Redis(
+        host='localhost',  # update if using a different host
+        port=6379,         # default Redis port
+        db=0,
+        decode_responses=True  # makes Redis return strings instead of bytes
+    )
 
+
+# ------------------- MongoDB Client -------------------
+mongo_client = LazyClient(_mongo_client)
+mongo_db = LazyClient(lambda: mongo_client['recruitment_cv'])
+
+
+# ------------------- Redis Client -------------------
+redis_client = LazyClient(_redis_client)
@@ -185,6 +185,9 @@ class Requisition(db.Model):
     knockout_rules = db.Column(JSON, default=[])
     weightings = db.Column(JSON, default={'cv': 60, 'assessment': 40})
     assessment_pack = db.Column(JSON, default={"questions": []})
+    # float32 embedding of description + required skills, tagged with the model that produced it
+    description_embedding = db.Column(db.LargeBinary, nullable=True)
+    embedding_model = db.Column(db.String(100), nullable=True)
     created_by = db.Column(db.Integer, db.ForeignKey('users.id'))
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     published_on = db.Column(db.DateTime, default=datetime.utcnow)
@@ -1127,4 +1130,74 @@ class InterviewReminder(db.Model):
             "error_message": self.error_message,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
-        }
\ No newline at end of file
+        }
+
+# ------------------- DAILY ROLLUPS -------------------
+# Pre-aggregated analytics maintained by app/services/rollups.py. Missing
+# dimensions are stored as 0 / '' so they take part in the unique key.
+class ApplicationDailyRollup(db.Model):
+    """Applications per created day, requisition and current status"""
+    __tablename__ = 'application_daily_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    requisition_id = db.Column(db.Integer, nullable=False, default=0, index=True)
+    status = db.Column(db.String(50), nullable=False, default='')
+    applications = db.Column(db.Integer, nullable=False, default=0)
+    # cv_score bands, as in the admin applications analysis
+    cv_0_20 = db.Column(db.Integer, nullable=False, default=0)
+    cv_21_40 = db.Column(db.Integer, nullable=False, default=0)
+    cv_41_60 = db.Column(db.Integer, nullable=False, default=0)
+    cv_61_80 = db.Column(db.Integer, nullable=False, default=0)
+    cv_81_100 = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('day', 'requisition_id', 'status', name='uq_application_daily_rollup'),
+    )
+
+
+class AssessmentDailyRollup(db.Model):
+    """Assessment results per created day, requisition and recommendation"""
+    __tablename__ = 'assessment_daily_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    requisition_id = db.Column(db.Integer, nullable=False, default=0, index=True)
+    recommendation = db.Column(db.String(50), nullable=False, default='')
+    assessments = db.Column(db.Integer, nullable=False, default=0)
+    passed = db.Column(db.Integer, nullable=False, default=0)  # percentage_score >= 50
+    scored = db.Column(db.Integer, nullable=False, default=0)  # rows with a percentage_score
+    percentage_sum = db.Column(db.Float, nullable=False, default=0)
+    pct_0_20 = db.Column(db.Integer, nullable=False, default=0)
+    pct_21_40 = db.Column(db.Integer, nullable=False, default=0)
+    pct_41_60 = db.Column(db.Integer, nullable=False, default=0)
+    pct_61_80 = db.Column(db.Integer, nullable=False, default=0)
+    pct_81_100 = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('day', 'requisition_id', 'recommendation', name='uq_assessment_daily_rollup'),
+    )
+
+
+class InterviewDailyRollup(db.Model):
+    """Interviews per day, status and type: `created` counts by created_at, `scheduled` by scheduled_time"""
+    __tablename__ = 'interview_daily_rollups'
+
+    id = db.Column(db.Integer, primary_key=True)
+    day = db.Column(db.Date, nullable=False, index=True)
+    status = db.Column(db.String(50), nullable=False, default='')
+    interview_type = db.Column(db.String(50), nullable=False, default='')
+    created = db.Column(db.Integer, nullable=False, default=0)
+    scheduled = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.UniqueConstraint('day', 'status', 'interview_type', name='uq_interview_daily_rollup'),
+    )
+
+
+class RollupBackfill(db.Model):
+    """Rollup tables fully backfilled from their source table; until then reads use the source"""
+    __tablename__ = 'rollup_backfills'
+
+    rollup = db.Column(db.String(100), primary_key=True)  # rollup table name
+    completed_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -1,7 +1,8 @@
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from app.extensions import db
 from app.models import User, Requisition, Candidate, Application, AssessmentResult, Interview, Notification, AuditLog, Conversation, SharedNote, Meeting, CVAnalysis, InterviewFeedback, Offer, OfferStatus
+from app.models import ApplicationDailyRollup, AssessmentDailyRollup, InterviewDailyRollup
 from datetime import datetime, timedelta
 from app.utils.decorators import role_required
 from app.services.email_service import EmailService
@@ -12,6 +13,8 @@ from sqlalchemy import func, and_, or_
 import bleach
 from marshmallow import ValidationError
 from app.services.job_service import JobService
+from app.services.dashboard_stats import dashboard_snapshot, status_count
+from app.services.rollups import band_columns, band_distribution, by_month, rollup_totals, rollup_view
 from app.schemas.job_schemas import (
     job_create_schema, job_update_schema, job_response_schema,
     job_list_schema, job_filter_schema, job_activity_log_schema
@@ -29,46 +32,22 @@ admin_bp = Blueprint("admin_bp", __name__)
 @role_required(["admin", "hiring_manager"])
 def get_dashboard_stats():
     """Get overall dashboard statistics"""
-    
-    # Total counts
-    total_users = User.query.count()
-    total_candidates = Candidate.query.count()
-    total_requisitions = Requisition.query.count()
-    total_applications = Application.query.count()
-    
-    # Application status breakdown
-    application_statuses = db.session.query(
-        Application.status,
-        func.count(Application.id)
-    ).group_by(Application.status).all()
-    
-    status_breakdown = {status: count for status, count in application_statuses}
-    
-    # Recent activity (last 7 days)
-    week_ago = datetime.utcnow() - timedelta(days=7)
-    
-    new_users_week = User.query.filter(User.created_at >= week_ago).count()
-    new_applications_week = Application.query.filter(Application.created_at >= week_ago).count()
-    new_requisitions_week = Requisition.query.filter(Requisition.created_at >= week_ago).count()
-    
-    # Average scores
-    avg_cv_score = db.session.query(func.avg(Application.cv_score)).scalar() or 0
-    avg_assessment_score = db.session.query(func.avg(Application.assessment_score)).scalar() or 0
-    
+    stats = dashboard_snapshot()
+
     return jsonify({
-        'total_users': total_users,
-        'total_candidates': total_candidates,
-        'total_requisitions': total_requisitions,
-        'total_applications': total_applications,
-        'application_status_breakdown': status_breakdown,
+        'total_users': stats["users"],
+        'total_candidates': stats["candidates"],
+        'total_requisitions': stats["requisitions"],
+        'total_applications': stats["applications"],
+        'application_status_breakdown': stats["applications_by_status"],
         'recent_activity': {
-            'new_users': new_users_week,
-            'new_applications': new_applications_week,
-            'new_requisitions': new_requisitions_week
+            'new_users': stats["users_last_7_days"],
+            'new_applications': stats["applications_last_7_days"],
+            'new_requisitions': stats["requisitions_last_7_days"]
         },
         'average_scores': {
-            'cv_score': round(float(avg_cv_score), 2),
-            'assessment_score': round(float(avg_assessment_score), 2)
+            'cv_score': round(float(stats["avg_cv_score"]), 2),
+            'assessment_score': round(float(stats["avg_assessment_score"]), 2)
         }
     })
 
@@ -110,55 +89,41 @@ def get_users_growth():
 @role_required(["admin", "hiring_manager"])
 def get_applications_analysis():
     """Get detailed applications analysis"""
-    
+    rollup = rollup_view(ApplicationDailyRollup)
+    applications = func.sum(rollup.applications)
+
     # Applications by requisition
     apps_by_requisition = db.session.query(
         Requisition.title,
-        func.count(Application.id).label('application_count')
+        applications.label('application_count')
     ).join(
-        Application, Requisition.id == Application.requisition_id
+        rollup, Requisition.id == rollup.requisition_id
     ).group_by(
         Requisition.id, Requisition.title
+    ).having(
+        applications > 0
     ).order_by(
-        func.count(Application.id).desc()
+        applications.desc()
     ).limit(10).all()
     
     # Score distribution
-    score_ranges = [
-        ('0-20', 0, 20),
-        ('21-40', 21, 40),
-        ('41-60', 41, 60),
-        ('61-80', 61, 80),
-        ('81-100', 81, 100)
-    ]
-    
-    cv_score_distribution = []
-    for label, min_score, max_score in score_ranges:
-        count = Application.query.filter(
-            and_(
-                Application.cv_score >= min_score,
-                Application.cv_score <= max_score
-            )
-        ).count()
-        cv_score_distribution.append({'range': label, 'count': count})
+    cv_bands = rollup_totals(rollup, columns=band_columns('cv'))[0]
+    cv_score_distribution = band_distribution(cv_bands, 'cv')
     
     # Monthly applications
-    monthly_apps = db.session.query(
-        func.date_trunc('month', Application.created_at).label('month'),
-        func.count(Application.id).label('count')
-    ).group_by(
-        func.date_trunc('month', Application.created_at)
-    ).order_by('month').all()
+    monthly_apps = by_month(
+        rollup_totals(rollup, ['day'], ['applications']), ['applications']
+    )
     
     return jsonify({
         'applications_by_requisition': [
-            {'requisition': title, 'count': count} 
+            {'requisition': title, 'count': int(count)} 
             for title, count in apps_by_requisition
         ],
         'cv_score_distribution': cv_score_distribution,
         'monthly_applications': [
-            {'month': month.strftime('%Y-%m'), 'count': count} 
-            for month, count in monthly_apps
+            {'month': row['month'], 'count': row['applications']} 
+            for row in monthly_apps if row['applications']
         ]
     })
 
@@ -166,39 +131,34 @@ def get_applications_analysis():
 @role_required(["admin", "hiring_manager"])
 def get_interviews_analysis():
     """Get interviews analysis"""
+    rollup = rollup_view(InterviewDailyRollup)
     
-    # Interview status breakdown
-    interview_statuses = db.session.query(
-        Interview.status,
-        func.count(Interview.id)
-    ).group_by(Interview.status).all()
+    # Interview status breakdown (every interview has one created day)
+    interview_statuses = rollup_totals(rollup, ['status'], ['created'])
     
     # Interviews by type
-    interviews_by_type = db.session.query(
-        Interview.interview_type,
-        func.count(Interview.id)
-    ).filter(Interview.interview_type.isnot(None)).group_by(Interview.interview_type).all()
+    interviews_by_type = rollup_totals(
+        rollup, ['interview_type'], ['created'],
+        filters=[rollup.interview_type != '']
+    )
     
     # Monthly scheduled interviews
-    monthly_interviews = db.session.query(
-        func.date_trunc('month', Interview.scheduled_time).label('month'),
-        func.count(Interview.id).label('count')
-    ).group_by(
-        func.date_trunc('month', Interview.scheduled_time)
-    ).order_by('month').all()
+    monthly_interviews = by_month(
+        rollup_totals(rollup, ['day'], ['scheduled']), ['scheduled']
+    )
     
     return jsonify({
         'interview_status_breakdown': [
-            {'status': status, 'count': count} 
-            for status, count in interview_statuses
+            {'status': row['status'] or None, 'count': row['created']} 
+            for row in interview_statuses if row['created']
         ],
         'interviews_by_type': [
-            {'type': interview_type, 'count': count} 
-            for interview_type, count in interviews_by_type
+            {'type': row['interview_type'], 'count': row['created']} 
+            for row in interviews_by_type if row['created']
         ],
         'monthly_interviews': [
-            {'month': month.strftime('%Y-%m'), 'count': count} 
-            for month, count in monthly_interviews
+            {'month': row['month'], 'count': row['scheduled']} 
+            for row in monthly_interviews if row['scheduled']
         ]
     })
 
@@ -206,47 +166,34 @@ def get_interviews_analysis():
 @role_required(["admin", "hiring_manager"])
 def get_assessments_analysis():
     """Get assessments analysis"""
+    rollup = rollup_view(AssessmentDailyRollup)
     
     # Assessment score distribution
-    assessment_score_ranges = [
-        ('0-20', 0, 20),
-        ('21-40', 21, 40),
-        ('41-60', 41, 60),
-        ('61-80', 61, 80),
-        ('81-100', 81, 100)
-    ]
-    
-    assessment_score_distribution = []
-    for label, min_score, max_score in assessment_score_ranges:
-        count = AssessmentResult.query.filter(
-            and_(
-                AssessmentResult.percentage_score >= min_score,
-                AssessmentResult.percentage_score <= max_score
-            )
-        ).count()
-        assessment_score_distribution.append({'range': label, 'count': count})
+    pct_bands = rollup_totals(rollup, columns=band_columns('pct'))[0]
+    assessment_score_distribution = band_distribution(pct_bands, 'pct')
     
     # Recommendation breakdown
-    recommendation_breakdown = db.session.query(
-        AssessmentResult.recommendation,
-        func.count(AssessmentResult.id)
-    ).filter(AssessmentResult.recommendation.isnot(None)).group_by(
-        AssessmentResult.recommendation
-    ).all()
+    recommendation_breakdown = rollup_totals(
+        rollup, ['recommendation'], ['assessments'],
+        filters=[rollup.recommendation != '']
+    )
     
     # Average scores by requisition
     avg_scores_by_req = db.session.query(
         Requisition.title,
-        func.avg(AssessmentResult.percentage_score).label('avg_score')
-    ).join(Application, Application.requisition_id == Requisition.id).join(
-        AssessmentResult, AssessmentResult.application_id == Application.id
-    ).group_by(Requisition.id, Requisition.title).all()
+        (func.sum(rollup.percentage_sum)
+         / func.nullif(func.sum(rollup.scored), 0)).label('avg_score')
+    ).join(
+        rollup, rollup.requisition_id == Requisition.id
+    ).group_by(Requisition.id, Requisition.title).having(
+        func.sum(rollup.assessments) > 0
+    ).all()
     
     return jsonify({
         'assessment_score_distribution': assessment_score_distribution,
         'recommendation_breakdown': [
-            {'recommendation': rec, 'count': count} 
-            for rec, count in recommendation_breakdown
+            {'recommendation': row['recommendation'], 'count': row['assessments']} 
+            for row in recommendation_breakdown if row['assessments']
         ],
         'average_scores_by_requisition': [
             {'requisition': title, 'avg_score': round(float(avg_score or 0), 2)} 
@@ -659,37 +606,159 @@ def get_application(application_id):
 @admin_bp.route("/jobs/<int:job_id>/shortlist", methods=["GET"])
 @role_required(["admin", "hiring_manager", "hr"])
 def shortlist_candidates(job_id):
+    """
+    Return applicants ranked by overall_score (from the requisition leaderboard when
+    enabled, otherwise recomputed from the job's weightings and ranked in SQL).
+    Optional query params: top_k (ranks 1..K), page and per_page, refresh=true to
+    recompute every score first. The body stays a plain list; paging totals are
+    sent as X-Total-Count / X-Page / X-Per-Page headers.
+    """
+    from app.services.shortlist_service import shortlist
+
+    job = Requisition.query.get_or_404(job_id)
+    top_k = request.args.get("top_k", type=int)
+    page = request.args.get("page", 1, type=int)
+    per_page = request.args.get("per_page", type=int)
+    if per_page is not None:
+        per_page = max(1, min(per_page, 500))
+
+    refresh = request.args.get("refresh", "false").lower() == "true"
+    shortlisted, total = shortlist(job, top_k=top_k, page=page, per_page=per_page, refresh=refresh)
+    response = jsonify(shortlisted)
+    response.headers["X-Total-Count"] = str(total)
+    if per_page:
+        response.headers["X-Page"] = str(page)
+        response.headers["X-Per-Page"] = str(per_page)
+    return response
+
+
+@admin_bp.route("/jobs/<int:job_id>/assessment/bulk-grade", methods=["POST"])
+@role_required(["admin", "hiring_manager", "hr"])
+def bulk_grade_assessments(job_id):
+    """
+    Grade imported answer sheets for a job in one pass.
+    JSON body: {"sheets": [{"application_id": int, "answers": [...] | {...}}, ...]}
+    """
+    from app.services.assessment_service import AssessmentService
+
+    Requisition.query.get_or_404(job_id)
+    data = request.get_json(silent=True) or {}
+    sheets = data.get("sheets")
+    if not isinstance(sheets, list) or not sheets:
+        return jsonify({"error": "sheets must be a non-empty list"}), 400
+
+    try:
+        summary = AssessmentService.bulk_grade(job_id, sheets)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(summary), 201 if summary["graded"] else 200
+
+
+@admin_bp.route("/jobs/<int:job_id>/prescreen", methods=["POST"])
+@role_required(["admin", "hiring_manager", "hr"])
+def prescreen_applications(job_id):
+    """
+    Evaluate the job's knockout rules against every application in one pass.
+    Optional JSON body: {"rules": [...]} to try rules before saving them,
+    {"include_passed": false} to list eliminated applications only.
+    """
+    from app.services.knockout_rules import prescreen
+
     job = Requisition.query.get_or_404(job_id)
-    applications = Application.query.filter_by(requisition_id=job.id).all()
-    shortlisted = []
+    data = request.get_json(silent=True) or {}
+    rules = data.get("rules")
+    if rules is not None and not isinstance(rules, list):
+        return jsonify({"error": "rules must be a list"}), 400
 
-    for app in applications:
-        profile = app.candidate.profile or {}
-        cv_score = profile.get("cv_score", 0)
-        assessment_score = app.assessment_score or 0
+    return jsonify(prescreen(job, rules=rules, include_passed=bool(data.get("include_passed", True))))
 
-        try:
-            overall = (
-                (cv_score * job.weightings.get("cv", 60) / 100) +
-                (assessment_score * job.weightings.get("assessment", 40) / 100)
-            )
-        except Exception:
-            overall = 0
 
-        app.overall_score = overall
-        shortlisted.append({
-            "application_id": app.id,
-            "candidate_id": app.candidate_id,
-            "full_name": app.candidate.full_name,
-            "cv_score": cv_score,
-            "assessment_score": assessment_score,
-            "overall_score": overall,
-            "status": app.status
-        })
+@admin_bp.route("/jobs/<int:job_id>/shortlist/rank", methods=["GET"])
+@role_required(["admin", "hiring_manager", "hr"])
+def shortlist_rank(job_id):
+    """Rank of one applicant in the job's shortlist. Query params: application_id or candidate_id."""
+    from app.services.shortlist_service import application_rank
 
-    db.session.commit()
-    shortlisted_sorted = sorted(shortlisted, key=lambda x: x["overall_score"], reverse=True)
-    return jsonify(shortlisted_sorted)
+    job = Requisition.query.get_or_404(job_id)
+    application_id = request.args.get("application_id", type=int)
+    candidate_id = request.args.get("candidate_id", type=int)
+    if application_id is None and candidate_id is not None:
+        application_id = db.session.query(Application.id).filter_by(
+            requisition_id=job.id, candidate_id=candidate_id
+        ).order_by(Application.id.desc()).limit(1).scalar()
+        if application_id is None:
+            return jsonify({"error": "Application not found for this job"}), 404
+    if application_id is None:
+        return jsonify({"error": "application_id or candidate_id is required"}), 400
+
+    result = application_rank(job.id, application_id)
+    if result is None:
+        return jsonify({"error": "Application not found for this job"}), 404
+    return jsonify(result)
+
+
+@admin_bp.route("/jobs/<int:job_id>/rescore", methods=["POST"])
+@role_required(["admin", "hiring_manager"])
+def rescore_job_applications(job_id):
+    """Re-score every application of a job in the background; progress arrives as `rescore_progress` events."""
+    from app.services.rescoring_service import start_rescore
+
+    job = Requisition.query.get_or_404(job_id)
+    start_rescore(job.id, user_id=get_jwt_identity())
+    return jsonify({"message": "Re-scoring started", "job_id": job.id}), 202
+
+
+@admin_bp.route("/jobs/<int:job_id>/candidate-ranking", methods=["GET"])
+@role_required(["admin", "hiring_manager", "hr"])
+def rank_candidates_for_job(job_id):
+    """
+    Rank candidates by CV embedding similarity to the job.
+    Query params: scope=applicants|all (default applicants), top_k (default 20, max 500).
+    """
+    from app.services.candidate_index import candidate_index
+    from app.services.embedding_service import get_job_embedding
+
+    job = Requisition.query.get_or_404(job_id)
+    scope = request.args.get("scope", "applicants")
+    top_k = min(max(request.args.get("top_k", 20, type=int), 1), 500)
+    if scope not in ("applicants", "all"):
+        return jsonify({"error": "scope must be 'applicants' or 'all'"}), 400
+
+    job_embedding = get_job_embedding(job)
+    if job_embedding is None:
+        return jsonify({"error": "Embedding model unavailable"}), 503
+
+    candidate_ids = None
+    if scope == "applicants":
+        candidate_ids = [
+            cid for (cid,) in db.session.query(Application.candidate_id)
+            .filter(Application.requisition_id == job.id).distinct()
+        ]
+
+    try:
+        ranked = candidate_index.rank(job_embedding, top_k=top_k, candidate_ids=candidate_ids)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 409
+
+    candidates = {
+        c.id: c for c in Candidate.query.filter(Candidate.id.in_([cid for cid, _ in ranked])).all()
+    } if ranked else {}
+
+    return jsonify({
+        "job_id": job.id,
+        "scope": scope,
+        "indexed_candidates": len(candidate_index),
+        "results": [
+            {
+                "candidate_id": cid,
+                "full_name": candidates[cid].full_name if cid in candidates else None,
+                "title": candidates[cid].title if cid in candidates else None,
+                "similarity": round(score, 4),
+                "match_score": int(score * 100),
+            }
+            for cid, score in ranked
+        ],
+    }), 200
 
 
 # ----------------- NOTIFICATIONS -----------------
@@ -882,12 +951,13 @@ def list_audits():
 @role_required(["admin", "hiring_manager"])
 def dashboard_counts():
     try:
+        stats = dashboard_snapshot()
         counts = {
-            "jobs": Requisition.query.count(),
-            "candidates": Candidate.query.count(),
-            "cv_reviews": Application.query.count(),
-            "audits": AuditLog.query.count(),
-            "interviews": Interview.query.count()
+            "jobs": stats["requisitions"],
+            "candidates": stats["candidates"],
+            "cv_reviews": stats["applications"],
+            "audits": stats["audits"],
+            "interviews": stats["interviews"]
         }
         return jsonify(counts), 200
     except Exception as e:
@@ -2437,7 +2507,12 @@ def powerbi_data():
     - candidate_id
     - status
     - start_date, end_date (ISO format)
+    - format: json (default, one JSON array), ndjson or csv
+
+    Rows are streamed from a server-side cursor as they are read.
     """
+    from app.services.powerbi_export import EXPORT_FORMATS, export_statement, stream_export
+
     try:
         # --- Get filters from query params ---
         job_id = request.args.get("job_id", type=int)
@@ -2445,60 +2520,40 @@ def powerbi_data():
         status = request.args.get("status", type=str)
         start_date_str = request.args.get("start_date")
         end_date_str = request.args.get("end_date")
+        fmt = request.args.get("format", "json").lower()
 
-        # --- Build base query ---
-        query = Application.query
-
-        if job_id:
-            query = query.filter_by(requisition_id=job_id)
-        if candidate_id:
-            query = query.filter_by(candidate_id=candidate_id)
-        if status:
-            query = query.filter_by(status=status)
+        if fmt not in EXPORT_FORMATS:
+            return jsonify({"error": f"Invalid format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400
 
+        start_date = end_date = None
         if start_date_str:
             try:
                 start_date = datetime.fromisoformat(start_date_str)
-                query = query.filter(Application.created_at >= start_date)
             except ValueError:
                 return jsonify({"error": "Invalid start_date format. Use YYYY-MM-DD or ISO format"}), 400
 
         if end_date_str:
             try:
                 end_date = datetime.fromisoformat(end_date_str)
-                query = query.filter(Application.created_at <= end_date)
             except ValueError:
                 return jsonify({"error": "Invalid end_date format. Use YYYY-MM-DD or ISO format"}), 400
 
-        applications = query.all()
-        data = []
-
-        for app in applications:
-            candidate = app.candidate
-            user = candidate.user if candidate else None
-            job = app.requisition
-            assessment = AssessmentResult.query.filter_by(application_id=app.id).first()
-            interviews = Interview.query.filter_by(application_id=app.id).all()
-
-            data.append({
-                "application_id": app.id,
-                "application_status": app.status,
-                "cv_score": app.cv_score,
-                "assessment_score": app.assessment_score,
-                "overall_score": app.overall_score,
-                "recommendation": assessment.recommendation if assessment else None,
-                "candidate_id": candidate.id if candidate else None,
-                "candidate_name": candidate.full_name if candidate else None,
-                "candidate_email": user.email if user else None,
-                "candidate_verified": user.is_verified if user else None,
-                "job_id": job.id if job else None,
-                "job_title": job.title if job else None,
-                "job_category": job.category if job else None,
-                "interview_count": len(interviews),
-                "interview_dates": [i.scheduled_time.isoformat() for i in interviews]
-            })
+        stmt = export_statement(
+            job_id=job_id,
+            candidate_id=candidate_id,
+            status=status,
+            start_date=start_date,
+            end_date=end_date,
+        )
 
-        return jsonify(data), 200
+        headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        if fmt == "csv":
+            headers["Content-Disposition"] = "attachment; filename=powerbi_export.csv"
+        return Response(
+            stream_with_context(stream_export(stmt, fmt)),
+            mimetype=EXPORT_FORMATS[fmt],
+            headers=headers,
+        )
 
     except Exception as e:
         current_app.logger.error(f"Power BI filtered data error: {e}", exc_info=True)
@@ -3447,46 +3502,23 @@ def get_pipeline_stats():
     Get statistics for the recruitment pipeline header
     """
     try:
-        # Active jobs (where requisition has status 'active' - you might need to add this field)
-        # For now, assuming all requisitions are active
-        active_jobs = Requisition.query.count()
-        
-        # Total applications
-        total_applications = Application.query.count()
-        
-        # Offers sent (status = 'sent' in Offer model)
-        offers_sent = Offer.query.filter_by(status=OfferStatus.SENT).count()
-        
-        # Today's interviews
-        today = datetime.utcnow().date()
-        today_interviews = Interview.query.filter(
-            db.func.date(Interview.scheduled_time) == today,
-            Interview.status == 'scheduled'
-        ).count()
-        
+        stats = dashboard_snapshot()
+
         # Applications by pipeline stage (using Application.status)
         stages = ['screening', 'assessment', 'interview', 'offer', 'hired', 'rejected']
-        apps_by_stage = {}
-        
-        for stage in stages:
-            count = Application.query.filter_by(status=stage).count()
-            apps_by_stage[stage] = count
-        
-        # Add pending interviews count
-        pending_interviews = Interview.query.filter(
-            Interview.status == 'scheduled'
-        ).count()
-        
+        apps_by_stage = {stage: status_count(stats, stage) for stage in stages}
+
+        # All requisitions count as active jobs until requisitions carry a status
         return jsonify({
-            "active_jobs": active_jobs,
-            "total_candidates": total_applications,
-            "offers_sent": offers_sent,
-            "today_interviews": today_interviews,
-            "pending_interviews": pending_interviews,
+            "active_jobs": stats["requisitions"],
+            "total_candidates": stats["applications"],
+            "offers_sent": stats["offers_sent"],
+            "today_interviews": stats["interviews_today"],
+            "pending_interviews": stats["interviews_scheduled"],
             "applications_by_stage": apps_by_stage,
-            "total_requisitions": Requisition.query.count(),
-            "total_interviews": Interview.query.count(),
-            "total_offers": Offer.query.count()
+            "total_requisitions": stats["requisitions"],
+            "total_interviews": stats["interviews"],
+            "total_offers": stats["offers"]
         }), 200
         
     except Exception as e:
@@ -3615,45 +3647,34 @@ def get_filtered_applications():
 @role_required(["admin", "hiring_manager", "hr"])
 def get_jobs_with_stats():
     """
-    Get all jobs with their statistics
+    Get all jobs with their statistics.
+    Optional query params page and per_page page through the jobs (by id)
+    and add a "pagination" block; without per_page every job is returned.
     """
+    from app.services.job_stats import PIPELINE_STATUSES, application_stats, empty_stats, paginate_jobs, pagination
+
     try:
-        jobs = Requisition.query.all()
+        page = request.args.get("page", 1, type=int)
+        per_page = request.args.get("per_page", type=int)
+        query = Requisition.query.order_by(Requisition.id)
+        jobs, total = paginate_jobs(query, page=page, per_page=per_page)
+
+        # Every job's breakdown from one GROUP BY requisition_id, status
+        stats = application_stats(job.id for job in jobs)
         result = []
         
         for job in jobs:
-            # Count applications for this job
-            total_apps = Application.query.filter_by(requisition_id=job.id).count()
+            job_stats = stats.get(job.id, empty_stats())
             
             # Count by status
-            status_counts = {}
-            statuses = ['screening', 'assessment', 'interview', 'offer', 'hired', 'rejected']
-            
-            for status in statuses:
-                count = Application.query.filter_by(
-                    requisition_id=job.id,
-                    status=status
-                ).count()
-                status_counts[status] = count
-            
-            # Count hired candidates
-            hired_count = Application.query.filter_by(
-                requisition_id=job.id,
-                status='hired'
-            ).count()
+            status_counts = {status: job_stats["by_status"].get(status, 0) for status in PIPELINE_STATUSES}
+            hired_count = status_counts["hired"]
             
             # Calculate progress percentage
             progress = 0
             if job.vacancy and job.vacancy > 0:
                 progress = min(100, (hired_count / job.vacancy) * 100)
             
-            # Get recent applications (last 7 days)
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            recent_apps = Application.query.filter(
-                Application.requisition_id == job.id,
-                Application.created_at >= week_ago
-            ).count()
-            
             result.append({
                 "id": job.id,
                 "title": job.title,
@@ -3662,8 +3683,8 @@ def get_jobs_with_stats():
                 "vacancy": job.vacancy or 0,
                 "created_at": job.created_at.isoformat() if job.created_at else None,
                 "published_on": job.published_on.isoformat() if job.published_on else None,
-                "applications_count": total_apps,
-                "recent_applications": recent_apps,
+                "applications_count": job_stats["total"],
+                "recent_applications": job_stats["recent"],
                 "status": "active",  # You might want to add a status field to Requisition
                 "progress": round(progress, 1),
                 "hired_count": hired_count,
@@ -3673,7 +3694,10 @@ def get_jobs_with_stats():
                 "created_by": job.created_by
             })
         
-        return jsonify({"jobs": result}), 200
+        response = {"jobs": result}
+        if per_page:
+            response["pagination"] = pagination(page, per_page, total)
+        return jsonify(response), 200
         
     except Exception as e:
         current_app.logger.error(f"Jobs with stats error: {e}", exc_info=True)
@@ -3847,77 +3871,33 @@ def get_pipeline_quick_stats():
     Get quick statistics for dashboard cards
     """
     try:
-        now = datetime.utcnow()
-        today = now.date()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
-
-        # Core stats
-        active_jobs = Requisition.query.count()
-        total_applications = Application.query.count()
-        offers_sent = Offer.query.filter_by(status=OfferStatus.SENT).count()
-
-        today_interviews = Interview.query.filter(
-            db.func.date(Interview.scheduled_time) == today,
-            Interview.status == "scheduled"
-        ).count()
+        stats = dashboard_snapshot()
 
         # Time to hire (avg days from application creation to now for hired)
-        time_to_hire_query = db.session.query(
-            db.func.avg(
-                db.func.extract(
-                    "epoch",
-                    db.func.now() - Application.created_at
-                ) / 86400
-            )
-        ).filter(Application.status == "hired").scalar()
-
-        time_to_hire = round(time_to_hire_query or 28, 1)
+        time_to_hire = round(stats["avg_days_since_hired_application"] or 28, 1)
 
         # Offer acceptance rate
-        total_offers = Offer.query.filter_by(status=OfferStatus.SENT).count()
-        accepted_offers = Offer.query.filter_by(status=OfferStatus.SIGNED).count()
         acceptance_rate = (
-            round((accepted_offers / total_offers) * 100, 1)
-            if total_offers > 0 else 0
+            round((stats["offers_signed"] / stats["offers_sent"]) * 100, 1)
+            if stats["offers_sent"] > 0 else 0
         )
 
-        # Recent activity
-        recent_applications = Application.query.filter(
-            Application.created_at >= week_ago
-        ).count()
-
-        recent_interviews = Interview.query.filter(
-            Interview.created_at >= week_ago
-        ).count()
-
         # Stage distribution
         stages = ["screening", "assessment", "interview", "offer", "hired"]
-        stage_distribution = {
-            stage: Application.query.filter_by(status=stage).count()
-            for stage in stages
-        }
+        stage_distribution = {stage: status_count(stats, stage) for stage in stages}
 
         # Interview completion rate
-        total_interviews = Interview.query.count()
-        completed_interviews = Interview.query.filter_by(status="completed").count()
         interview_completion_rate = (
-            round((completed_interviews / total_interviews) * 100, 1)
-            if total_interviews > 0 else 0
+            round((stats["interviews_completed"] / stats["interviews"]) * 100, 1)
+            if stats["interviews"] > 0 else 0
         )
 
-        # Hires in last 30 days (using created_at as proxy)
-        hires_last_30_days = Application.query.filter(
-            Application.status == "hired",
-            Application.created_at >= month_ago
-        ).count()
-
         return jsonify({
-            "active_jobs": active_jobs,
-            "total_candidates": total_applications,
-            "offers_sent": offers_sent,
-            "today_interviews": today_interviews,
-            "pending_reviews": Application.query.filter_by(status="screening").count(),
+            "active_jobs": stats["requisitions"],
+            "total_candidates": stats["applications"],
+            "offers_sent": stats["offers_sent"],
+            "today_interviews": stats["interviews_today"],
+            "pending_reviews": status_count(stats, "screening"),
 
             "performance_metrics": {
                 "time_to_hire_days": time_to_hire,
@@ -3928,25 +3908,18 @@ def get_pipeline_quick_stats():
             },
 
             "recent_activity": {
-                "applications_last_7_days": recent_applications,
-                "interviews_last_7_days": recent_interviews,
-                "offers_last_7_days": Offer.query.filter(
-                    Offer.created_at >= week_ago
-                ).count(),
-                "hires_last_30_days": hires_last_30_days
+                "applications_last_7_days": stats["applications_last_7_days"],
+                "interviews_last_7_days": stats["interviews_last_7_days"],
+                "offers_last_7_days": stats["offers_last_7_days"],
+                "hires_last_30_days": stats["hires_last_30_days"]
             },
 
             "stage_distribution": stage_distribution,
-            "total_interviews": total_interviews,
-            "upcoming_interviews": Interview.query.filter(
-                Interview.scheduled_time > now,
-                Interview.status == "scheduled"
-            ).count(),
-            "offers_pending_response": Offer.query.filter_by(
-                status=OfferStatus.SENT
-            ).count(),
+            "total_interviews": stats["interviews"],
+            "upcoming_interviews": stats["interviews_upcoming"],
+            "offers_pending_response": stats["offers_sent"],
 
-            "updated_at": now.isoformat()
+            "updated_at": stats["taken_at"].isoformat()
         }), 200
 
     except Exception as e:
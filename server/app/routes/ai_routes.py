@@ -1,52 +1,82 @@
 # app/routes/ai_routes.py
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import get_jwt_identity
 from app.utils.decorators import role_required
-from app.services.ai_parser_service import analyse_resume_gemini
+from app.services.ai_parser_service import analyse_resume_gemini, analyse_resumes_batch
+from app.services.ai_chat_service import save_conversation, stream_chat
 from app.extensions import db, cloudinary_client
-from app.models import CVAnalysis, Conversation, Candidate, User
+from app.models import CVAnalysis, Conversation, Candidate, User, Requisition
+from sqlalchemy import insert
 import cloudinary.uploader
 import datetime
+import json
 import logging
+import os
 
 logger = logging.getLogger(__name__)
 ai_bp = Blueprint("ai_bp", __name__, url_prefix="/api/ai")
 
+BATCH_ANALYSIS_MAX_ITEMS = int(os.environ.get("BATCH_ANALYSIS_MAX_ITEMS", 100))
+# Finished analyses are saved every this many rows, so a dropped stream keeps them
+BATCH_ANALYSIS_SAVE_EVERY = int(os.environ.get("BATCH_ANALYSIS_SAVE_EVERY", 10))
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _wants_stream(data):
+    return (
+        bool(data.get("stream"))
+        or request.args.get("stream", "").lower() in ("1", "true")
+        or "text/event-stream" in request.headers.get("Accept", "")
+    )
+
 
 @ai_bp.route("/chat", methods=["POST"])
 def chat():
     """
     Public chat endpoint (optionally require auth if desired).
-    body: {"message": "hello"}
+    body: {"message": "hello", "stream": false}
+
+    With "stream": true (or ?stream=1, or Accept: text/event-stream) the reply is
+    sent as Server-Sent Events: `delta` events carrying {"delta": "..."}, then a
+    `done` event with the full reply, or an `error` event.
     """
     data = request.get_json(silent=True) or {}
     message = (data.get("message") or "").strip()
     if not message:
         return jsonify({"error": "Message required"}), 400
 
+    # Optionally persist conversation if authenticated
+    user_id = None
+    try:
+        user_id = get_jwt_identity()
+    except Exception:
+        user_id = None
+
+    if _wants_stream(data):
+        def generate():
+            try:
+                for event, payload in stream_chat(message, user_id=user_id):
+                    yield _sse(event, {"delta": payload} if event == "delta" else payload)
+            except Exception as e:
+                logger.exception("Chat stream error")
+                yield _sse("error", {"error": "AI chat failed", "details": str(e)})
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
     # Lazy import to avoid cycle
     from app.services.ai_service import AIService
     ai = AIService()
 
     try:
         reply = ai.chat(message)
-
-        # Optionally persist conversation if authenticated
-        user_id = None
-        try:
-            user_id = get_jwt_identity()
-        except Exception:
-            user_id = None
-
-        if user_id:
-            try:
-                conv = Conversation(user_id=user_id, user_message=message, assistant_message=reply)
-                db.session.add(conv)
-                db.session.commit()
-            except Exception:
-                db.session.rollback()
-                logger.exception("Failed to save conversation")
-
+        save_conversation(user_id, message, reply)
         return jsonify({"reply": reply}), 200
 
     except Exception as e:
@@ -138,6 +168,124 @@ def parse_cv():
 
 
 
+@ai_bp.route("/analyse_batch", methods=["POST"])
+@role_required(["admin", "hiring_manager", "hr"])
+def analyse_batch():
+    """
+    Analyse many CVs concurrently and stream results as NDJSON, one line per
+    item in completion order, then a final {"summary": ...} line.
+
+    body: {
+      "job_description": "...",            # or "job_id": 12 (default for all items)
+      "items": [{"candidate_id": 1, "cv_text": "...", "job_description": "..."}, ...],
+      "persist": true                      # save CVAnalysis rows (bulk inserts)
+    }
+    Items without cv_text use the candidate's stored CV text. Results are saved
+    in chunks of BATCH_ANALYSIS_SAVE_EVERY as they finish, and whatever has
+    finished is still saved if the client disconnects mid-stream.
+    """
+    data = request.get_json(silent=True) or {}
+    items = data.get("items") or []
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "items must be a non-empty list"}), 400
+    if len(items) > BATCH_ANALYSIS_MAX_ITEMS:
+        return jsonify({"error": f"At most {BATCH_ANALYSIS_MAX_ITEMS} items per batch"}), 400
+
+    default_job = data.get("job_description")
+    if not default_job and data.get("job_id"):
+        requisition = Requisition.query.get(data["job_id"])
+        if not requisition:
+            return jsonify({"error": "Job not found"}), 404
+        default_job = requisition.description or ""
+
+    def valid_candidate_id(item):
+        candidate_id = item.get("candidate_id")
+        return candidate_id is None or (isinstance(candidate_id, int) and not isinstance(candidate_id, bool))
+
+    candidate_ids = {
+        item["candidate_id"] for item in items
+        if isinstance(item, dict) and item.get("candidate_id") and valid_candidate_id(item)
+    }
+    stored_cvs = dict(
+        db.session.query(Candidate.id, Candidate.cv_text).filter(Candidate.id.in_(candidate_ids)).all()
+    ) if candidate_ids else {}
+
+    pairs, errors = [], {}
+    for index, item in enumerate(items):
+        item = item if isinstance(item, dict) else {}
+        if not valid_candidate_id(item):
+            errors[index] = "candidate_id must be an integer"
+            pairs.append(("", ""))
+            continue
+        cv_text = item.get("cv_text") or stored_cvs.get(item.get("candidate_id")) or ""
+        job_description = item.get("job_description") or default_job or ""
+        if not cv_text:
+            errors[index] = "cv_text is required (or a candidate_id with stored CV text)"
+        elif not job_description:
+            errors[index] = "job_description is required"
+        pairs.append((cv_text, job_description))
+
+    runnable = [i for i in range(len(items)) if i not in errors]
+    persist = data.get("persist", True)
+
+    def generate():
+        rows = []
+        saved = 0
+        counts = {"ok": 0, "error": len(errors), "timeout": 0}
+
+        def save():
+            nonlocal saved
+            if not rows:
+                return
+            try:
+                db.session.execute(insert(CVAnalysis), rows)
+                db.session.commit()
+                saved += len(rows)
+            except Exception:
+                db.session.rollback()
+                logger.exception("Failed to bulk insert CV analyses")
+            rows.clear()
+
+        for index, message in errors.items():
+            yield json.dumps({"index": index, "status": "error", "error": message}) + "\n"
+
+        try:
+            for batch_index, status, result in analyse_resumes_batch([pairs[i] for i in runnable]):
+                index = runnable[batch_index]
+                candidate_id = items[index].get("candidate_id")
+                counts[status] += 1
+
+                if persist and status == "ok" and candidate_id in stored_cvs:
+                    cv_text, job_description = pairs[index]
+                    rows.append({
+                        "candidate_id": candidate_id,
+                        "job_description": job_description,
+                        "cv_text": cv_text,
+                        "result": result,
+                        "created_at": datetime.datetime.utcnow(),
+                    })
+                    if len(rows) >= BATCH_ANALYSIS_SAVE_EVERY:
+                        save()
+
+                yield json.dumps({
+                    "index": index,
+                    "candidate_id": candidate_id,
+                    "status": status,
+                    "result": result,
+                }) + "\n"
+        finally:
+            # Also runs on GeneratorExit when the client goes away mid-stream
+            save()
+
+        yield json.dumps({"summary": {**counts, "total": len(items), "saved": saved}}) + "\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @ai_bp.route("/analysis/<int:analysis_id>", methods=["GET"])
 @role_required(["candidate"])
 def get_analysis(analysis_id):
@@ -153,3 +301,66 @@ def get_analysis(analysis_id):
     except Exception:
         logger.exception("Failed to fetch analysis")
         return jsonify({"error": "Internal server error"}), 500
+
+
+# ----------------- MODEL READINESS -----------------
+@ai_bp.route("/models/status", methods=["GET"])
+def models_status():
+    """
+    Readiness probe for the NLP / embedding models of this worker.
+    Returns 200 once every model is loaded, 503 otherwise, with per-model
+    load time and memory usage, plus embedding micro-batching metrics
+    (queue depth, batch sizes).
+    """
+    from app.services.model_registry import model_registry
+    from app.services.embedding_service import embedding_broker
+
+    ready = model_registry.ready()
+    return jsonify({
+        "ready": ready,
+        "models": model_registry.stats(),
+        "embedding_broker": embedding_broker.stats(),
+    }), 200 if ready else 503
+
+
+@ai_bp.route("/models/warmup", methods=["POST"])
+@role_required(["admin"])
+def models_warmup():
+    """Load every registered model in this worker now instead of on first use."""
+    from app.services.model_registry import model_registry
+
+    try:
+        stats = model_registry.warm_up()
+        return jsonify({
+            "ready": model_registry.ready(),
+            "models": stats,
+        }), 200
+    except Exception:
+        logger.exception("Model warm-up failed")
+        return jsonify({"error": "Model warm-up failed"}), 500
+
+
+@ai_bp.route("/cache/stats", methods=["GET"])
+@role_required(["admin"])
+def analysis_cache_stats():
+    """Hit/miss metrics of the analysis and extracted-text caches in this worker."""
+    from app.services.analysis_cache import analysis_cache
+    from app.services.text_extraction import text_cache
+
+    return jsonify({
+        "analysis": analysis_cache.stats(),
+        "extracted_text": text_cache.stats(),
+    }), 200
+
+
+@ai_bp.route("/llm/status", methods=["GET"])
+@role_required(["admin"])
+def llm_status():
+    """Per-provider concurrency and circuit-breaker state, plus prompt tokens saved, for this worker."""
+    from app.services.llm_client import llm_stats
+    from app.services.prompt_compaction import compaction_stats
+
+    return jsonify({
+        "providers": llm_stats(),
+        "prompt_compaction": compaction_stats.stats(),
+    }), 200
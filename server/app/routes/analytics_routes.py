@@ -3,8 +3,11 @@ from sqlalchemy import func, cast, Date, text, case
 from app.extensions import db
 from app.models import (
     Application, Requisition, Interview,
-    AssessmentResult, Candidate, CVAnalysis
+    AssessmentResult, Candidate, CVAnalysis,
+    ApplicationDailyRollup, AssessmentDailyRollup, InterviewDailyRollup
 )
+from app.services.rollups import by_month, rollup_totals, rollup_view
+from app.services.skill_taxonomy import get_skill_taxonomy
 import json
 
 analytics_bp = Blueprint("analytics_bp", __name__)
@@ -14,13 +17,14 @@ analytics_bp = Blueprint("analytics_bp", __name__)
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/applications-per-requisition")
 def applications_per_requisition():
+    rollup = rollup_view(ApplicationDailyRollup)
     results = (
         db.session.query(
             Requisition.id,
             Requisition.title,
-            func.count(Application.id).label("applications")
+            func.coalesce(func.sum(rollup.applications), 0).label("applications")
         )
-        .outerjoin(Application, Application.requisition_id == Requisition.id)
+        .outerjoin(rollup, rollup.requisition_id == Requisition.id)
         .group_by(Requisition.id)
         .all()
     )
@@ -36,7 +40,7 @@ def applications_per_requisition():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/conversion/application-to-interview")
 def application_to_interview():
-    total_apps = db.session.query(func.count(Application.id)).scalar()
+    total_apps = rollup_totals(rollup_view(ApplicationDailyRollup), columns=["applications"])[0]["applications"]
     interviewed = db.session.query(func.count(func.distinct(Interview.application_id))).scalar()
     rate = (interviewed / total_apps * 100) if total_apps else 0
 
@@ -53,7 +57,11 @@ def application_to_interview():
 @analytics_bp.route("/analytics/conversion/interview-to-offer")
 def interview_to_offer():
     interviewed = db.session.query(func.count(func.distinct(Interview.application_id))).scalar()
-    offered = db.session.query(func.count(Application.id)).filter(Application.status == "recommended").scalar()
+    rollup = rollup_view(ApplicationDailyRollup)
+    offered = rollup_totals(
+        rollup, columns=["applications"],
+        filters=[rollup.status == "recommended"]
+    )[0]["applications"]
     rate = (offered / interviewed * 100) if interviewed else 0
 
     return jsonify({
@@ -68,10 +76,14 @@ def interview_to_offer():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/dropoff")
 def stage_dropoff():
-    total = db.session.query(func.count(Application.id)).scalar()
-    reviewed = db.session.query(func.count(Application.id)).filter(Application.status == "reviewed").scalar()
+    by_status = {
+        row["status"]: row["applications"]
+        for row in rollup_totals(rollup_view(ApplicationDailyRollup), ["status"], ["applications"])
+    }
+    total = sum(by_status.values())
+    reviewed = by_status.get("reviewed", 0)
     interviewed = db.session.query(func.count(func.distinct(Interview.application_id))).scalar()
-    offered = db.session.query(func.count(Application.id)).filter(Application.status == "recommended").scalar()
+    offered = by_status.get("recommended", 0)
 
     return jsonify({
         "total_applications": total,
@@ -123,20 +135,11 @@ def time_per_stage():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/applications/monthly")
 def monthly_applications():
-    results = (
-        db.session.query(
-            func.date_trunc("month", Application.created_at).label("month"),
-            func.count(Application.id)
-        )
-        .group_by(func.date_trunc("month", Application.created_at))
-        .order_by(func.date_trunc("month", Application.created_at))
-        .all()
+    results = by_month(
+        rollup_totals(rollup_view(ApplicationDailyRollup), ["day"], ["applications"]), ["applications"]
     )
 
-    return jsonify([
-        {"month": r.month.strftime("%Y-%m"), "applications": r[1]}
-        for r in results
-    ])
+    return jsonify([r for r in results if r["applications"]])
 
 
 # ------------------------------------------------------------
@@ -145,58 +148,42 @@ def monthly_applications():
 # CV SCREENING DROP TREND
 @analytics_bp.route("/analytics/cv-screening-drop")
 def cv_screening_drop():
-    results = (
-        db.session.query(
-            func.date_trunc("month", Application.created_at).label("month"),
-            func.count(Application.id).label("total"),
-            func.sum(
-                case(
-                    (Application.status == "rejected", 1),
-                    else_=0
-                )
-            ).label("rejected")
-        )
-        .group_by(func.date_trunc("month", Application.created_at))
-        .all()
-    )
+    daily = [
+        {
+            "day": r["day"],
+            "total": r["applications"],
+            "rejected": r["applications"] if r["status"] == "rejected" else 0
+        }
+        for r in rollup_totals(rollup_view(ApplicationDailyRollup), ["day", "status"], ["applications"])
+    ]
+    results = by_month(daily, ["total", "rejected"])
 
     return jsonify([
         {
-            "month": r.month.strftime("%Y-%m"),
-            "total_applications": r.total,
-            "rejected": r.rejected,
-            "drop_rate_percent": round((r.rejected / r.total * 100), 2) if r.total else 0
+            "month": r["month"],
+            "total_applications": r["total"],
+            "rejected": r["rejected"],
+            "drop_rate_percent": round((r["rejected"] / r["total"] * 100), 2) if r["total"] else 0
         }
-        for r in results
+        for r in results if r["total"]
     ])
 
 
 # ASSESSMENT PASS RATE TREND
 @analytics_bp.route("/analytics/assessments/pass-rate")
 def assessment_pass_rate():
-    results = (
-        db.session.query(
-            func.date_trunc("month", AssessmentResult.created_at).label("month"),
-            func.count(AssessmentResult.id).label("taken"),
-            func.sum(
-                case(
-                    (AssessmentResult.percentage_score >= 50, 1),
-                    else_=0
-                )
-            ).label("passed")
-        )
-        .group_by(func.date_trunc("month", AssessmentResult.created_at))
-        .all()
+    results = by_month(
+        rollup_totals(rollup_view(AssessmentDailyRollup), ["day"], ["assessments", "passed"]), ["assessments", "passed"]
     )
 
     return jsonify([
         {
-            "month": r.month.strftime("%Y-%m") if r.month else None,
-            "taken": r.taken,
-            "passed": r.passed,
-            "pass_rate_percent": round((r.passed / r.taken * 100), 2) if r.taken else 0
+            "month": r["month"],
+            "taken": r["assessments"],
+            "passed": r["passed"],
+            "pass_rate_percent": round((r["passed"] / r["assessments"] * 100), 2) if r["assessments"] else 0
         }
-        for r in results
+        for r in results if r["assessments"]
     ])
 
 
@@ -206,19 +193,13 @@ def assessment_pass_rate():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/interviews/scheduled")
 def interview_scheduling():
-    results = (
-        db.session.query(
-            func.date_trunc("month", Interview.created_at).label("month"),
-            func.count(Interview.id)
-        )
-        .group_by(func.date_trunc("month", Interview.created_at))
-        .order_by(func.date_trunc("month", Interview.created_at))
-        .all()
+    results = by_month(
+        rollup_totals(rollup_view(InterviewDailyRollup), ["day"], ["created"]), ["created"]
     )
 
     return jsonify([
-        {"month": r.month.strftime("%Y-%m"), "interviews": r[1]}
-        for r in results
+        {"month": r["month"], "interviews": r["created"]}
+        for r in results if r["created"]
     ])
 
 
@@ -227,14 +208,17 @@ def interview_scheduling():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/offers-by-category")
 def offers_by_category():
+    rollup = rollup_view(ApplicationDailyRollup)
+    offers = func.sum(rollup.applications)
     results = (
         db.session.query(
             Requisition.category,
-            func.count(Application.id)
+            offers
         )
-        .join(Application, Application.requisition_id == Requisition.id)
-        .filter(Application.status == "recommended")
+        .join(rollup, rollup.requisition_id == Requisition.id)
+        .filter(rollup.status == "recommended")
         .group_by(Requisition.category)
+        .having(offers > 0)
         .all()
     )
 
@@ -259,7 +243,8 @@ def avg_cv_score():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/candidate/avg-assessment-score")
 def avg_assessment_score():
-    avg_score = db.session.query(func.avg(AssessmentResult.percentage_score)).scalar()
+    totals = rollup_totals(rollup_view(AssessmentDailyRollup), columns=["percentage_sum", "scored"])[0]
+    avg_score = totals["percentage_sum"] / totals["scored"] if totals["scored"] else None
     return jsonify({"average_assessment_score": round(avg_score, 2) if avg_score else 0})
 
 
@@ -268,13 +253,20 @@ def avg_assessment_score():
 # ------------------------------------------------------------
 @analytics_bp.route("/analytics/candidate/skills-frequency")
 def skill_frequency():
-    candidates = Candidate.query.with_entities(Candidate.skills).all()
+    # Aliases ("JS", "javascript") are counted under their canonical skill;
+    # candidates without a skills list are read from their CV text instead
+    taxonomy = get_skill_taxonomy()
+    candidates = Candidate.query.with_entities(Candidate.skills, Candidate.cv_text).yield_per(500)
     freq = {}
 
     for c in candidates:
-        if not c.skills:
+        if c.skills and isinstance(c.skills, list):
+            skills = taxonomy.normalize_many(c.skills)
+        elif c.cv_text:
+            skills = taxonomy.extract(c.cv_text)
+        else:
             continue
-        for skill in c.skills:
+        for skill in skills:
             freq[skill] = freq.get(skill, 0) + 1
 
     return jsonify(freq)
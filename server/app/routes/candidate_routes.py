@@ -11,10 +11,12 @@ from datetime import datetime
 from werkzeug.utils import secure_filename
 
 from app.services.cv_parser_service import HybridResumeAnalyzer
+from app.services.analysis_queue import analysis_queue
+from app.services.text_extraction import extract_text, read_upload, ExtractionLimitError, UnsupportedFormatError
+from app.services.answer_keys import get_answer_key
 from app.utils.decorators import role_required
 from app.utils.helper import get_current_candidate
 from app.services.audit2 import AuditService
-import fitz
 from flask import jsonify, request, current_app
 import json
 import re
@@ -146,31 +148,37 @@ def upload_resume(application_id):
 
         file = request.files["resume"]
 
+        # --- Check limits and extract text before anything is stored ---
+        resume_text = request.form.get("resume_text", "")
+        try:
+            data = read_upload(file)
+            if not resume_text:
+                try:
+                    resume_text = extract_text(data, filename=file.filename)
+                except UnsupportedFormatError as e:
+                    current_app.logger.warning(f"No text extracted from resume: {e}")
+        except ExtractionLimitError as e:
+            return jsonify({"error": str(e)}), 413
+
         # --- Upload to Cloudinary ---
+        file.stream.seek(0)
         resume_url = HybridResumeAnalyzer.upload_cv(file)
         if not resume_url:
             return jsonify({"error": "Failed to upload resume"}), 500
 
-        # --- Extract PDF text if needed ---
-        resume_text = request.form.get("resume_text", "")
-        if not resume_text and file.filename.lower().endswith(".pdf"):
-            file.stream.seek(0)
-            pdf_doc = fitz.open(stream=file.stream.read(), filetype="pdf")
-            resume_text = ""
-            for page in pdf_doc:
-                resume_text += page.get_text()
-
-        # --- Hybrid Resume Analysis ---
-        analyzer = HybridResumeAnalyzer()
-        parser_result = analyzer.analyse(resume_text, job.id)
-
-        # --- Save results ---
+        # --- Save upload, then queue the hybrid analysis ---
         application.resume_url = resume_url
-        application.cv_score = parser_result.get("match_score", 0)
-        application.cv_parser_result = parser_result
-        application.recommendation = parser_result.get("recommendation", "")
+        if resume_text:
+            # Latest CV text feeds re-scoring and the candidate embedding index
+            candidate.cv_text = resume_text
         db.session.commit()
 
+        analysis_job = analysis_queue.submit(
+            application_id=application.id,
+            user_id=candidate.user.id,
+            resume_text=resume_text,
+        )
+
         # --- Notify admins ---
         admins = User.query.filter_by(role="admin").all()
         for admin in admins:
@@ -182,20 +190,38 @@ def upload_resume(application_id):
         db.session.commit()
 
         return jsonify({
-            "message": "Resume uploaded and analyzed",
-            "cv_score": application.cv_score,
-            "missing_skills": parser_result.get("missing_skills", []),
-            "suggestions": parser_result.get("suggestions", []),
-            "recommendation": application.recommendation,
-            "resume_url": resume_url,
-            "raw_parser_text": parser_result.get("raw_text", "")
-        }), 200
+            "message": "Resume uploaded; analysis queued",
+            "job_id": analysis_job["id"],
+            "status": analysis_job["status"],
+            "status_url": f"/api/candidate/analysis_jobs/{analysis_job['id']}",
+            "resume_url": resume_url
+        }), 202
 
     except Exception as e:
         current_app.logger.error(f"Upload resume error: {e}", exc_info=True)
         return jsonify({"error": "Internal server error"}), 500
 
 
+# ----------------- RESUME ANALYSIS JOB STATUS -----------------
+@candidate_bp.route("/analysis_jobs/<string:job_id>", methods=["GET"])
+@role_required(["candidate"])
+def get_analysis_job(job_id):
+    """
+    Poll a queued resume analysis. The same payload is pushed to the
+    candidate's socket room as `resume_analysis_completed` / `resume_analysis_failed`.
+    """
+    try:
+        job = analysis_queue.get_job(job_id)
+        if not job or job.get("user_id") != int(get_jwt_identity()):
+            return jsonify({"error": "Analysis job not found"}), 404
+
+        return jsonify(analysis_queue.public_view(job)), 200
+
+    except Exception as e:
+        current_app.logger.error(f"Get analysis job error: {e}", exc_info=True)
+        return jsonify({"error": "Internal server error"}), 500
+
+
 # ----------------- CANDIDATE APPLICATIONS -----------------
 @candidate_bp.route("/applications", methods=["GET"])
 @role_required(["candidate"])
@@ -271,20 +297,18 @@ def submit_assessment(application_id):
         data = request.get_json()
         answers = data.get("answers", {})
 
-        questions = application.requisition.assessment_pack.get("questions", []) if application.requisition else []
-        scores = {}
-        total_score = 0
-
-        for idx, q in enumerate(questions):
-            qid = str(idx)
-            correct_index = q.get("correct_answer", 0)
-            correct_letter = ["A","B","C","D"][correct_index]
-            candidate_answer = answers.get(qid)
-            scores[qid] = q.get("weight", 1) if candidate_answer == correct_letter else 0
-            total_score += scores[qid]
-
-        max_score = sum(q.get("weight", 1) for q in questions)
-        percentage_score = (total_score / max_score * 100) if max_score else 0
+        # Compiled once per requisition version; answers are {"0": "A", ...}.
+        # Answers to questions the pack does not have are ignored, as before.
+        key = get_answer_key(application.requisition_id)
+        if key:
+            try:
+                is_correct, totals, percentages = key.grade(key.sheet(answers, strict=False))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            scores = {str(i): float(w) if ok else 0 for i, (ok, w) in enumerate(zip(is_correct[0], key.weights))}
+            total_score, percentage_score = float(totals[0]), float(percentages[0])
+        else:
+            scores, total_score, percentage_score = {}, 0, 0
 
         result = AssessmentResult(
             application_id=application.id,
@@ -5,7 +5,6 @@ from app.services.auth_service import AuthService
 from app.services.audit2 import AuditService
 from io import BytesIO
 import pyotp
-import qrcode
 import base64
 from datetime import timedelta
 
@@ -40,7 +39,8 @@ def enable_mfa():
         totp = pyotp.TOTP(secret)
         otpauth_url = totp.provisioning_uri(name=user.email, issuer_name=current_app.config.get('APP_NAME', 'MyApp'))
 
-        # Generate QR code
+        # Generate QR code (qrcode pulls in PIL; imported on first use)
+        import qrcode
         qr = qrcode.QRCode(version=1, box_size=10, border=5)
         qr.add_data(otpauth_url)
         qr.make(fit=True)
@@ -0,0 +1,42 @@
+# app/services/ai_chat_service.py
+import logging
+from typing import Any, Iterator, Optional, Tuple
+
+from app.extensions import db
+from app.models import Conversation
+
+logger = logging.getLogger(__name__)
+
+
+def save_conversation(user_id, user_message: str, assistant_message: str) -> Optional[Conversation]:
+    """Persist one chat exchange; failures are logged and swallowed."""
+    if not user_id:
+        return None
+    try:
+        conv = Conversation(user_id=user_id, user_message=user_message, assistant_message=assistant_message)
+        db.session.add(conv)
+        db.session.commit()
+        return conv
+    except Exception:
+        db.session.rollback()
+        logger.exception("Failed to save conversation")
+        return None
+
+
+def stream_chat(message: str, user_id=None) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream an assistant reply. Yields ("delta", text) for each chunk, then
+    ("done", {"reply", "conversation_id"}) once the full reply has been saved.
+    Upstream errors propagate to the caller.
+    """
+    # Lazy import to avoid cycle
+    from app.services.ai_service import AIService
+
+    chunks = []
+    for delta in AIService().chat_stream(message):
+        chunks.append(delta)
+        yield "delta", delta
+
+    reply = "".join(chunks)
+    conv = save_conversation(user_id, message, reply)
+    yield "done", {"reply": reply, "conversation_id": conv.id if conv else None}
@@ -2,12 +2,11 @@
 import logging
 import re
 from typing import Dict, Any
-from .cv_parser_service import HybridResumeAnalyzer
-import pdfplumber
-import docx
+from .cv_parser_service import get_resume_analyzer
+from .text_extraction import extract_text
+from .skill_taxonomy import get_skill_taxonomy, get_degree_taxonomy, LANGUAGES_CATEGORY
 
 logger = logging.getLogger(__name__)
-analyzer = HybridResumeAnalyzer()  # Singleton instance
 
 class AIParser:
 
@@ -26,7 +25,7 @@ class AIParser:
 
             # Step 1: Try AI parsing
             try:
-                parsed_data = analyzer.analyse(resume_content=cv_text, job_id=job_id)
+                parsed_data = get_resume_analyzer().analyse(resume_content=cv_text, job_id=job_id)
             except Exception as e:
                 logger.warning(f"AI parsing failed: {e}")
                 parsed_data = {}
@@ -58,7 +57,7 @@ class AIParser:
     @staticmethod
     def offline_extract(cv_text: str) -> Dict[str, Any]:
         """
-        Basic regex-based extraction to ensure minimal auto-fill.
+        Basic regex + skill-taxonomy extraction to ensure minimal auto-fill.
         """
         # Extract email
         email_match = re.search(r'[\w\.-]+@[\w\.-]+', cv_text)
@@ -72,13 +71,14 @@ class AIParser:
         name_match = re.search(r'([A-Z][a-z]+(?:\s[A-Z][a-z]+)?)', cv_text)
         full_name = name_match.group(0) if name_match else ""
 
-        # Extract skills (simple keyword matching)
-        skill_keywords = ["Python", "Java", "Flutter", "Dart", "React", "SQL", "Node", "AWS"]
-        skills = [skill for skill in skill_keywords if re.search(rf'\b{skill}\b', cv_text, re.I)]
+        # Extract skills and spoken languages (one pass of the compiled skill taxonomy)
+        taxonomy = get_skill_taxonomy()
+        found = taxonomy.extract(cv_text)
+        skills = [skill for skill in found if taxonomy.categories[skill] != LANGUAGES_CATEGORY]
+        languages = [skill for skill in found if taxonomy.categories[skill] == LANGUAGES_CATEGORY]
 
-        # Extract education (look for common degree keywords)
-        education_keywords = ["BSc", "MSc", "Bachelor", "Master", "PhD", "Diploma"]
-        education = [edu for edu in education_keywords if re.search(rf'\b{edu}\b', cv_text, re.I)]
+        # Extract education (degree / qualification names)
+        education = get_degree_taxonomy().extract(cv_text)
 
         return {
             "full_name": full_name,
@@ -91,7 +91,7 @@ class AIParser:
             "education": education,
             "skills": skills,
             "certifications": [],
-            "languages": [],
+            "languages": languages,
             "experience": "",
             "position": "",
             "previous_companies": [],
@@ -103,18 +103,5 @@ class AIParser:
 
     @staticmethod
     def read_cv_file(cv_file) -> str:
-        import os, tempfile
-        temp_path = os.path.join(tempfile.gettempdir(), cv_file.filename)
-        cv_file.save(temp_path)
-        text = ""
-        if cv_file.filename.lower().endswith(".pdf"):
-            with pdfplumber.open(temp_path) as pdf:
-                text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-        elif cv_file.filename.lower().endswith(".docx"):
-            doc = docx.Document(temp_path)
-            text = "\n".join(p.text for p in doc.paragraphs)
-        else:
-            # fallback for TXT
-            with open(temp_path, "r", encoding="utf-8", errors="ignore") as f:
-                text = f.read()
-        return text
\ No newline at end of file
+        """Extract CV text straight from the upload stream (no temp file)."""
+        return extract_text(cv_file)
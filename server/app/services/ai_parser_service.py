@@ -1,10 +1,16 @@
 # app/services/cv_parser_service.py
 from .ai_service import AIService
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Tuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import os
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+BATCH_ANALYSIS_WORKERS = int(os.environ.get("BATCH_ANALYSIS_WORKERS", 4))
+BATCH_ANALYSIS_ITEM_TIMEOUT = float(os.environ.get("BATCH_ANALYSIS_ITEM_TIMEOUT", 90))
+
 ai = AIService()
 
 def analyse_resume_gemini(cv_text: str, job_description: str) -> Dict[str, Any]:
@@ -24,3 +30,47 @@ def analyse_resume_gemini(cv_text: str, job_description: str) -> Dict[str, Any]:
             "interview_questions": [],
             "error": str(e)
         }
+
+
+def analyse_resumes_batch(
+    pairs: List[Tuple[str, str]],
+    max_workers: int = BATCH_ANALYSIS_WORKERS,
+    item_timeout: float = BATCH_ANALYSIS_ITEM_TIMEOUT,
+) -> Iterator[Tuple[int, str, Dict[str, Any]]]:
+    """
+    Run analyse_resume_gemini over many (cv_text, job_description) pairs on a
+    bounded thread pool. Yields (index, status, result) as items finish, where
+    status is "ok", "error" or "timeout". An item times out `item_timeout`
+    seconds after it starts running; its thread is left to finish on its own.
+    """
+    started_at: Dict[int, float] = {}
+
+    def run(index, cv_text, job_description):
+        started_at[index] = time.monotonic()
+        return analyse_resume_gemini(cv_text=cv_text, job_description=job_description)
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cv-batch")
+    try:
+        pending = {
+            executor.submit(run, index, cv_text, job_description): index
+            for index, (cv_text, job_description) in enumerate(pairs)
+        }
+        while pending:
+            running = [started_at[i] for i in pending.values() if i in started_at]
+            wait_for = max(0.0, min(running) + item_timeout - time.monotonic()) if running else item_timeout
+            done, _ = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                index = pending.pop(future)
+                result = future.result()
+                yield index, "error" if result.get("error") else "ok", result
+
+            now = time.monotonic()
+            for future, index in list(pending.items()):
+                if index in started_at and now - started_at[index] >= item_timeout:
+                    del pending[future]
+                    future.cancel()
+                    yield index, "timeout", {"error": f"Analysis timed out after {item_timeout:.0f}s"}
+    finally:
+        # Don't block the caller on threads still running timed-out items
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -1,10 +1,14 @@
 import os
-import requests
 import json
-import logging
 import time
-from typing import Dict, Any, Optional
+import logging
+from typing import Dict, Any, Iterator, Optional
 from dotenv import load_dotenv
+from app.services.analysis_cache import cached_analysis
+from app.services.llm_client import get_llm_client
+from app.services.prompt_compaction import (
+    compact_prompt_inputs, compaction_stats, PROMPT_CV_TOKEN_BUDGET, PROMPT_JOB_TOKEN_BUDGET
+)
 
 
 # ----------------------------
@@ -15,26 +19,26 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
-OPENROUTER_URL = os.environ.get(
-    "OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions"
-)
 DEFAULT_MODEL = os.environ.get("OPENROUTER_MODEL", "openai/gpt-4o-mini")
 
 
 class AIService:
+    # Bump when the analysis prompt changes so cached analyses are not reused
+    ANALYZER_VERSION = "cv-vs-job-v1"
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         timeout: int = 60,
         retries: int = 3,
-        backoff: int = 5,
     ):
         self.api_key = api_key or OPENROUTER_API_KEY
         self.model = model or DEFAULT_MODEL
         self.timeout = timeout
         self.retries = retries
-        self.backoff = backoff
+        # Pooled session, bulkhead, backoff and circuit breaker are shared per provider
+        self.client = get_llm_client("openrouter")
 
         if not self.api_key:
             logger.warning(
@@ -47,63 +51,62 @@ class AIService:
         if not self.api_key:
             raise RuntimeError("OPENROUTER_API_KEY not set")
 
-        headers = {
-            "Content-Type": "application/json",
-            "Authorization": f"Bearer {self.api_key}",
-        }
-
-        payload = {
-            "model": self.model,
-            "messages": [
-                {"role": "system", "content": "You are an expert recruitment assistant."},
-                {"role": "user", "content": prompt},
-            ],
-            "temperature": temperature,
-            "max_tokens": max_output_tokens,
-        }
-
-        for attempt in range(1, self.retries + 1):
-            try:
-                resp = requests.post(
-                    OPENROUTER_URL, headers=headers, json=payload, timeout=self.timeout
-                )
-                if resp.status_code != 200:
-                    logger.error(
-                        "OpenRouter API error [%s]: %s", resp.status_code, resp.text
-                    )
-                    raise RuntimeError(
-                        f"OpenRouter API error: {resp.status_code} {resp.text}"
-                    )
-                data = resp.json()
-                return data["choices"][0]["message"]["content"]
-            except requests.exceptions.Timeout:
-                logger.warning(
-                    "Timeout on attempt %d/%d, retrying in %d seconds...",
-                    attempt,
-                    self.retries,
-                    self.backoff,
-                )
-                time.sleep(self.backoff)
-            except requests.exceptions.RequestException as e:
-                logger.error(
-                    "RequestException on attempt %d/%d: %s", attempt, self.retries, e
-                )
-                time.sleep(self.backoff)
-            except Exception as e:
-                logger.exception(
-                    "Unexpected error on attempt %d/%d: %s", attempt, self.retries, e
-                )
-                time.sleep(self.backoff)
-
-        raise RuntimeError("Failed to call OpenRouter API after multiple retries")
+        return self.client.chat_completion(
+            self._messages(prompt),
+            model=self.model,
+            temperature=temperature,
+            max_tokens=max_output_tokens,
+            timeout=self.timeout,
+            retries=self.retries,
+            api_key=self.api_key,
+        )
+
+    @staticmethod
+    def _messages(prompt: str):
+        return [
+            {"role": "system", "content": "You are an expert recruitment assistant."},
+            {"role": "user", "content": prompt},
+        ]
+
+    @staticmethod
+    def _chat_prompt(message: str) -> str:
+        return f"User:\n{message}\n\nAssistant:"
 
     def chat(self, message: str, temperature: float = 0.2) -> str:
-        prompt = f"User:\n{message}\n\nAssistant:"
-        return self._call_generation(prompt, temperature=temperature, max_output_tokens=400)
+        return self._call_generation(self._chat_prompt(message), temperature=temperature, max_output_tokens=400)
+
+    def chat_stream(self, message: str, temperature: float = 0.2) -> Iterator[str]:
+        """Same as chat(), but yields the reply in chunks as they arrive."""
+        if not self.api_key:
+            raise RuntimeError("OPENROUTER_API_KEY not set")
+        return self.client.stream_chat_completion(
+            self._messages(self._chat_prompt(message)),
+            model=self.model,
+            temperature=temperature,
+            max_tokens=400,
+            timeout=self.timeout,
+            api_key=self.api_key,
+        )
 
     def analyze_cv_vs_job(
         self, cv_text: str, job_description: str, want_json: bool = True
     ) -> Dict[str, Any]:
+        """
+        Compare a CV with a job description. Results are cached by content hash
+        of (model, CV, job description); unparseable model output is not cached.
+        """
+        return cached_analysis(
+            f"{self.ANALYZER_VERSION}:{self.model}:{PROMPT_CV_TOKEN_BUDGET}:{PROMPT_JOB_TOKEN_BUDGET}",
+            cv_text,
+            job_description,
+            lambda: self._analyze_cv_vs_job(cv_text, job_description),
+            cacheable=lambda parsed: "raw_output" not in parsed,
+        )
+
+    def _analyze_cv_vs_job(self, cv_text: str, job_description: str) -> Dict[str, Any]:
+        # Section-aware trim of both inputs to the prompt token budget
+        cv_text, job_description, tokens = compact_prompt_inputs(cv_text, job_description)
+
         prompt = f"""
 You are a hiring assistant specializing in parsing resumes and comparing them to job descriptions.
 Please analyze the candidate CV below and the job description below.
@@ -123,7 +126,11 @@ Task:
 
 Return the response strictly as JSON.
 """
+        started = time.perf_counter()
         out = self._call_generation(prompt, temperature=0.0, max_output_tokens=700)
+        compaction_stats.record(
+            "analyze_cv_vs_job", tokens["tokens_before"], tokens["tokens_after"], time.perf_counter() - started
+        )
 
         # Try to parse JSON safely
         import re
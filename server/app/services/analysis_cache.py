@@ -0,0 +1,61 @@
+# app/services/analysis_cache.py
+import os
+import re
+import copy
+import hashlib
+import logging
+from typing import Any, Callable, Dict, Optional
+
+from app.utils.cache import LRUCache, RedisCache, TieredCache
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_CACHE_SIZE = int(os.environ.get("ANALYSIS_CACHE_SIZE", 2048))
+ANALYSIS_CACHE_TTL = int(os.environ.get("ANALYSIS_CACHE_TTL", 7 * 24 * 3600))
+ANALYSIS_CACHE_REDIS_URL = os.environ.get("ANALYSIS_CACHE_REDIS_URL")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Collapse whitespace so re-extractions of the same document hash identically."""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def analysis_cache_key(analyzer_version: str, cv_text: str, job_description: str) -> str:
+    """Content address of one CV-vs-job analysis: sha256(version, normalized CV, normalized job)."""
+    digest = hashlib.sha256()
+    for part in (analyzer_version, normalize_text(cv_text), normalize_text(job_description)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+def _build_cache() -> TieredCache:
+    remote = None
+    if ANALYSIS_CACHE_REDIS_URL:
+        try:
+            remote = RedisCache(ANALYSIS_CACHE_REDIS_URL, prefix="analysis:", ttl=ANALYSIS_CACHE_TTL)
+        except Exception as e:
+            logger.error(f"Analysis cache Redis tier disabled: {e}")
+    return TieredCache(LRUCache(maxsize=ANALYSIS_CACHE_SIZE, ttl=ANALYSIS_CACHE_TTL), remote)
+
+
+analysis_cache = _build_cache()
+
+
+def cached_analysis(
+    analyzer_version: str,
+    cv_text: str,
+    job_description: str,
+    compute: Callable[[], Dict[str, Any]],
+    cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Dict[str, Any]:
+    """
+    Return the cached result for (analyzer_version, cv_text, job_description),
+    running `compute` on a miss. Results rejected by `cacheable` (e.g. degraded
+    fallbacks) are returned but not stored. Callers get a private copy.
+    """
+    key = analysis_cache_key(analyzer_version, cv_text, job_description)
+    result = analysis_cache.get_or_compute(key, compute, cacheable)
+    return copy.deepcopy(result)
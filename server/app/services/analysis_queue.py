@@ -0,0 +1,320 @@
+# app/services/analysis_queue.py
+import json
+import time
+import uuid
+import queue
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+from typing import Any, Dict, Optional
+
+from app.extensions import db, socketio
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+# Fields never exposed through the status endpoint
+_PRIVATE_FIELDS = {"resume_text", "available_at"}
+
+
+# ----------------------------
+# Queue Backends
+# ----------------------------
+class MemoryQueueBackend:
+    """In-process queue; jobs live only as long as this worker process."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job):
+        with self._lock:
+            self._jobs[job["id"]] = dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def enqueue(self, job):
+        self.save(job)
+        self._queue.put(job["id"])
+
+    def dequeue(self, timeout=1.0):
+        try:
+            job_id = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+        job = self.get(job_id)
+        if job and job.get("available_at", 0) > time.time():
+            # Retry not due yet: put it back and let the caller poll again
+            self._queue.put(job_id)
+            time.sleep(min(timeout, 0.1))
+            return None
+        return job
+
+
+class SQLiteQueueBackend:
+    """Durable single-host queue shared by web and worker processes through one SQLite file."""
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS analysis_jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    available_at REAL NOT NULL,
+                    data TEXT NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_analysis_jobs_ready ON analysis_jobs (status, available_at)"
+            )
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+
+    def save(self, job):
+        with closing(self._connect()) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO analysis_jobs (id, status, available_at, data) VALUES (?, ?, ?, ?)",
+                (job["id"], job["status"], job.get("available_at", 0), json.dumps(job)),
+            )
+
+    def get(self, job_id):
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT data FROM analysis_jobs WHERE id = ?", (job_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def enqueue(self, job):
+        self.save(job)
+
+    def dequeue(self, timeout=1.0):
+        conn = self._connect()
+        try:
+            # BEGIN IMMEDIATE takes the write lock so two workers cannot claim the same job
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT id, data FROM analysis_jobs WHERE status = ? AND available_at <= ? "
+                "ORDER BY available_at LIMIT 1",
+                (QUEUED, time.time()),
+            ).fetchone()
+            if not row:
+                conn.execute("COMMIT")
+                time.sleep(timeout)
+                return None
+
+            job = json.loads(row[1])
+            job["status"] = RUNNING
+            conn.execute(
+                "UPDATE analysis_jobs SET status = ?, data = ? WHERE id = ?",
+                (RUNNING, json.dumps(job), row[0]),
+            )
+            conn.execute("COMMIT")
+            return job
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+
+class RedisQueueBackend:
+    """Multi-host queue: a Redis list of ready job ids plus a sorted set of delayed retries."""
+
+    QUEUE_KEY = "analysis:queue"
+    DELAYED_KEY = "analysis:delayed"
+    JOB_KEY = "analysis:job:{}"
+    JOB_TTL = 7 * 24 * 3600
+
+    def __init__(self, url):
+        import redis
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def save(self, job):
+        self.redis.set(self.JOB_KEY.format(job["id"]), json.dumps(job), ex=self.JOB_TTL)
+
+    def get(self, job_id):
+        raw = self.redis.get(self.JOB_KEY.format(job_id))
+        return json.loads(raw) if raw else None
+
+    def enqueue(self, job):
+        self.save(job)
+        if job.get("available_at", 0) > time.time():
+            self.redis.zadd(self.DELAYED_KEY, {job["id"]: job["available_at"]})
+        else:
+            self.redis.lpush(self.QUEUE_KEY, job["id"])
+
+    def _promote_due_retries(self):
+        for job_id in self.redis.zrangebyscore(self.DELAYED_KEY, 0, time.time()):
+            # zrem is atomic, so only one worker moves each retry back onto the queue
+            if self.redis.zrem(self.DELAYED_KEY, job_id):
+                self.redis.lpush(self.QUEUE_KEY, job_id)
+
+    def dequeue(self, timeout=1.0):
+        self._promote_due_retries()
+        item = self.redis.brpop(self.QUEUE_KEY, timeout=max(1, int(timeout)))
+        if not item:
+            return None
+        return self.get(item[1])
+
+
+# ----------------------------
+# Analysis Queue
+# ----------------------------
+class AnalysisQueue:
+    """
+    Runs resume analysis (online -> embedding -> keyword fallback) outside the
+    HTTP request. Results are written to Application.cv_parser_result and pushed
+    to the candidate's `user_{id}` Socket.IO room.
+
+    Backends: "memory" (default, in-process), "sqlite" and "redis". With the
+    durable backends, jobs can be consumed by `flask analysis-worker` processes.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.backend = None
+        self.max_attempts = 3
+        self.retry_delay = 5
+        self.worker_count = 2
+        self._workers = []
+        self._workers_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+        self.max_attempts = app.config.get("ANALYSIS_JOB_MAX_ATTEMPTS", 3)
+        self.retry_delay = app.config.get("ANALYSIS_JOB_RETRY_DELAY", 5)
+        self.worker_count = app.config.get("ANALYSIS_QUEUE_WORKERS", 2)
+
+        backend = app.config.get("ANALYSIS_QUEUE_BACKEND", "memory")
+        url = app.config.get("ANALYSIS_QUEUE_URL")
+        if backend == "sqlite":
+            self.backend = SQLiteQueueBackend(url or "analysis_jobs.sqlite3")
+        elif backend == "redis":
+            self.backend = RedisQueueBackend(url or "redis://localhost:6379/0")
+        else:
+            self.backend = MemoryQueueBackend()
+
+    # ----------------------------
+    # Producer API
+    # ----------------------------
+    def submit(self, application_id: int, user_id: int, resume_text: str) -> Dict[str, Any]:
+        """Queue an analysis job and return its public status record."""
+        now = time.time()
+        job = {
+            "id": uuid.uuid4().hex,
+            "application_id": application_id,
+            "user_id": user_id,
+            "resume_text": resume_text or "",
+            "status": QUEUED,
+            "attempts": 0,
+            "max_attempts": self.max_attempts,
+            "error": None,
+            "result": None,
+            "created_at": now,
+            "updated_at": now,
+            "available_at": now,
+        }
+        self.backend.enqueue(job)
+        self._ensure_workers()
+        return self.public_view(job)
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.backend.get(job_id)
+
+    @staticmethod
+    def public_view(job: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in job.items() if k not in _PRIVATE_FIELDS}
+
+    # ----------------------------
+    # Worker API
+    # ----------------------------
+    def run_worker(self, stop_event: Optional[threading.Event] = None, poll_timeout: float = 1.0):
+        """Consume jobs until `stop_event` is set. Used by in-process threads and `flask analysis-worker`."""
+        stop_event = stop_event or threading.Event()
+        while not stop_event.is_set():
+            try:
+                job = self.backend.dequeue(timeout=poll_timeout)
+            except Exception as e:
+                logger.error(f"Analysis queue dequeue failed: {e}")
+                time.sleep(poll_timeout)
+                continue
+            if job:
+                with self.app.app_context():
+                    try:
+                        self.process(job)
+                    finally:
+                        db.session.remove()
+
+    def process(self, job: Dict[str, Any]):
+        """Run one job; reschedules with exponential backoff until max_attempts is reached."""
+        from app.models import Application
+        from app.services.cv_parser_service import get_resume_analyzer
+
+        job.update(status=RUNNING, attempts=job["attempts"] + 1, updated_at=time.time())
+        self.backend.save(job)
+
+        try:
+            application = db.session.get(Application, job["application_id"])
+            if not application:
+                raise ValueError(f"Application {job['application_id']} not found")
+
+            result = get_resume_analyzer().analyse(job["resume_text"], application.requisition_id)
+
+            application.cv_score = result.get("match_score", 0)
+            application.cv_parser_result = result
+            application.recommendation = result.get("recommendation", "")
+            db.session.commit()
+
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Analysis job {job['id']} attempt {job['attempts']} failed: {e}", exc_info=True)
+            job.update(error=str(e), updated_at=time.time())
+
+            if job["attempts"] < job["max_attempts"]:
+                job.update(
+                    status=QUEUED,
+                    available_at=time.time() + self.retry_delay * 2 ** (job["attempts"] - 1),
+                )
+                self.backend.enqueue(job)
+            else:
+                job["status"] = FAILED
+                self.backend.save(job)
+                self._push(job, "resume_analysis_failed")
+            return
+
+        job.update(status=COMPLETED, result=result, error=None, updated_at=time.time())
+        self.backend.save(job)
+        self._push(job, "resume_analysis_completed")
+
+    def _push(self, job, event):
+        try:
+            socketio.emit(event, self.public_view(job), room=f"user_{job['user_id']}")
+        except Exception as e:
+            logger.warning(f"Failed to push {event} for job {job['id']}: {e}")
+
+    def _ensure_workers(self):
+        """Lazily start in-process worker threads on first submit (not at import or CLI start-up)."""
+        if self.worker_count <= 0 or self._workers:
+            return
+        with self._workers_lock:
+            if self._workers:
+                return
+            for i in range(self.worker_count):
+                worker = threading.Thread(
+                    target=self.run_worker, name=f"analysis-worker-{i}", daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+
+analysis_queue = AnalysisQueue()
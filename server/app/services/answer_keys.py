@@ -0,0 +1,157 @@
+# app/services/answer_keys.py
+"""
+Compiled assessment answer keys and vectorised grading.
+
+A requisition's `assessment_pack` is compiled once per version (id +
+updated_at) into two compact arrays: the correct option index per question
+(int16) and its weight (float32). Answer sheets are normalised to option
+indices (-1 = unanswered), so grading one sheet or ten thousand is the same
+NumPy comparison. `invalidate_answer_key` is called when a pack is replaced.
+"""
+from __future__ import annotations
+
+import os
+import logging
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+
+from app.extensions import db
+from app.models import Requisition
+from app.utils.cache import LRUCache
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+ANSWER_KEY_CACHE_SIZE = int(os.environ.get("ANSWER_KEY_CACHE_SIZE", 512))
+OPTION_LETTERS = "ABCDEFGHIJ"
+UNANSWERED = -1
+
+
+def option_index(value) -> int:
+    """Option as an index: 2, "2" and "C" are all the third option; anything else is unanswered."""
+    if isinstance(value, bool) or value is None:
+        return UNANSWERED
+    if isinstance(value, (int, float)):
+        return int(value)
+    value = str(value).strip()
+    if value.isdigit():
+        return int(value)
+    if len(value) == 1 and value.upper() in OPTION_LETTERS:
+        return OPTION_LETTERS.index(value.upper())
+    return UNANSWERED
+
+
+class AnswerKey:
+    """Correct option and weight per question of one assessment pack version."""
+
+    __slots__ = ("requisition_id", "version", "correct", "weights", "max_score")
+
+    def __init__(self, requisition_id: int, version: str, questions: List[Dict[str, Any]]):
+        import numpy as np
+
+        self.requisition_id = requisition_id
+        self.version = version
+        # Packs created through AssessmentService use "correct_option", the job form "correct_answer"
+        self.correct = np.array(
+            [option_index(q.get("correct_option", q.get("correct_answer", 0))) for q in questions],
+            dtype=np.int16,
+        )
+        self.weights = np.array([float(q.get("weight", 1) or 0) for q in questions], dtype=np.float32)
+        self.max_score = float(self.weights.sum())
+
+    def __len__(self):
+        return len(self.correct)
+
+    # ----------------------------
+    # Answer sheets
+    # ----------------------------
+    def sheet(self, answers, strict: bool = True) -> np.ndarray:
+        """
+        Selected option per question (int16, -1 = unanswered) from either sheet format:
+        [{"question_index": i, "selected_option": o}, ...] or {"0": "A", "1": 2, ...}.
+        Raises ValueError for malformed entries or out-of-range question indices;
+        with `strict=False` answers to unknown questions are ignored instead.
+        """
+        import numpy as np
+
+        selected = np.full(len(self), UNANSWERED, dtype=np.int16)
+        if isinstance(answers, dict):
+            pairs = answers.items()
+        elif isinstance(answers, list):
+            pairs = []
+            for answer in answers:
+                if not isinstance(answer, dict) or answer.get("question_index") is None \
+                        or answer.get("selected_option") is None:
+                    raise ValueError("Each answer must include question_index and selected_option")
+                pairs.append((answer["question_index"], answer["selected_option"]))
+        else:
+            raise ValueError("answers must be a list or an object")
+
+        for question, option in pairs:
+            try:
+                index = int(question)
+            except (TypeError, ValueError):
+                if not strict:
+                    continue
+                raise ValueError(f"Invalid question index: {question}")
+            if index < 0 or index >= len(self):
+                if not strict:
+                    continue
+                raise ValueError(f"Invalid question index: {index}")
+            option = option_index(option)
+            # Options beyond int16 cannot be right; store them as unanswered
+            selected[index] = option if UNANSWERED <= option < 2 ** 15 else UNANSWERED
+        return selected
+
+    # ----------------------------
+    # Grading
+    # ----------------------------
+    def grade(self, sheets: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Grade a (sheets x questions) matrix of selected options in one pass.
+        Returns (is_correct matrix, weighted total per sheet, percentage per sheet).
+        """
+        import numpy as np
+
+        sheets = np.atleast_2d(sheets)
+        is_correct = sheets == self.correct
+        # Weights are small integers in practice, so float32 sums are exact; report in float64
+        totals = (is_correct @ self.weights).astype(np.float64)
+        percentages = totals / self.max_score * 100 if self.max_score else np.zeros(len(sheets))
+        return is_correct, totals, percentages
+
+
+# ----------------------------
+# Cache
+# ----------------------------
+_answer_keys = LRUCache(maxsize=ANSWER_KEY_CACHE_SIZE)
+
+
+def _version(updated_at) -> str:
+    return updated_at.isoformat() if updated_at else ""
+
+
+def get_answer_key(requisition_id: int) -> Optional[AnswerKey]:
+    """
+    Compiled answer key for the current version of a requisition's pack
+    (None if the requisition does not exist). Only `updated_at` is read
+    while the cached key is current.
+    """
+    row = db.session.query(Requisition.updated_at).filter(Requisition.id == requisition_id).first()
+    if row is None:
+        return None
+    version = _version(row.updated_at)
+
+    key = _answer_keys.get(str(requisition_id))
+    if key is not None and key.version == version:
+        return key
+
+    pack = db.session.query(Requisition.assessment_pack).filter(Requisition.id == requisition_id).scalar() or {}
+    key = AnswerKey(requisition_id, version, pack.get("questions") or [])
+    _answer_keys.set(str(requisition_id), key)
+    return key
+
+
+def invalidate_answer_key(requisition_id: int):
+    _answer_keys.delete(str(requisition_id))
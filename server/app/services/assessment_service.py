@@ -1,5 +1,8 @@
 from app.extensions import db
 from app.models import Requisition, Application, AssessmentResult
+from app.services.answer_keys import UNANSWERED, get_answer_key, invalidate_answer_key
+from app.services.rollups import rebuild_rollups
+from sqlalchemy import case, insert, update
 from datetime import datetime
 
 
@@ -10,7 +13,7 @@ class AssessmentService:
         """
         Add or update MCQ assessment for a requisition/job.
         `questions` is a list of dicts:
-        {"question_text": str, "options": list[str], "correct_option": int}
+        {"question_text": str, "options": list[str], "correct_option": int, "weight": float (optional)}
         """
         requisition = Requisition.query.get(requisition_id)
         if not requisition:
@@ -18,61 +21,44 @@ class AssessmentService:
         
         requisition.assessment_pack = {"questions": questions}
         db.session.commit()
+        invalidate_answer_key(requisition.id)
         return requisition.assessment_pack
 
     @staticmethod
     def submit_candidate_assessment(application_id, candidate_answers):
         """
         candidate_answers: [{"question_index": int, "selected_option": int}]
-        Calculates raw score and percentage, then stores in AssessmentResult.
+        Grades against the requisition's compiled answer key, then stores in AssessmentResult.
         """
-        application = Application.query.get(application_id)
-        if not application:
+        # Application and any existing result in one query
+        row = (
+            db.session.query(Application, AssessmentResult.id)
+            .outerjoin(AssessmentResult, AssessmentResult.application_id == Application.id)
+            .filter(Application.id == application_id)
+            .first()
+        )
+        if not row:
             raise ValueError("Application not found")
+        application, existing_id = row
 
-        questions = application.requisition.assessment_pack.get("questions", [])
-        if not questions:
+        key = get_answer_key(application.requisition_id)
+        if not key:
             raise ValueError("No assessment found for this requisition")
 
         # prevent duplicate submissions
-        existing = AssessmentResult.query.filter_by(application_id=application.id).first()
-        if existing:
+        if existing_id:
             raise ValueError("Candidate has already submitted this assessment")
 
-        score = 0
-        detailed_scores = []
-
-        for ans in candidate_answers:
-            q_index = ans.get("question_index")
-            selected = ans.get("selected_option")
-
-            if q_index is None or selected is None:
-                raise ValueError("Each answer must include question_index and selected_option")
-
-            if q_index < 0 or q_index >= len(questions):
-                raise ValueError(f"Invalid question index: {q_index}")
-
-            correct = questions[q_index]["correct_option"]
-            is_correct = selected == correct
-            if is_correct:
-                score += 1
-
-            detailed_scores.append({
-                "question_index": q_index,
-                "selected_option": selected,
-                "correct_option": correct,
-                "is_correct": is_correct
-            })
-
-        total_questions = len(questions)
-        percentage_score = (score / total_questions) * 100 if total_questions > 0 else 0
+        selected = key.sheet(candidate_answers)
+        is_correct, totals, percentages = key.grade(selected)
+        score, percentage_score = float(totals[0]), float(percentages[0])
 
         # store assessment result
         result = AssessmentResult(
             application_id=application.id,
             candidate_id=application.candidate_id,
             answers=candidate_answers,
-            scores=detailed_scores,
+            scores=AssessmentService._detailed_scores(key, selected, is_correct[0]),
             total_score=score,
             percentage_score=percentage_score,
             assessed_at=datetime.utcnow()
@@ -91,6 +77,117 @@ class AssessmentService:
             "submitted_at": result.assessed_at.isoformat()
         }
 
+    @staticmethod
+    def _detailed_scores(key, selected, is_correct):
+        return [
+            {
+                "question_index": index,
+                "selected_option": int(selected[index]),
+                "correct_option": int(key.correct[index]),
+                "is_correct": bool(is_correct[index]),
+            }
+            for index in range(len(key))
+            if selected[index] != UNANSWERED
+        ]
+
+    @staticmethod
+    def bulk_grade(requisition_id, sheets):
+        """
+        Grade many imported answer sheets for one requisition in a single vectorised pass.
+        `sheets`: [{"application_id": int, "answers": <either answer format>}]
+
+        Sheets for unknown applications, other requisitions, already-assessed
+        applications, duplicates or malformed answers are skipped and reported.
+        All AssessmentResult rows are inserted in one batch, assessment scores are
+        written with one UPDATE, and overall scores are refreshed from the job weightings.
+        """
+        import numpy as np
+        from app.services.shortlist_service import job_weights, refresh_overall_scores
+
+        requisition = db.session.get(Requisition, requisition_id)
+        if not requisition:
+            raise ValueError("Requisition not found")
+        key = get_answer_key(requisition_id)
+        if not key:
+            raise ValueError("No assessment found for this requisition")
+
+        ids = list({sheet.get("application_id") for sheet in sheets
+                    if isinstance(sheet, dict) and isinstance(sheet.get("application_id"), int)})
+        known = {}
+        for start in range(0, len(ids), 1000):
+            chunk = ids[start:start + 1000]
+            known.update({
+                row.id: row for row in
+                db.session.query(Application.id, Application.candidate_id, Application.requisition_id,
+                                 AssessmentResult.id.label("result_id"))
+                .outerjoin(AssessmentResult, AssessmentResult.application_id == Application.id)
+                .filter(Application.id.in_(chunk))
+            })
+
+        skipped, accepted, rows = [], [], []
+        seen = set()
+        for sheet in sheets:
+            application_id = sheet.get("application_id") if isinstance(sheet, dict) else None
+            app = known.get(application_id)
+            reason = None
+            if app is None:
+                reason = "Application not found"
+            elif app.requisition_id != requisition_id:
+                reason = "Application belongs to another requisition"
+            elif app.result_id is not None or application_id in seen:
+                reason = "Assessment already submitted"
+            if reason is None:
+                try:
+                    rows.append(key.sheet(sheet.get("answers")))
+                except ValueError as e:
+                    reason = str(e)
+            if reason:
+                skipped.append({"application_id": application_id, "error": reason})
+                continue
+            seen.add(application_id)
+            accepted.append((app, sheet.get("answers")))
+
+        if not accepted:
+            return {"graded": 0, "skipped": skipped, "results": []}
+
+        selected = np.vstack(rows)
+        is_correct, totals, percentages = key.grade(selected)
+
+        now = datetime.utcnow()
+        db.session.execute(insert(AssessmentResult), [
+            {
+                "application_id": app.id,
+                "candidate_id": app.candidate_id,
+                "answers": answers,
+                "scores": AssessmentService._detailed_scores(key, selected[i], is_correct[i]),
+                "total_score": float(totals[i]),
+                "percentage_score": float(percentages[i]),
+                "assessed_at": now,
+                "created_at": now,
+            }
+            for i, (app, answers) in enumerate(accepted)
+        ])
+        percentage_by_id = {app.id: float(percentages[i]) for i, (app, _) in enumerate(accepted)}
+        db.session.execute(
+            update(Application)
+            .where(Application.id.in_(list(percentage_by_id)))
+            .values(assessment_score=case(percentage_by_id, value=Application.id), assessed_date=now)
+            .execution_options(synchronize_session=False)
+        )
+        refresh_overall_scores(requisition_id, *job_weights(requisition))
+        # Results were inserted outside the ORM hooks
+        rebuild_rollups(requisition_id=requisition_id)
+        db.session.commit()
+
+        return {
+            "graded": len(accepted),
+            "skipped": skipped,
+            "results": [
+                {"application_id": app.id, "total_score": float(totals[i]), "percentage": float(percentages[i])}
+                for i, (app, _) in enumerate(accepted)
+            ],
+        }
+
     @staticmethod
     def get_candidate_assessment(application_id):
         return AssessmentResult.query.filter_by(application_id=application_id).first()
@@ -98,17 +195,15 @@ class AssessmentService:
     @staticmethod
     def shortlist_candidates(requisition_id, cv_weight=60, assessment_weight=40):
         """
-        Calculate overall score based on CV and assessment.
+        Calculate overall score based on CV and assessment (one bulk UPDATE).
         Returns candidates sorted by overall_score descending.
         """
-        applications = Application.query.filter_by(requisition_id=requisition_id).all()
-        shortlisted = []
-        for app in applications:
-            overall = (
-                (app.candidate.cv_score * cv_weight / 100) +
-                (app.assessment_score * assessment_weight / 100)
-            )
-            app.overall_score = overall
-            db.session.commit()
-            shortlisted.append(app)
-        return sorted(shortlisted, key=lambda x: x.overall_score, reverse=True)
+        from app.services.shortlist_service import refresh_overall_scores
+
+        refresh_overall_scores(requisition_id, cv_weight, assessment_weight)
+        db.session.commit()
+        return (
+            Application.query.filter_by(requisition_id=requisition_id)
+            .order_by(Application.overall_score.desc(), Application.id)
+            .all()
+        )
@@ -0,0 +1,362 @@
+# app/services/candidate_index.py
+from __future__ import annotations
+
+import os
+import json
+import logging
+import threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+
+from app.extensions import db
+from app.models import Candidate
+from app.services.model_registry import embedding_model_tag
+from app.services.embedding_service import EMBEDDING_DTYPE, encode_texts
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking (single-worker dev servers only)
+    fcntl = None
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+CANDIDATE_INDEX_DIR = os.environ.get("CANDIDATE_INDEX_DIR", "instance/candidate_index")
+CANDIDATE_INDEX_BATCH_SIZE = int(os.environ.get("CANDIDATE_INDEX_BATCH_SIZE", 64))
+
+_INITIAL_CAPACITY = 1024
+_FREE_ROW = -1
+
+
+class CandidateIndex:
+    """
+    Embedding store for Candidate.cv_text backed by memory-mapped files:
+
+    - embeddings.f32: (capacity, dim) float32 matrix of L2-normalised rows
+    - ids.i64:        candidate id per row (-1 = free row)
+    - meta.json:      model name, dim, capacity and row count
+
+    Ranking is one matrix-vector product followed by argpartition top-K, so it
+    stays in the millisecond range for ~100k profiles. Rows are upserted
+    incrementally when a CV changes; other processes sharing the directory
+    pick up the new id map when meta.json changes. Writers hold an exclusive
+    flock on `index.lock` (readers a shared one), so concurrent workers never
+    interleave row, id and meta writes.
+    """
+
+    def __init__(self, directory: str = CANDIDATE_INDEX_DIR):
+        self.directory = directory
+        self.dim = None
+        self.capacity = 0
+        self.count = 0
+        self._matrix = None
+        self._ids = None
+        self._rows: Dict[int, int] = {}
+        self._free: List[int] = []
+        self._meta_mtime = None
+        self.stale = False
+        self._lock = threading.RLock()
+
+    # ----------------------------
+    # Files
+    # ----------------------------
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """Cross-process lock on the index directory (shared for reads, exclusive for writes)."""
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path("index.lock"), "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _write_meta(self):
+        tmp = self._path("meta.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump({
+                "model": embedding_model_tag(),
+                "dim": self.dim,
+                "capacity": self.capacity,
+                "count": self.count,
+            }, f)
+        os.replace(tmp, self._path("meta.json"))
+        self._meta_mtime = os.stat(self._path("meta.json")).st_mtime_ns
+
+    def _open_arrays(self):
+        import numpy as np
+        self._matrix = np.memmap(
+            self._path("embeddings.f32"), dtype=EMBEDDING_DTYPE, mode="r+", shape=(self.capacity, self.dim)
+        )
+        self._ids = np.memmap(self._path("ids.i64"), dtype=np.int64, mode="r+", shape=(self.capacity,))
+        live = self._ids[:self.count]
+        self._rows = {int(cid): row for row, cid in enumerate(live) if cid != _FREE_ROW}
+        self._free = [row for row, cid in enumerate(live) if cid == _FREE_ROW]
+
+    def _resize_files(self, capacity):
+        """Grow (or create) the backing files; new space reads as zeros / free rows."""
+        import numpy as np
+        os.makedirs(self.directory, exist_ok=True)
+        with open(self._path("embeddings.f32"), "ab") as f:
+            f.truncate(capacity * self.dim * np.dtype(EMBEDDING_DTYPE).itemsize)
+        ids_path = self._path("ids.i64")
+        old_size = os.path.getsize(ids_path) if os.path.exists(ids_path) else 0
+        with open(ids_path, "ab") as f:
+            f.write(np.full((capacity * 8 - old_size) // 8, _FREE_ROW, dtype=np.int64).tobytes())
+        self.capacity = capacity
+        self._open_arrays()
+
+    def _load(self):
+        """(Re)open the index if it is unopened or another process changed it."""
+        meta_path = self._path("meta.json")
+        try:
+            mtime = os.stat(meta_path).st_mtime_ns
+        except FileNotFoundError:
+            # Removed by a rebuild in another process: drop the maps of the old files
+            self._matrix = None
+            self._ids = None
+            self._rows = {}
+            self._free = []
+            self._meta_mtime = None
+            return
+        if mtime == self._meta_mtime and self._matrix is not None:
+            return
+
+        with open(meta_path) as f:
+            meta = json.load(f)
+        model = embedding_model_tag()
+        if meta.get("model") != model:
+            logger.warning(
+                f"Candidate index was built with '{meta.get('model')}', not '{model}'; rebuild required"
+            )
+            self.stale = True
+            self.dim = None
+            self._matrix = None
+            self._rows = {}
+            self._meta_mtime = mtime
+            return
+
+        self.stale = False
+        self.dim = meta["dim"]
+        self.capacity = meta["capacity"]
+        self.count = meta["count"]
+        self._open_arrays()
+        self._meta_mtime = mtime
+
+    # ----------------------------
+    # Writes
+    # ----------------------------
+    def upsert_many(self, items: Iterable[Tuple[int, np.ndarray]]):
+        """Insert or replace the embeddings of the given (candidate_id, vector) pairs."""
+        import numpy as np
+        with self._lock, self._file_lock(exclusive=True):
+            self._load()
+            if self.stale:
+                return
+            for candidate_id, vector in items:
+                vector = np.asarray(vector, dtype=EMBEDDING_DTYPE)
+                if self._matrix is None:
+                    self.dim = vector.shape[0]
+                    self.count = 0
+                    self._resize_files(_INITIAL_CAPACITY)
+
+                row = self._rows.get(candidate_id)
+                if row is None:
+                    if self._free:
+                        row = self._free.pop()
+                    else:
+                        if self.count == self.capacity:
+                            self._resize_files(self.capacity * 2)
+                        row = self.count
+                        self.count += 1
+                    self._rows[candidate_id] = row
+                    self._ids[row] = candidate_id
+                self._matrix[row] = vector
+
+            if self._matrix is not None:
+                self._matrix.flush()
+                self._ids.flush()
+                self._write_meta()
+
+    def remove(self, candidate_ids: Iterable[int]):
+        with self._lock, self._file_lock(exclusive=True):
+            self._load()
+            if self._matrix is None:
+                return
+            removed = False
+            for candidate_id in candidate_ids:
+                row = self._rows.pop(candidate_id, None)
+                if row is None:
+                    continue
+                self._ids[row] = _FREE_ROW
+                self._matrix[row] = 0
+                self._free.append(row)
+                removed = True
+            if removed:
+                self._ids.flush()
+                self._matrix.flush()
+                self._write_meta()
+
+    def index_texts(self, texts: Dict[int, Optional[str]], batch_size: int = CANDIDATE_INDEX_BATCH_SIZE) -> int:
+        """Encode {candidate_id: cv_text} and upsert; empty texts are removed. Returns rows written."""
+        present = {cid: text for cid, text in texts.items() if text and text.strip()}
+        empty = [cid for cid in texts if cid not in present]
+        if empty:
+            self.remove(empty)
+        if not present:
+            return 0
+
+        ids = list(present)
+        vectors = encode_texts([present[cid] for cid in ids], batch_size=batch_size)
+        if vectors is None:
+            logger.warning("Embedding model unavailable; candidate index not updated")
+            return 0
+        self.upsert_many(zip(ids, vectors))
+        return len(ids)
+
+    def rebuild(self, batch_size: int = CANDIDATE_INDEX_BATCH_SIZE) -> int:
+        """Re-encode every candidate CV into a fresh index. Returns the number of rows."""
+        with self._lock:
+            with self._file_lock(exclusive=True):
+                for name in ("embeddings.f32", "ids.i64", "meta.json"):
+                    if os.path.exists(self._path(name)):
+                        os.remove(self._path(name))
+            self._matrix = None
+            self._ids = None
+            self._rows = {}
+            self._free = []
+            self._meta_mtime = None
+            self.stale = False
+
+            total = 0
+            last_id = 0
+            while True:
+                rows = (
+                    db.session.query(Candidate.id, Candidate.cv_text)
+                    .filter(Candidate.id > last_id, Candidate.cv_text.isnot(None), Candidate.cv_text != "")
+                    .order_by(Candidate.id)
+                    .limit(batch_size * 16)
+                    .all()
+                )
+                if not rows:
+                    break
+                total += self.index_texts(dict(rows), batch_size=batch_size)
+                last_id = rows[-1][0]
+            return total
+
+    # ----------------------------
+    # Ranking
+    # ----------------------------
+    def rank(
+        self,
+        query_vector: np.ndarray,
+        top_k: int = 20,
+        candidate_ids: Optional[Iterable[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Top-K (candidate_id, cosine similarity) for `query_vector`, optionally
+        restricted to `candidate_ids`. Candidates without an embedding are skipped.
+        """
+        import numpy as np
+        with self._lock, self._file_lock(exclusive=False):
+            self._load()
+            if self._matrix is None or self.count == 0:
+                return []
+
+            query = np.asarray(query_vector, dtype=EMBEDDING_DTYPE)
+            if query.shape[0] != self.dim:
+                raise ValueError(f"Query dimension {query.shape[0]} does not match index dimension {self.dim}")
+
+            if candidate_ids is None:
+                rows = None
+                scores = self._matrix[:self.count] @ query
+                ids = np.asarray(self._ids[:self.count])
+                scores = np.where(ids == _FREE_ROW, -np.inf, scores)
+            else:
+                rows = np.fromiter(
+                    (self._rows[cid] for cid in set(candidate_ids) if cid in self._rows), dtype=np.int64
+                )
+                if rows.size == 0:
+                    return []
+                scores = self._matrix[rows] @ query
+                ids = np.asarray(self._ids[rows])
+
+        k = min(top_k, scores.shape[0])
+        if k <= 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(ids[i]), float(scores[i])) for i in top if np.isfinite(scores[i])]
+
+    def __len__(self):
+        with self._lock, self._file_lock(exclusive=False):
+            self._load()
+            return len(self._rows)
+
+
+candidate_index = CandidateIndex()
+
+
+# ----------------------------
+# Incremental updates
+# ----------------------------
+_PENDING_KEY = "candidate_index_pending"
+
+
+def _collect_cv_changes(session, flush_context, instances):
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, Candidate) and (obj in session.new or inspect(obj).attrs.cv_text.history.has_changes()):
+            pending[obj] = obj.cv_text
+    for obj in session.deleted:
+        if isinstance(obj, Candidate):
+            pending[obj] = None
+
+
+def _reindex_committed(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    # The identity key, unlike obj.id, needs no refresh of the expired instance
+    texts = {
+        state.identity[0]: text
+        for state, text in ((inspect(obj), text) for obj, text in pending.items())
+        if state.identity
+    }
+
+    def worker():
+        try:
+            candidate_index.index_texts(texts)
+        except Exception as e:
+            logger.error(f"Candidate index update failed for {list(texts)}: {e}", exc_info=True)
+
+    # Encoding happens off the request thread; the CV text was captured at flush time
+    threading.Thread(target=worker, name="candidate-index-update", daemon=True).start()
+
+
+def _discard_pending(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+
+
+_HOOKS = (
+    ("before_flush", _collect_cv_changes),
+    ("after_commit", _reindex_committed),
+    ("after_soft_rollback", _discard_pending),
+)
+
+
+def register_candidate_index_hooks(session=db.session):
+    """Keep the index in sync with Candidate.cv_text changes committed through `session`."""
+    for name, fn in _HOOKS:
+        if not event.contains(session, name, fn):
+            event.listen(session, name, fn)
@@ -1,13 +1,21 @@
 import os
 import re
+import time
 import logging
-import subprocess
 from dotenv import load_dotenv
-from openai import OpenAI
 from app.models import Requisition
+from app.services.model_registry import get_spacy, get_embedding_model, embedding_model_tag, SPACY_MODEL
+from app.services.analysis_cache import cached_analysis
+from app.services.llm_client import get_llm_client
+from app.services.prompt_compaction import (
+    compact_prompt_inputs, compaction_stats, PROMPT_CV_TOKEN_BUDGET, PROMPT_JOB_TOKEN_BUDGET
+)
+from app.services.embedding_service import encode_text, encode_texts, get_job_embedding, job_embedding_text
+from app.services.keyword_extractor import (
+    KeywordExtractor, get_keyword_extractor, EMBEDDING_POS, KEYWORD_POS
+)
+from app.services.skill_taxonomy import get_skill_taxonomy, skill_gap
 from cloudinary.uploader import upload as cloudinary_upload
-import spacy
-from sentence_transformers import SentenceTransformer, util
 
 # ----------------------------
 # Environment & Logging Setup
@@ -16,48 +24,45 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Default for an offline analysis step's `gap`: run the taxonomy scan itself
+# (None is a real result, "the job names no known skills")
+_NOT_SCANNED = object()
+
 # ----------------------------
 # Hybrid Resume Analyzer Class
 # ----------------------------
 class HybridResumeAnalyzer:
+    # Bump when prompts or scoring change so cached analyses are not reused
+    ANALYZER_VERSION = "hybrid-v1"
+    ONLINE_MODEL = "openrouter/auto"
+
     def __init__(self):
-        # --- Online AI client ---
-        api_key = os.getenv("OPENROUTER_API_KEY")
-        self.openai_client = None
-        if api_key:
-            try:
-                self.openai_client = OpenAI(
-                    base_url="https://openrouter.ai/api/v1",
-                    api_key=api_key,
-                    default_headers={"HTTP-Referer": "http://localhost:5000"}
-                )
-                logger.info("OpenRouter client initialized.")
-            except Exception as e:
-                logger.error(f"Failed to initialize OpenRouter client: {e}")
-
-        # --- Offline NLP ---
-        self.nlp = self._load_spacy_model("en_core_web_sm")
-
-        # --- Offline embeddings ---
-        try:
-            self.embed_model = SentenceTransformer('all-MiniLM-L6-v2')
-            logger.info("SentenceTransformer embedding model loaded.")
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            self.embed_model = None
+        # --- Online AI client (shared pooled session, bulkhead and circuit breaker) ---
+        self.llm_client = get_llm_client("openrouter")
+        if not self.llm_client.configured:
+            logger.warning("OPENROUTER_API_KEY not set; online analysis disabled.")
+
+    @property
+    def online_enabled(self):
+        """True when an online call may be attempted; False while the circuit breaker is open."""
+        return self.llm_client.available()
 
     # ----------------------------
-    # Private Methods
+    # Shared Offline Models
     # ----------------------------
-    def _load_spacy_model(self, model_name):
-        """Load spaCy model, download if not found."""
-        try:
-            return spacy.load(model_name)
-        except OSError:
-            logger.info(f"{model_name} not found. Downloading...")
-            subprocess.run(["python", "-m", "spacy", "download", model_name], check=True)
-            return spacy.load(model_name)
+    @property
+    def nlp(self):
+        """spaCy pipeline, loaded once per process by the model registry."""
+        return get_spacy()
+
+    @property
+    def embed_model(self):
+        """SentenceTransformer model, loaded once per process (None if unavailable)."""
+        return get_embedding_model()
 
+    # ----------------------------
+    # Private Methods
+    # ----------------------------
     def _parse_openrouter_response(self, text):
         """Parse OpenRouter AI response for score, missing skills, suggestions."""
         score_match = re.search(r"(\d{1,3})(?:/100|%)", text)
@@ -82,9 +87,12 @@ class HybridResumeAnalyzer:
     # ----------------------------
     def analyse_online(self, resume_content, job_description):
         """Analyse resume using OpenRouter API."""
-        if not self.openai_client:
+        if not self.llm_client.configured:
             return None
 
+        # Section-aware trim of both inputs to the prompt token budget
+        resume_content, job_description, tokens = compact_prompt_inputs(resume_content, job_description)
+
         prompt = f"""
 Resume:
 {resume_content}
@@ -106,18 +114,21 @@ Suggestions:
 - ...
 """
         try:
-            response = self.openai_client.chat.completions.create(
-                model="openrouter/auto",
-                messages=[
+            started = time.perf_counter()
+            text = self.llm_client.chat_completion(
+                [
                     {"role": "system", "content": "You are an AI recruitment assistant. Always return results in the required format only."},
                     {"role": "user", "content": prompt}
                 ],
+                model=self.ONLINE_MODEL,
                 temperature=0.7,
                 top_p=0.9,
                 max_tokens=1024,
-                request_timeout=10
+                timeout=10
+            ) or ""
+            compaction_stats.record(
+                "analyse_online", tokens["tokens_before"], tokens["tokens_after"], time.perf_counter() - started
             )
-            text = getattr(response.choices[0].message, "content", "") or ""
             match_score, missing_skills, suggestions = self._parse_openrouter_response(text)
 
             return {
@@ -137,28 +148,59 @@ Suggestions:
             }
 
     # ----------------------------
-    # Embedding-based Offline Analysis
+    # Shared Keyword Parse
     # ----------------------------
-    def analyse_offline_embedding(self, resume_content, job_description):
-        """Offline embedding-based NLP analysis."""
-        # --- Keyword extraction ---
-        resume_doc = self.nlp(resume_content.lower())
-        job_doc = self.nlp(job_description.lower())
+    def parse_terms(self, resume_content, job_description, job=None):
+        """
+        One spaCy pass over the resume (and the job, unless cached for the
+        requisition), shared by the embedding and keyword-only analyses.
+        """
+        extractor = get_keyword_extractor()
+        if job is not None:
+            return extractor.parse(resume_content), extractor.job_terms(job)
+        resume_terms, job_terms = extractor.parse_many([resume_content, job_description])
+        return resume_terms, job_terms
 
-        resume_skills = set(token.lemma_ for token in resume_doc if token.pos_ in ["NOUN", "PROPN", "VERB", "ADJ"])
-        job_skills = set(token.lemma_ for token in job_doc if token.pos_ in ["NOUN", "PROPN", "VERB", "ADJ"])
-        missing_skills = list(job_skills - resume_skills)
+    @staticmethod
+    def skill_gap(resume_content, job_description, job=None):
+        """Canonical skill overlap from the taxonomy, or None if the job names no known skills."""
+        return skill_gap(resume_content, job_embedding_text(job) if job is not None else job_description)
+
+    def _keyword_result(self, resume_content, job_description, job, gap, terms, pos):
+        """Taxonomy skill gap (scanned here unless passed in), else the lemma diff of the parsed terms."""
+        if gap is _NOT_SCANNED:
+            gap = self.skill_gap(resume_content, job_description, job)
+        return gap or KeywordExtractor.compare(
+            *(terms or self.parse_terms(resume_content, job_description, job)), pos
+        )
+
+    # ----------------------------
+    # Embedding-based Offline Analysis
+    # ----------------------------
+    def analyse_offline_embedding(self, resume_content, job_description, job=None, terms=None, gap=_NOT_SCANNED):
+        """
+        Offline embedding-based NLP analysis. When the Requisition is given, its
+        stored embedding is reused and only the CV is encoded. `gap` and `terms`
+        take an already computed skill gap / parse.
+        """
+        # --- Skill gap (taxonomy first, lemma diff when the job names no known skills) ---
+        keyword_result = self._keyword_result(resume_content, job_description, job, gap, terms, EMBEDDING_POS)
+        missing_skills = keyword_result["missing_skills"]
 
         # --- Embedding similarity ---
-        if self.embed_model:
-            embeddings = self.embed_model.encode([resume_content, job_description], convert_to_tensor=True)
-            similarity_score = float(util.cos_sim(embeddings[0], embeddings[1]).item())
+        embed_model = self.embed_model
+        if embed_model:
+            job_embedding = get_job_embedding(job) if job is not None else None
+            if job_embedding is None:
+                resume_embedding, job_embedding = encode_texts([resume_content, job_description])
+            else:
+                resume_embedding = encode_text(resume_content)
+            # Both vectors are L2-normalised, so the dot product is the cosine similarity
+            similarity_score = float(resume_embedding @ job_embedding)
             match_score = int(similarity_score * 100)
         else:
             # fallback to keyword match if embeddings fail
-            total_skills = len(job_skills)
-            matched_skills = total_skills - len(missing_skills)
-            match_score = int((matched_skills / total_skills) * 100) if total_skills else 0
+            match_score = keyword_result["match_score"]
 
         suggestions = ["Consider highlighting missing skills in your resume."] if missing_skills else []
 
@@ -166,29 +208,21 @@ Suggestions:
             "match_score": match_score,
             "missing_skills": missing_skills,
             "suggestions": suggestions,
-            "raw_text": "Offline embedding-based analysis performed" if self.embed_model else "Offline keyword-based analysis performed"
+            "raw_text": "Offline embedding-based analysis performed" if embed_model else "Offline keyword-based analysis performed"
         }
 
     # ----------------------------
     # Keyword-only Offline Analysis
     # ----------------------------
-    def analyse_offline_keywords(self, resume_content, job_description):
+    def analyse_offline_keywords(self, resume_content, job_description, job=None, terms=None, gap=_NOT_SCANNED):
         """Simple keyword-only offline NLP analysis as final fallback."""
-        resume_doc = self.nlp(resume_content.lower())
-        job_doc = self.nlp(job_description.lower())
-
-        resume_skills = set(token.lemma_ for token in resume_doc if token.pos_ in ["NOUN", "PROPN"])
-        job_skills = set(token.lemma_ for token in job_doc if token.pos_ in ["NOUN", "PROPN"])
-        missing_skills = list(job_skills - resume_skills)
-
-        total_skills = len(job_skills)
-        matched_skills = total_skills - len(missing_skills)
-        match_score = int((matched_skills / total_skills) * 100) if total_skills else 0
+        keyword_result = self._keyword_result(resume_content, job_description, job, gap, terms, KEYWORD_POS)
+        missing_skills = keyword_result["missing_skills"]
 
         suggestions = ["Consider highlighting missing skills in your resume."] if missing_skills else []
 
         return {
-            "match_score": match_score,
+            "match_score": keyword_result["match_score"],
             "missing_skills": missing_skills,
             "suggestions": suggestions,
             "raw_text": "Offline keyword-only analysis performed"
@@ -197,8 +231,17 @@ Suggestions:
     # ----------------------------
     # Hybrid Wrapper with 3-level Fallback
     # ----------------------------
+    @property
+    def cache_version(self):
+        """Analyzer + model identity used in the analysis cache key."""
+        online = self.ONLINE_MODEL if self.llm_client.configured else "offline"
+        return (
+            f"{self.ANALYZER_VERSION}:{online}:{embedding_model_tag(load=False)}:{SPACY_MODEL}"
+            f":{PROMPT_CV_TOKEN_BUDGET}:{PROMPT_JOB_TOKEN_BUDGET}:{get_skill_taxonomy().version}"
+        )
+
     def analyse(self, resume_content, job_id):
-        """Hybrid analysis: online -> embedding offline -> keyword offline."""
+        """Hybrid analysis: online -> embedding offline -> keyword offline (cached per CV/job content)."""
         job = Requisition.query.get(job_id)
         if not job:
             return {
@@ -208,21 +251,41 @@ Suggestions:
                 "raw_text": "Job not found"
             }
 
+        # A failed online call falls back to offline scoring; don't pin that degraded result
+        online_failed = []
+
+        def compute():
+            return self._analyse_uncached(resume_content, job, online_failed)
+
+        # Keyed on the embedded job text so a skills-only edit also invalidates
+        return cached_analysis(
+            self.cache_version, resume_content, job_embedding_text(job), compute,
+            cacheable=lambda result: not online_failed
+        )
+
+    def _analyse_uncached(self, resume_content, job, online_failed):
         job_description = job.description or ""
 
-        # --- 1. Online OpenRouter ---
-        if self.openai_client:
+        # --- 1. Online OpenRouter (skipped outright while the breaker is open) ---
+        if self.online_enabled:
             result = self.analyse_online(resume_content, job_description)
             if result and "Error during online analysis" not in result["raw_text"]:
                 return result
+            online_failed.append(True)
+        elif self.llm_client.configured:
+            online_failed.append(True)
 
         # --- 2. Offline Embedding ---
-        result = self.analyse_offline_embedding(resume_content, job_description)
+        # One taxonomy scan for both offline levels; spaCy is only needed when
+        # the job names no taxonomy skills
+        gap = self.skill_gap(resume_content, job_description, job)
+        terms = None if gap else self.parse_terms(resume_content, job_description, job)
+        result = self.analyse_offline_embedding(resume_content, job_description, job=job, terms=terms, gap=gap)
         if self.embed_model or result["match_score"] > 0:
             return result
 
-        # --- 3. Offline Keyword-only ---
-        return self.analyse_offline_keywords(resume_content, job_description)
+        # --- 3. Offline Keyword-only (reuses the same scan and parse) ---
+        return self.analyse_offline_keywords(resume_content, job_description, job=job, terms=terms, gap=gap)
 
     # ----------------------------
     # Cloudinary Upload
@@ -240,3 +303,17 @@ Suggestions:
         except Exception as e:
             logger.error(f"Cloudinary upload failed: {e}")
             return None
+
+
+# ----------------------------
+# Shared Analyzer
+# ----------------------------
+_shared_analyzer = None
+
+
+def get_resume_analyzer():
+    """Process-wide HybridResumeAnalyzer; models are shared through the model registry."""
+    global _shared_analyzer
+    if _shared_analyzer is None:
+        _shared_analyzer = HybridResumeAnalyzer()
+    return _shared_analyzer
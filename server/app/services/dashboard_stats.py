@@ -0,0 +1,147 @@
+# app/services/dashboard_stats.py
+"""
+Admin dashboard aggregates in two statements.
+
+The dashboard, dashboard-counts and pipeline stats endpoints used to issue
+one COUNT(*) per card (and one per pipeline stage). They now read a shared
+snapshot built from:
+
+- one GROUP BY status over applications, with conditional aggregates for
+  the recent / hired / score columns, and
+- one SELECT of scalar subqueries, one per table, each computing all of its
+  counts with `COUNT(*) FILTER (WHERE ...)`.
+
+The snapshot is cached in-process for DASHBOARD_CACHE_TTL seconds, so a
+burst of admin page loads costs the database two statements at most. It is
+not invalidated on writes (each worker holds its own copy); the dashboard may
+lag by up to the TTL, and `refresh=True` forces a rebuild.
+"""
+import os
+import logging
+import calendar
+from datetime import datetime, timedelta
+from typing import Any, Dict
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Application, AuditLog, Candidate, Interview, Offer, OfferStatus, Requisition, User
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_CACHE_TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", 30))
+
+_snapshots = LRUCache(maxsize=1, ttl=DASHBOARD_CACHE_TTL)
+_SNAPSHOT_KEY = "dashboard"
+
+
+def _epoch(value: datetime) -> float:
+    return calendar.timegm(value.utctimetuple()) + value.microsecond / 1e6
+
+
+# ----------------------------
+# Queries
+# ----------------------------
+def _application_aggregates(week_ago: datetime, month_ago: datetime) -> Dict[str, Any]:
+    rows = db.session.execute(
+        select(
+            Application.status,
+            func.count().label("total"),
+            func.count().filter(Application.created_at >= week_ago).label("last_7_days"),
+            func.count().filter(Application.created_at >= month_ago).label("last_30_days"),
+            func.count(Application.cv_score).label("cv_count"),
+            func.sum(Application.cv_score).label("cv_sum"),
+            func.count(Application.assessment_score).label("assessment_count"),
+            func.sum(Application.assessment_score).label("assessment_sum"),
+            func.avg(func.extract("epoch", Application.created_at)).label("avg_created_epoch"),
+        ).group_by(Application.status)
+    ).mappings().all()
+
+    by_status = {row["status"]: row["total"] for row in rows}
+    cv_count = sum(row["cv_count"] for row in rows)
+    assessment_count = sum(row["assessment_count"] for row in rows)
+    hired = next((row for row in rows if row["status"] == "hired"), None)
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "last_7_days": sum(row["last_7_days"] for row in rows),
+        "hired_last_30_days": hired["last_30_days"] if hired else 0,
+        "hired_avg_created_epoch": float(hired["avg_created_epoch"]) if hired and hired["avg_created_epoch"] else None,
+        "avg_cv_score": sum(float(row["cv_sum"] or 0) for row in rows) / cv_count if cv_count else 0,
+        "avg_assessment_score": (
+            sum(float(row["assessment_sum"] or 0) for row in rows) / assessment_count if assessment_count else 0
+        ),
+    }
+
+
+def _table_counts(now: datetime, week_ago: datetime) -> Dict[str, int]:
+    today = datetime(now.year, now.month, now.day)
+    tomorrow = today + timedelta(days=1)
+    scheduled = Interview.status == "scheduled"
+
+    counts = {
+        "users": select(func.count()).select_from(User),
+        "users_last_7_days": select(func.count().filter(User.created_at >= week_ago)),
+        "candidates": select(func.count()).select_from(Candidate),
+        "requisitions": select(func.count()).select_from(Requisition),
+        "requisitions_last_7_days": select(func.count().filter(Requisition.created_at >= week_ago)),
+        "audits": select(func.count()).select_from(AuditLog),
+        "interviews": select(func.count()).select_from(Interview),
+        "interviews_completed": select(func.count().filter(Interview.status == "completed")),
+        "interviews_scheduled": select(func.count().filter(scheduled)),
+        "interviews_today": select(func.count().filter(
+            scheduled, Interview.scheduled_time >= today, Interview.scheduled_time < tomorrow
+        )),
+        "interviews_upcoming": select(func.count().filter(scheduled, Interview.scheduled_time > now)),
+        "interviews_last_7_days": select(func.count().filter(Interview.created_at >= week_ago)),
+        "offers": select(func.count()).select_from(Offer),
+        "offers_sent": select(func.count().filter(Offer.status == OfferStatus.SENT)),
+        "offers_signed": select(func.count().filter(Offer.status == OfferStatus.SIGNED)),
+        "offers_last_7_days": select(func.count().filter(Offer.created_at >= week_ago)),
+    }
+    # One row, one column per count
+    row = db.session.execute(
+        select(*[query.scalar_subquery().label(name) for name, query in counts.items()])
+    ).mappings().one()
+    return {name: row[name] or 0 for name in counts}
+
+
+# ----------------------------
+# Snapshot
+# ----------------------------
+def build_snapshot() -> Dict[str, Any]:
+    """Compute every dashboard aggregate from the database (two statements)."""
+    now = datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    month_ago = now - timedelta(days=30)
+
+    snapshot = _table_counts(now, week_ago)
+    applications = _application_aggregates(week_ago, month_ago)
+    snapshot.update({
+        "applications": applications["total"],
+        "applications_by_status": applications["by_status"],
+        "applications_last_7_days": applications["last_7_days"],
+        "hires_last_30_days": applications["hired_last_30_days"],
+        "avg_cv_score": applications["avg_cv_score"],
+        "avg_assessment_score": applications["avg_assessment_score"],
+        "avg_days_since_hired_application": (
+            (_epoch(now) - applications["hired_avg_created_epoch"]) / 86400
+            if applications["hired_avg_created_epoch"] is not None else None
+        ),
+        "taken_at": now,
+    })
+    return snapshot
+
+
+def dashboard_snapshot(refresh: bool = False) -> Dict[str, Any]:
+    """Shared dashboard snapshot, rebuilt at most once per DASHBOARD_CACHE_TTL seconds."""
+    snapshot = None if refresh else _snapshots.get(_SNAPSHOT_KEY)
+    if snapshot is None:
+        snapshot = build_snapshot()
+        _snapshots.set(_SNAPSHOT_KEY, snapshot)
+    return snapshot
+
+
+def status_count(snapshot: Dict[str, Any], status: str) -> int:
+    return snapshot["applications_by_status"].get(status, 0)
@@ -0,0 +1,170 @@
+# app/services/embedding_broker.py
+"""
+In-process micro-batching for embedding requests.
+
+Concurrent callers (e.g. several CV uploads analysed at once) each need only a
+handful of vectors. `EmbeddingBroker` queues their texts, waits up to
+EMBEDDING_BATCH_MAX_WAIT_MS for more to arrive (or until EMBEDDING_BATCH_MAX_SIZE
+texts are pending), encodes them with one model call and resolves a future
+per caller with its own rows.
+"""
+import os
+import time
+import queue
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_BROKER_ENABLED = os.environ.get("EMBEDDING_BROKER_ENABLED", "true").lower() == "true"
+EMBEDDING_BATCH_MAX_SIZE = int(os.environ.get("EMBEDDING_BATCH_MAX_SIZE", 64))
+EMBEDDING_BATCH_MAX_WAIT_MS = float(os.environ.get("EMBEDDING_BATCH_MAX_WAIT_MS", 5))
+
+
+class _Request:
+    __slots__ = ("texts", "future", "enqueued_at")
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+        self.enqueued_at = time.perf_counter()
+
+
+class EmbeddingBroker:
+    """
+    Coalesces concurrent `submit()` calls into batched `encode_fn(texts)` calls.
+    `encode_fn` must return one row per input text, in order.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], Any],
+        max_batch_size: int = EMBEDDING_BATCH_MAX_SIZE,
+        max_wait_ms: float = EMBEDDING_BATCH_MAX_WAIT_MS,
+    ):
+        self.encode_fn = encode_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._pending_texts = 0
+        self._batches = 0
+        self._requests = 0
+        self._texts = 0
+        self._max_batch = 0
+        self._last_batch = 0
+        self._wait_seconds = 0.0
+        self._encode_seconds = 0.0
+        self._errors = 0
+        # Batch sizes bucketed by powers of two: {"1": n, "2": n, "4": n, ...}
+        self._histogram: Dict[str, int] = {}
+
+    # ----------------------------
+    # Public API
+    # ----------------------------
+    def submit(self, texts: List[str]) -> Future:
+        """Queue `texts` for the next batch; the future resolves to their rows."""
+        request = _Request(list(texts))
+        if not request.texts:
+            request.future.set_result(self.encode_fn([]))
+            return request.future
+
+        self._ensure_worker()
+        with self._stats_lock:
+            self._pending_texts += len(request.texts)
+        self._queue.put(request)
+        return request.future
+
+    def encode(self, texts: List[str], timeout: float = None):
+        """Blocking convenience wrapper around `submit()`."""
+        return self.submit(texts).result(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "pending_texts": self._pending_texts,
+                "batches": self._batches,
+                "requests": self._requests,
+                "texts": self._texts,
+                "errors": self._errors,
+                "avg_batch_size": round(self._texts / self._batches, 2) if self._batches else 0,
+                "max_batch_size": self._max_batch,
+                "last_batch_size": self._last_batch,
+                "avg_wait_ms": round(self._wait_seconds / self._requests * 1000, 2) if self._requests else 0,
+                "avg_encode_ms": round(self._encode_seconds / self._batches * 1000, 2) if self._batches else 0,
+                "batch_size_histogram": dict(self._histogram),
+                "config": {"max_batch_size": self.max_batch_size, "max_wait_ms": self.max_wait * 1000},
+            }
+
+    # ----------------------------
+    # Worker
+    # ----------------------------
+    def _ensure_worker(self):
+        """Start the batching thread on first use (not at import)."""
+        if self._worker is not None:
+            return
+        with self._worker_lock:
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="embedding-broker", daemon=True)
+                self._worker.start()
+
+    def _collect(self) -> List[_Request]:
+        """Block for one request, then gather more until the batch is full or max_wait expires."""
+        batch = [self._queue.get()]
+        size = len(batch[0].texts)
+        deadline = time.perf_counter() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            try:
+                self._run_batch(batch)
+            except Exception as e:  # never let the worker die
+                logger.error(f"Embedding broker batch failed: {e}")
+
+    def _run_batch(self, batch: List[_Request]):
+        texts = [text for request in batch for text in request.texts]
+        started = time.perf_counter()
+        with self._stats_lock:
+            self._pending_texts -= len(texts)
+            self._wait_seconds += sum(started - request.enqueued_at for request in batch)
+
+        try:
+            vectors = self.encode_fn(texts)
+        except Exception as e:
+            with self._stats_lock:
+                self._errors += 1
+            for request in batch:
+                request.future.set_exception(e)
+            return
+
+        elapsed = time.perf_counter() - started
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._texts += len(texts)
+            self._last_batch = len(texts)
+            self._max_batch = max(self._max_batch, len(texts))
+            self._encode_seconds += elapsed
+            bucket = str(1 << (len(texts) - 1).bit_length())
+            self._histogram[bucket] = self._histogram.get(bucket, 0) + 1
+
+        offset = 0
+        for request in batch:
+            count = len(request.texts)
+            request.future.set_result(None if vectors is None else vectors[offset:offset + count])
+            offset += count
@@ -0,0 +1,182 @@
+# app/services/embedding_service.py
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, List, Optional
+
+from sqlalchemy import inspect, update
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.extensions import db
+from app.models import Requisition
+from app.services.model_registry import get_embedding_model, embedding_model_tag, EMBEDDING_MODEL
+from app.services.embedding_broker import EmbeddingBroker, EMBEDDING_BROKER_ENABLED
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# A dtype name rather than np.float32, so importing this module does not import numpy
+EMBEDDING_DTYPE = "float32"
+
+
+# ----------------------------
+# Encoding helpers
+# ----------------------------
+def embedding_to_bytes(vector) -> bytes:
+    """Serialise a vector as a compact float32 blob."""
+    import numpy as np
+    return np.asarray(vector, dtype=EMBEDDING_DTYPE).tobytes()
+
+
+def embedding_from_bytes(blob: bytes) -> np.ndarray:
+    """Read-only float32 view over a stored blob (no copy)."""
+    import numpy as np
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+def _encode_with_model(texts: List[str], batch_size: int = 32) -> Optional[np.ndarray]:
+    model = get_embedding_model()
+    if model is None:
+        return None
+    import numpy as np
+    vectors = model.encode(
+        list(texts),
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=EMBEDDING_DTYPE)
+
+
+# Coalesces the small encode calls of concurrent requests into one model call
+embedding_broker = EmbeddingBroker(_encode_with_model)
+
+
+def encode_texts(texts: List[str], batch_size: int = 32) -> Optional[np.ndarray]:
+    """
+    Encode texts to L2-normalised float32 rows, so cosine similarity is a dot product.
+    Returns None when the embedding model is unavailable.
+
+    Small requests go through the micro-batching broker; bulk jobs (a batch's
+    worth of texts or more) call the model directly.
+    """
+    texts = list(texts)
+    if EMBEDDING_BROKER_ENABLED and len(texts) < embedding_broker.max_batch_size:
+        if get_embedding_model() is None:
+            return None
+        return embedding_broker.encode(texts)
+    return _encode_with_model(texts, batch_size=batch_size)
+
+
+def encode_text(text: str) -> Optional[np.ndarray]:
+    vectors = encode_texts([text or ""])
+    return vectors[0] if vectors is not None else None
+
+
+# ----------------------------
+# Requisition embeddings
+# ----------------------------
+def job_embedding_text(job: Requisition) -> str:
+    """Text embedded for a requisition: its description plus required skills."""
+    text = job.description or ""
+    skills = [s for s in (job.required_skills or []) if s]
+    if skills:
+        text = f"{text}\nRequired skills: {', '.join(skills)}"
+    return text
+
+
+def has_current_embedding(job: Requisition) -> bool:
+    return job.description_embedding is not None and job.embedding_model == embedding_model_tag()
+
+
+def refresh_job_embedding(job: Requisition) -> bool:
+    """
+    Recompute and attach the requisition embedding (caller commits).
+    Returns False if the embedding model is unavailable; the stale vector is cleared.
+    """
+    vector = encode_text(job_embedding_text(job))
+    if vector is None:
+        job.description_embedding = None
+        job.embedding_model = None
+        return False
+    job.description_embedding = embedding_to_bytes(vector)
+    job.embedding_model = embedding_model_tag()
+    return True
+
+
+def get_job_embedding(job: Requisition) -> Optional[np.ndarray]:
+    """
+    Stored embedding for `job`, computed on first use if missing or produced
+    by a different model or backend. A freshly computed vector is saved in its own
+    transaction, so the caller's session is neither committed nor rolled back.
+    """
+    if has_current_embedding(job):
+        return embedding_from_bytes(job.description_embedding)
+
+    vector = encode_text(job_embedding_text(job))
+    if vector is None:
+        return None
+    blob = embedding_to_bytes(vector)
+    if not inspect(job).modified:
+        _persist_job_embedding(job, blob)
+    return embedding_from_bytes(blob)
+
+
+def _persist_job_embedding(job: Requisition, blob: bytes):
+    """Write the embedding on a separate connection and mark it as loaded on `job`."""
+    tag = embedding_model_tag()
+    try:
+        with db.engine.begin() as connection:
+            connection.execute(
+                update(Requisition)
+                .where(Requisition.id == job.id)
+                # A cache fill, not an edit: keep updated_at (it versions the answer key)
+                .values(description_embedding=blob, embedding_model=tag,
+                        updated_at=Requisition.updated_at)
+            )
+    except Exception as e:
+        logger.warning(f"Could not persist embedding for requisition {job.id}: {e}")
+        return
+    # Already in the database: the caller's session must not see it as a change
+    set_committed_value(job, "description_embedding", blob)
+    set_committed_value(job, "embedding_model", tag)
+
+
+def backfill_job_embeddings(batch_size: int = 64, force: bool = False) -> int:
+    """
+    Compute embeddings for requisitions that have none (or one from another model or backend).
+    Requisitions are encoded `batch_size` at a time and committed per batch.
+    Returns the number of requisitions updated.
+    """
+    if get_embedding_model() is None:
+        raise RuntimeError(f"Embedding model '{EMBEDDING_MODEL}' is not available")
+
+    tag = embedding_model_tag()
+    query = Requisition.query.order_by(Requisition.id)
+    if not force:
+        query = query.filter(db.or_(
+            Requisition.description_embedding.is_(None),
+            Requisition.embedding_model.is_(None),
+            Requisition.embedding_model != tag,
+        ))
+
+    updated = 0
+    last_id = 0
+    while True:
+        # Keyset pagination: rows drop out of the filter as they are updated
+        batch = query.filter(Requisition.id > last_id).limit(batch_size).all()
+        if not batch:
+            break
+
+        vectors = encode_texts([job_embedding_text(job) for job in batch], batch_size=batch_size)
+        for job, vector in zip(batch, vectors):
+            job.description_embedding = embedding_to_bytes(vector)
+            job.embedding_model = tag
+        db.session.commit()
+
+        updated += len(batch)
+        last_id = batch[-1].id
+    return updated
@@ -1,10 +1,6 @@
 import os
 import datetime
 import pickle
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from flask import current_app
 import uuid
@@ -22,6 +18,11 @@ class GoogleCalendarService:
         
     def authenticate(self):
         """Authenticate and create Google Calendar service"""
+        # The OAuth flow and API discovery stack are only imported when a calendar is used
+        from google_auth_oauthlib.flow import InstalledAppFlow
+        from google.auth.transport.requests import Request
+        from googleapiclient.discovery import build
+
         try:
             token_path = current_app.config.get('GOOGLE_CALENDAR_TOKEN_PATH', 'token.pickle')
             credentials_path = current_app.config.get('GOOGLE_CALENDAR_CREDENTIALS_PATH', 'credentials.json')
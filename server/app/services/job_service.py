@@ -12,6 +12,12 @@ from app.models import Requisition, User, Application, JobActivityLog
 from app.schemas.job_schemas import (
     job_create_schema, job_update_schema, job_filter_schema
 )
+from app.services.embedding_service import refresh_job_embedding
+from app.services.job_stats import application_stats, empty_stats, paginate_jobs, pagination
+from app.services.rescoring_service import start_rescore
+
+# Fields that feed the stored requisition embedding
+EMBEDDING_FIELDS = ("description", "required_skills")
 
 
 class JobService:
@@ -51,6 +57,7 @@ class JobService:
             )
             
             db.session.add(job)
+            JobService._refresh_embedding(job)
             
             # Log activity
             JobService._log_activity(
@@ -115,6 +122,10 @@ class JobService:
             
             job.updated_at = datetime.utcnow()
             
+            # Only re-embed when the embedded text changed
+            if any(field in changes for field in EMBEDDING_FIELDS):
+                JobService._refresh_embedding(job)
+            
             # Log activity if there were changes
             if changes:
                 JobService._log_activity(
@@ -126,6 +137,11 @@ class JobService:
             
             db.session.commit()
             
+            # Existing application scores depend on the embedded text and weightings
+            rescore_cv = any(field in changes for field in EMBEDDING_FIELDS)
+            if rescore_cv or "weightings" in changes:
+                start_rescore(job.id, user_id=user_id, rescore_cv=rescore_cv)
+            
             return job, None
             
         except Exception as e:
@@ -378,31 +394,19 @@ class JobService:
             page = validated_filters.get('page', 1)
             per_page = validated_filters.get('per_page', 20)
             
-            paginated_jobs = query.paginate(
-                page=page,
-                per_page=per_page,
-                error_out=False
-            )
+            jobs, total = paginate_jobs(query, page=page, per_page=per_page)
             
-            # Prepare response
+            # Prepare response (application counts for the whole page in one query)
+            stats = application_stats(job.id for job in jobs)
             jobs_data = []
-            for job in paginated_jobs.items:
+            for job in jobs:
                 job_dict = job.to_dict()
-                # Add application count for each job
-                app_count = Application.query.filter_by(requisition_id=job.id).count()
-                job_dict['application_count'] = app_count
+                job_dict['application_count'] = stats.get(job.id, empty_stats())['total']
                 jobs_data.append(job_dict)
             
             response = {
                 "jobs": jobs_data,
-                "pagination": {
-                    "page": paginated_jobs.page,
-                    "per_page": paginated_jobs.per_page,
-                    "total_pages": paginated_jobs.pages,
-                    "total_items": paginated_jobs.total,
-                    "has_next": paginated_jobs.has_next,
-                    "has_prev": paginated_jobs.has_prev
-                },
+                "pagination": pagination(page, per_page, total),
                 "filters": {
                     "category": category,
                     "status": status,
@@ -489,6 +493,16 @@ class JobService:
             current_app.logger.error(f"Get job activity error for job {job_id}: {str(e)}", exc_info=True)
             return None, {"error": "Internal server error", "message": str(e)}
     
+    @staticmethod
+    def _refresh_embedding(job: Requisition):
+        """Recompute the stored job embedding; failures leave it to be rebuilt lazily."""
+        try:
+            refresh_job_embedding(job)
+        except Exception as e:
+            job.description_embedding = None
+            job.embedding_model = None
+            current_app.logger.warning(f"Job embedding refresh failed for job {job.id}: {str(e)}")
+    
     @staticmethod
     def _log_activity(action: str, job_id: int, user_id: int, details: Dict = None):
         """
@@ -0,0 +1,85 @@
+# app/services/job_stats.py
+"""
+Per-requisition application statistics for job listings.
+
+`application_stats` returns every job's total, per-status and recent counts
+from one `GROUP BY requisition_id, status` query, and `paginate_jobs` loads a
+page of requisitions together with the total row count via `COUNT(*) OVER ()`,
+so a listing page costs two statements however many jobs it shows.
+"""
+import math
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Application, Requisition
+
+PIPELINE_STATUSES = ('screening', 'assessment', 'interview', 'offer', 'hired', 'rejected')
+RECENT_DAYS = 7
+
+
+def application_stats(requisition_ids: Iterable[int], recent_days: int = RECENT_DAYS) -> Dict[int, Dict[str, Any]]:
+    """
+    {requisition_id: {"total", "recent", "by_status"}} for the given requisitions
+    (missing ids have no applications). `recent` counts applications created in
+    the last `recent_days` days; `by_status` covers every status present.
+    """
+    requisition_ids = list(requisition_ids)
+    if not requisition_ids:
+        return {}
+
+    since = datetime.utcnow() - timedelta(days=recent_days)
+    rows = db.session.execute(
+        select(
+            Application.requisition_id,
+            Application.status,
+            func.count().label("total"),
+            func.count().filter(Application.created_at >= since).label("recent"),
+        )
+        .where(Application.requisition_id.in_(requisition_ids))
+        .group_by(Application.requisition_id, Application.status)
+    ).all()
+
+    stats: Dict[int, Dict[str, Any]] = {}
+    for requisition_id, status, total, recent in rows:
+        job = stats.setdefault(requisition_id, {"total": 0, "recent": 0, "by_status": {}})
+        job["total"] += total
+        job["recent"] += recent
+        job["by_status"][status] = total
+    return stats
+
+
+def empty_stats() -> Dict[str, Any]:
+    return {"total": 0, "recent": 0, "by_status": {}}
+
+
+def paginate_jobs(query, page: int = 1, per_page: Optional[int] = None) -> Tuple[List[Requisition], int]:
+    """
+    One page of a Requisition query and the total number of matching rows,
+    counted with a window function in the same statement. Without
+    `per_page` every row is returned.
+    """
+    page = max(page or 1, 1)
+    windowed = query.add_columns(func.count().over().label("total"))
+    if per_page:
+        windowed = windowed.limit(per_page).offset((page - 1) * per_page)
+    rows = windowed.all()
+    if rows:
+        return [job for job, _ in rows], rows[0].total
+    # Past the last page the window is empty; count separately
+    return [], query.order_by(None).count() if per_page and page > 1 else 0
+
+
+def pagination(page: int, per_page: int, total: int) -> Dict[str, Any]:
+    """Pagination block in the shape Flask-SQLAlchemy's paginate() used to produce."""
+    pages = math.ceil(total / per_page) if per_page else 0
+    return {
+        "page": page,
+        "per_page": per_page,
+        "total_pages": pages,
+        "total_items": total,
+        "has_next": page < pages,
+        "has_prev": page > 1,
+    }
@@ -0,0 +1,122 @@
+# app/services/keyword_extractor.py
+import os
+import hashlib
+import logging
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from app.services.model_registry import get_spacy
+from app.services.embedding_service import job_embedding_text
+from app.services.skill_taxonomy import get_skill_taxonomy, compare_skills
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SPACY_BATCH_SIZE = int(os.environ.get("SPACY_BATCH_SIZE", 32))
+JOB_TERMS_CACHE_SIZE = int(os.environ.get("JOB_TERMS_CACHE_SIZE", 512))
+
+# POS tags used by the embedding-analysis keyword diff and the keyword-only fallback
+EMBEDDING_POS = frozenset({"NOUN", "PROPN", "VERB", "ADJ"})
+KEYWORD_POS = frozenset({"NOUN", "PROPN"})
+
+# One parse of a document: the set of (lemma, POS) pairs for every content POS we use
+Terms = FrozenSet[Tuple[str, str]]
+_CONTENT_POS = EMBEDDING_POS | KEYWORD_POS
+
+
+class KeywordExtractor:
+    """
+    POS/lemma keyword extraction over the trimmed spaCy pipeline.
+
+    Documents are parsed in batches with `nlp.pipe` and reduced to a set of
+    (lemma, POS) pairs, so a single parse serves both the embedding and the
+    keyword-only analysis. Job-description term sets are cached per
+    requisition version (id + updated_at + description hash).
+    """
+
+    def __init__(self, batch_size: int = SPACY_BATCH_SIZE, cache_size: int = JOB_TERMS_CACHE_SIZE):
+        self.batch_size = batch_size
+        self._job_terms = LRUCache(maxsize=cache_size)
+
+    # ----------------------------
+    # Parsing
+    # ----------------------------
+    def parse_many(self, texts: Iterable[str]) -> List[Terms]:
+        """Parse texts in batches; returns one term set per input, in order."""
+        texts = [(text or "").lower() for text in texts]
+        nlp = get_spacy()
+        if nlp is None:
+            logger.warning("spaCy model unavailable; keyword extraction returns no terms")
+            return [frozenset() for _ in texts]
+        return [
+            frozenset((token.lemma_, token.pos_) for token in doc if token.pos_ in _CONTENT_POS)
+            for doc in nlp.pipe(texts, batch_size=self.batch_size)
+        ]
+
+    def parse(self, text: str) -> Terms:
+        return self.parse_many([text])[0]
+
+    def job_terms(self, job) -> Terms:
+        """Term set of a requisition's description, cached until the requisition changes."""
+        description = job.description or ""
+        key = "{}:{}:{}".format(
+            job.id,
+            job.updated_at.isoformat() if job.updated_at else "",
+            hashlib.blake2b(description.encode("utf-8"), digest_size=16).hexdigest(),
+        )
+        terms = self._job_terms.get(key)
+        if terms is None:
+            terms = self.parse(description)
+            self._job_terms.set(key, terms)
+        return terms
+
+    # ----------------------------
+    # Scoring
+    # ----------------------------
+    @staticmethod
+    def keywords(terms: Terms, pos: FrozenSet[str] = KEYWORD_POS) -> set:
+        return {lemma for lemma, tag in terms if tag in pos}
+
+    @classmethod
+    def compare(cls, resume_terms: Terms, job_terms: Terms, pos: FrozenSet[str] = KEYWORD_POS) -> Dict:
+        """Keyword overlap between a resume and a job: missing skills and a 0-100 match score."""
+        resume_skills = cls.keywords(resume_terms, pos)
+        job_skills = cls.keywords(job_terms, pos)
+        missing_skills = list(job_skills - resume_skills)
+
+        total_skills = len(job_skills)
+        matched_skills = total_skills - len(missing_skills)
+        match_score = int((matched_skills / total_skills) * 100) if total_skills else 0
+        return {"match_score": match_score, "missing_skills": missing_skills}
+
+    def score_resumes(
+        self,
+        resume_texts: Iterable[str],
+        job=None,
+        job_description: Optional[str] = None,
+        pos: FrozenSet[str] = KEYWORD_POS,
+    ) -> List[Dict]:
+        """
+        Bulk keyword scoring of many resumes against one job (a Requisition, or
+        raw `job_description`). When the job names skills from the taxonomy,
+        resumes are scored on canonical skill overlap without spaCy; otherwise
+        they are parsed in `nlp.pipe` batches and the job is parsed at most once.
+        """
+        job_text = job_embedding_text(job) if job is not None else job_description or ""
+
+        taxonomy = get_skill_taxonomy()
+        job_skills = taxonomy.extract(job_text)
+        if job_skills:
+            return [compare_skills(taxonomy.extract(text or ""), job_skills) for text in resume_texts]
+
+        job_terms = self.job_terms(job) if job is not None else self.parse(job_description or "")
+        return [self.compare(terms, job_terms, pos) for terms in self.parse_many(resume_texts)]
+
+
+_extractor: Optional[KeywordExtractor] = None
+
+
+def get_keyword_extractor() -> KeywordExtractor:
+    global _extractor
+    if _extractor is None:
+        _extractor = KeywordExtractor()
+    return _extractor
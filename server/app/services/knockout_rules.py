@@ -0,0 +1,369 @@
+# app/services/knockout_rules.py
+"""
+Knockout-rule compiler and bulk pre-screening.
+
+`Requisition.knockout_rules` is a list of short rule strings (or
+{"type", "value"} dicts), e.g.
+
+    "min_experience: 3"             years of experience (bare rule: job.min_experience)
+    "skills: Python, SQL"           every listed skill (bare "required_skills": job.required_skills)
+    "location: Johannesburg, Cape Town"   any of the locations
+    "certification: AWS"            every listed certification
+    "min_cv_score: 50" / "min_assessment_score: 60"
+
+Rules on plain columns (location, scores) compile to SQL predicates and are
+evaluated by the database; rules on JSON profile data (experience, skills,
+certifications) compile to vectorised NumPy masks over a compact feature
+table built for the applicants that survive the SQL stage. Each applicant is
+attributed to the first rule it fails, in that order (SQL rules, then mask
+rules, each in the order written). Rules that cannot be parsed are reported
+and ignored, so free-text rules entered in the job form never block anyone.
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import case, func, not_, or_, select
+
+from app.extensions import db
+from app.models import Application, Candidate, Requisition
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+KNOCKOUT_CACHE_SIZE = int(os.environ.get("KNOCKOUT_CACHE_SIZE", 256))
+
+# Rule type -> accepted spellings
+_RULE_ALIASES = {
+    "min_experience": ("min_experience", "experience", "min_years", "years_experience"),
+    "skills": ("skills", "skill", "required_skills", "required_skill"),
+    "location": ("location", "locations"),
+    "certifications": ("certifications", "certification", "certificate"),
+    "min_cv_score": ("min_cv_score", "cv_score"),
+    "min_assessment_score": ("min_assessment_score", "assessment_score"),
+}
+_ALIAS_TO_TYPE = {alias: kind for kind, aliases in _RULE_ALIASES.items() for alias in aliases}
+_NUMERIC_RULES = {"min_experience", "min_cv_score", "min_assessment_score"}
+_SQL_RULES = {"location", "min_cv_score", "min_assessment_score"}
+
+_RULE_RE = re.compile(r"^\s*([a-z_ ]+?)\s*(?::|>=|=|>)\s*(.*?)\s*$", re.I)
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?")
+
+
+class KnockoutRule:
+    """One parsed rule: `kind` is a key of _RULE_ALIASES; `values` are strings or a number."""
+
+    __slots__ = ("kind", "values", "source")
+
+    def __init__(self, kind: str, values, source: str):
+        self.kind = kind
+        self.values = values
+        self.source = source
+
+    @property
+    def in_sql(self) -> bool:
+        return self.kind in _SQL_RULES
+
+    def __repr__(self):
+        return f"KnockoutRule({self.kind!r}, {self.values!r})"
+
+
+# ----------------------------
+# Parsing
+# ----------------------------
+def _split(value) -> List[str]:
+    if isinstance(value, (list, tuple)):
+        items = value
+    else:
+        items = re.split(r"[,;|]", str(value or ""))
+    return [item.strip() for item in items if isinstance(item, str) and item.strip()]
+
+
+def parse_rule(rule: Any, job: Optional[Requisition] = None) -> Optional[KnockoutRule]:
+    """Parse one rule string or {"type", "value"} dict; None if it is not a known rule."""
+    if isinstance(rule, dict):
+        kind, value, source = rule.get("type"), rule.get("value"), json.dumps(rule, sort_keys=True)
+    elif isinstance(rule, str):
+        source = rule.strip()
+        match = _RULE_RE.match(source)
+        kind, value = (match.group(1), match.group(2)) if match else (source, "")
+    else:
+        return None
+
+    kind = _ALIAS_TO_TYPE.get(str(kind or "").strip().lower().replace(" ", "_"))
+    if kind is None:
+        return None
+
+    if kind in _NUMERIC_RULES:
+        if value in (None, "") and kind == "min_experience" and job is not None:
+            value = job.min_experience
+        number = value if isinstance(value, (int, float)) else _NUMBER_RE.search(str(value or ""))
+        if number is None:
+            return None
+        number = float(number if isinstance(number, (int, float)) else number.group())
+        return KnockoutRule(kind, number, source) if number > 0 else None
+
+    values = _split(value)
+    if not values and kind == "skills" and job is not None:
+        values = _split(job.required_skills or [])
+    return KnockoutRule(kind, values, source) if values else None
+
+
+def parse_rules(rules: Sequence[Any], job: Optional[Requisition] = None) -> Tuple[List[KnockoutRule], List[Any]]:
+    """(parsed rules, rules that could not be parsed)."""
+    parsed, unsupported = [], []
+    for rule in rules or []:
+        compiled = parse_rule(rule, job)
+        if compiled is None:
+            unsupported.append(rule)
+        else:
+            parsed.append(compiled)
+    return parsed, unsupported
+
+
+# ----------------------------
+# Compilation
+# ----------------------------
+def _like_any(column, values: List[str]):
+    escaped = [v.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") for v in values]
+    return or_(*[func.coalesce(column, "").ilike(f"%{v}%", escape="\\") for v in escaped])
+
+
+def sql_predicate(rule: KnockoutRule):
+    """SQL expression that is true when an application passes `rule`."""
+    if rule.kind == "location":
+        return _like_any(Candidate.location, rule.values)
+    if rule.kind == "min_cv_score":
+        return func.coalesce(Application.cv_score, 0) >= rule.values
+    if rule.kind == "min_assessment_score":
+        return func.coalesce(Application.assessment_score, 0) >= rule.values
+    raise ValueError(f"{rule.kind} rules are evaluated as masks")
+
+
+class CompiledRules:
+    """A requisition's rules split into SQL predicates and NumPy mask rules."""
+
+    def __init__(self, rules: List[KnockoutRule], unsupported: List[Any]):
+        self.rules = rules
+        self.unsupported = unsupported
+        self.sql_rules = [rule for rule in rules if rule.in_sql]
+        self.mask_rules = [rule for rule in rules if not rule.in_sql]
+        self.sql_predicates = [sql_predicate(rule) for rule in self.sql_rules]
+        # Canonical skill / certification vocabularies the feature table needs columns for
+        self.skill_vocab = _vocabulary(self.mask_rules, "skills", canonical=True)
+        self.cert_vocab = _vocabulary(self.mask_rules, "certifications", canonical=False)
+
+    def first_failure_case(self):
+        """CASE giving the index of the first failed SQL rule, or -1."""
+        if not self.sql_predicates:
+            return None
+        return case(
+            *[(not_(predicate), index) for index, predicate in enumerate(self.sql_predicates)],
+            else_=-1,
+        )
+
+
+def _skill_key(name: str) -> str:
+    from app.services.skill_taxonomy import get_skill_taxonomy
+    return get_skill_taxonomy().normalize(name).lower()
+
+
+def _vocabulary(rules: List[KnockoutRule], kind: str, canonical: bool) -> Dict[str, int]:
+    vocab: Dict[str, int] = {}
+    for rule in rules:
+        if rule.kind == kind:
+            for value in rule.values:
+                key = _skill_key(value) if canonical else value.lower()
+                vocab.setdefault(key, len(vocab))
+    return vocab
+
+
+_compiled = LRUCache(maxsize=KNOCKOUT_CACHE_SIZE)
+
+
+def compile_rules(job: Requisition, rules: Optional[Sequence[Any]] = None) -> CompiledRules:
+    """Compile a requisition's knockout rules (or an explicit rule list), cached by content."""
+    rules = job.knockout_rules if rules is None else rules
+    key = hashlib.blake2b(json.dumps(
+        [rules or [], job.required_skills or [], job.min_experience or 0], sort_keys=True, default=str
+    ).encode("utf-8"), digest_size=16).hexdigest()
+    compiled = _compiled.get(key)
+    if compiled is None:
+        compiled = CompiledRules(*parse_rules(rules, job))
+        _compiled.set(key, compiled)
+    return compiled
+
+
+# ----------------------------
+# Feature table
+# ----------------------------
+def _as_list(value) -> list:
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            return _split(value)
+    return value if isinstance(value, list) else []
+
+
+def _years_of_experience(work_experience, profile) -> float:
+    """Stated years (profile) or the sum of per-role "years" entries, whichever is larger."""
+    total = 0.0
+    for job in _as_list(work_experience):
+        if isinstance(job, dict):
+            try:
+                total += float(job.get("years") or 0)
+            except (TypeError, ValueError):
+                pass
+    stated = 0.0
+    if isinstance(profile, dict):
+        match = _NUMBER_RE.search(str(profile.get("years_of_experience") or ""))
+        stated = float(match.group()) if match else 0.0
+    return max(total, stated)
+
+
+def _item_name(item) -> str:
+    if isinstance(item, dict):
+        return str(item.get("name") or item.get("title") or item.get("certification") or "")
+    return str(item or "")
+
+
+class FeatureTable:
+    """
+    Column-oriented view of the applicants being screened: experience years
+    (float32) plus boolean has-skill / has-certification matrices over the
+    rules' vocabularies only.
+    """
+
+    def __init__(self, rows, compiled: CompiledRules):
+        import numpy as np
+        from app.services.skill_taxonomy import get_skill_taxonomy
+
+        count = len(rows)
+        self.application_ids = np.fromiter((row.application_id for row in rows), dtype=np.int64, count=count)
+        self.experience = np.zeros(count, dtype=np.float32)
+        self.skills = np.zeros((count, len(compiled.skill_vocab)), dtype=bool)
+        self.certifications = np.zeros((count, len(compiled.cert_vocab)), dtype=bool)
+
+        needs_experience = any(rule.kind == "min_experience" for rule in compiled.mask_rules)
+        taxonomy = get_skill_taxonomy() if compiled.skill_vocab else None
+        for i, row in enumerate(rows):
+            if needs_experience:
+                self.experience[i] = _years_of_experience(row.work_experience, row.profile)
+            if taxonomy is not None:
+                names = [_item_name(item) for item in _as_list(row.skills)]
+                # No structured skills: fall back to what the CV text mentions
+                found = taxonomy.normalize_many(names) if names else taxonomy.extract(row.cv_text or "")
+                for skill in found:
+                    column = compiled.skill_vocab.get(skill.lower())
+                    if column is not None:
+                        self.skills[i, column] = True
+            if compiled.cert_vocab:
+                held = " | ".join(_item_name(item).lower() for item in _as_list(row.certifications))
+                for name, column in compiled.cert_vocab.items():
+                    self.certifications[i, column] = name in held
+
+    def mask(self, rule: KnockoutRule, compiled: CompiledRules):
+        """Boolean array, True where the applicant passes `rule`."""
+        if rule.kind == "min_experience":
+            return self.experience >= rule.values
+        if rule.kind == "skills":
+            columns = [compiled.skill_vocab[_skill_key(value)] for value in rule.values]
+            return self.skills[:, columns].all(axis=1)
+        if rule.kind == "certifications":
+            columns = [compiled.cert_vocab[value.lower()] for value in rule.values]
+            return self.certifications[:, columns].all(axis=1)
+        raise ValueError(f"{rule.kind} rules are evaluated in SQL")
+
+
+# ----------------------------
+# Pre-screening
+# ----------------------------
+def prescreen(job: Requisition, rules: Optional[Sequence[Any]] = None, include_passed: bool = True) -> Dict[str, Any]:
+    """
+    Evaluate knockout rules for every application of `job` in one pass.
+
+    Returns counts per rule and, per application, whether it passed and the
+    rule that eliminated it (`eliminated_by`, the rule as written).
+    """
+    import numpy as np
+
+    compiled = compile_rules(job, rules)
+    base = (
+        select(Application.id.label("application_id"), Application.candidate_id)
+        .outerjoin(Candidate, Candidate.id == Application.candidate_id)
+        .where(Application.requisition_id == job.id)
+        .where(Application.is_draft.isnot(True))
+    )
+
+    results: List[Dict[str, Any]] = []
+    by_rule = {rule.source: 0 for rule in compiled.rules}
+
+    # --- Stage 1: SQL rules; only the first failure index comes back ---
+    first_failure = compiled.first_failure_case()
+    if first_failure is not None:
+        failed = db.session.execute(
+            base.add_columns(first_failure.label("failed_rule"))
+            .where(or_(*[not_(p) for p in compiled.sql_predicates]))
+            .order_by(Application.id)
+        ).all()
+        for row in failed:
+            rule = compiled.sql_rules[row.failed_rule]
+            by_rule[rule.source] += 1
+            results.append({
+                "application_id": row.application_id,
+                "candidate_id": row.candidate_id,
+                "passed": False,
+                "eliminated_by": rule.source,
+            })
+
+    # --- Stage 2: survivors' features, then one NumPy mask per rule ---
+    survivors = base
+    for predicate in compiled.sql_predicates:
+        survivors = survivors.where(predicate)
+    columns = []
+    if compiled.mask_rules:
+        columns = [Candidate.work_experience, Candidate.profile, Candidate.skills, Candidate.certifications]
+        if compiled.skill_vocab:
+            columns.append(Candidate.cv_text)
+    rows = db.session.execute(survivors.add_columns(*columns).order_by(Application.id)).all()
+
+    eliminated_by = np.full(len(rows), -1, dtype=np.int32)
+    if compiled.mask_rules and rows:
+        table = FeatureTable(rows, compiled)
+        alive = np.ones(len(rows), dtype=bool)
+        for index, rule in enumerate(compiled.mask_rules):
+            failing = alive & ~table.mask(rule, compiled)
+            eliminated_by[failing] = index
+            by_rule[rule.source] += int(failing.sum())
+            alive &= ~failing
+
+    passed = 0
+    for row, rule_index in zip(rows, eliminated_by.tolist()):
+        if rule_index < 0:
+            passed += 1
+            if not include_passed:
+                continue
+        results.append({
+            "application_id": row.application_id,
+            "candidate_id": row.candidate_id,
+            "passed": rule_index < 0,
+            "eliminated_by": compiled.mask_rules[rule_index].source if rule_index >= 0 else None,
+        })
+
+    results.sort(key=lambda result: result["application_id"])
+    total = passed + sum(by_rule.values())
+    return {
+        "job_id": job.id,
+        "total": total,
+        "passed": passed,
+        "eliminated": total - passed,
+        "by_rule": by_rule,
+        "sql_rules": [rule.source for rule in compiled.sql_rules],
+        "mask_rules": [rule.source for rule in compiled.mask_rules],
+        "unsupported_rules": compiled.unsupported,
+        "results": results,
+    }
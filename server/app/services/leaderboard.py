@@ -0,0 +1,393 @@
+# app/services/leaderboard.py
+"""
+Per-requisition leaderboard of applications by overall_score.
+
+Each requisition's ranking is a Redis sorted set (member = zero-padded
+application id, score = -overall_score, so ascending order matches the SQL
+ranking's "score desc, id asc"), kept current from the ORM: whenever an application's
+cv_score, assessment_score, interview feedback or overall_score changes, the
+new overall_score is written to the set after commit. Reads are then
+O(log N + page) with no scan of the applications table:
+
+    leaderboard.page(job_id, offset, count)     # top-K / pagination
+    leaderboard.rank(job_id, application_id)    # "where does candidate X stand"
+
+A set is (re)built from the database the first time it is read, and again
+after a bulk UPDATE marks it stale (see `mark_stale`). A rebuild first
+recomputes the requisition's stored overall_scores, since rows written before
+these hooks existed (never shortlisted) still hold the default 0. Without
+LEADERBOARD_REDIS_URL, or if Redis is unreachable, callers fall back to the
+SQL window-function ranking in shortlist_service.
+"""
+import os
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import Application, Requisition
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_REDIS_URL = os.environ.get("LEADERBOARD_REDIS_URL")
+LEADERBOARD_TTL = int(os.environ.get("LEADERBOARD_TTL", 24 * 3600))
+# Attempts at installing a rebuilt set before giving up (callers fall back to SQL)
+LEADERBOARD_REBUILD_ATTEMPTS = int(os.environ.get("LEADERBOARD_REBUILD_ATTEMPTS", 3))
+LEADERBOARD_PREFIX = "leaderboard:req:"
+
+# Application columns an overall_score (and so a ranking) depends on
+_SCORE_INPUTS = ("cv_score", "assessment_score", "interview_feedback_score")
+
+
+def _member(application_id: int) -> str:
+    return f"{application_id:012d}"
+
+
+class LeaderboardUnavailable(Exception):
+    """Raised when the leaderboard store is disabled or unreachable."""
+
+
+class RequisitionLeaderboard:
+    """
+    Redis sorted sets keyed by requisition. A `<key>:built` marker records
+    that the set holds every application; sets without one are never read.
+    Every committed change bumps `<key>:epoch`, built or not, and a rebuild
+    only installs its snapshot if the epoch did not move while it was reading
+    (WATCH/MULTI), so a commit racing a rebuild is never lost.
+    """
+
+    def __init__(self, url: Optional[str] = LEADERBOARD_REDIS_URL, ttl: int = LEADERBOARD_TTL,
+                 prefix: str = LEADERBOARD_PREFIX):
+        self.url = url
+        self.ttl = ttl
+        self.prefix = prefix
+        self._redis = None
+        self._lock = threading.Lock()
+        self.rebuilds = 0
+        self.errors = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.url)
+
+    @property
+    def redis(self):
+        if not self.enabled:
+            raise LeaderboardUnavailable("LEADERBOARD_REDIS_URL is not set")
+        if self._redis is None:
+            with self._lock:
+                if self._redis is None:
+                    import redis
+                    self._redis = redis.Redis.from_url(self.url, decode_responses=True)
+        return self._redis
+
+    def _key(self, requisition_id: int) -> str:
+        return f"{self.prefix}{requisition_id}"
+
+    def _marker(self, requisition_id: int) -> str:
+        return f"{self.prefix}{requisition_id}:built"
+
+    def _epoch(self, requisition_id: int) -> str:
+        return f"{self.prefix}{requisition_id}:epoch"
+
+    def _call(self, fn, *args):
+        try:
+            return fn(*args)
+        except LeaderboardUnavailable:
+            raise
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Leaderboard Redis call failed: {e}")
+            raise LeaderboardUnavailable(str(e)) from e
+
+    # ----------------------------
+    # Building
+    # ----------------------------
+    def rebuild(self, requisition_id: int) -> int:
+        """
+        Load every application's overall_score into a fresh set. Returns its
+        size. The snapshot is discarded and re-read if a commit touched the
+        requisition in the meantime.
+        """
+        from redis.exceptions import WatchError
+
+        self._refresh_scores(requisition_id)
+
+        key, staging = self._key(requisition_id), f"{self._key(requisition_id)}:staging"
+        epoch_key = self._epoch(requisition_id)
+
+        def install(epoch, scores):
+            with self.redis.pipeline(transaction=True) as pipe:
+                pipe.watch(epoch_key)
+                if pipe.get(epoch_key) != epoch:
+                    return False
+                pipe.multi()
+                pipe.delete(staging)
+                for start in range(0, len(scores), 10000):
+                    pipe.zadd(staging, {_member(app_id): -(score or 0) for app_id, score in scores[start:start + 10000]})
+                if scores:
+                    pipe.rename(staging, key)
+                    pipe.expire(key, self.ttl)
+                else:
+                    pipe.delete(key)
+                pipe.set(self._marker(requisition_id), 1, ex=self.ttl)
+                try:
+                    pipe.execute()
+                except WatchError:
+                    return False
+                return True
+
+        for _ in range(LEADERBOARD_REBUILD_ATTEMPTS):
+            # Read the epoch before the scores: a commit the SELECT misses bumps it afterwards
+            epoch = self._call(self.redis.get, epoch_key)
+            scores = db.session.execute(
+                select(Application.id, Application.overall_score)
+                .where(Application.requisition_id == requisition_id)
+            ).all()
+            if self._call(install, epoch, scores):
+                self.rebuilds += 1
+                return len(scores)
+        raise LeaderboardUnavailable(f"Leaderboard for requisition {requisition_id} kept changing during rebuild")
+
+    def _refresh_scores(self, requisition_id: int):
+        """
+        Bring stored overall_scores up to date in their own transaction (a
+        no-op UPDATE when they are current), so the rebuild does not rank
+        stale or never-computed scores and the caller's session is left alone.
+        """
+        from app.services.shortlist_service import job_weights, overall_score_update
+
+        job = db.session.get(Requisition, requisition_id)
+        if job is None:
+            return
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(overall_score_update(requisition_id, *job_weights(job)))
+        except SQLAlchemyError as e:
+            logger.warning(f"Could not refresh overall scores of requisition {requisition_id}: {e}")
+
+    def _ensure(self, requisition_id: int):
+        if not self._call(self.redis.exists, self._marker(requisition_id)):
+            self.rebuild(requisition_id)
+
+    def invalidate(self, requisition_ids: Iterable[int]):
+        """Drop sets so the next read rebuilds them from the database."""
+        requisition_ids = list(requisition_ids)
+        if not requisition_ids or not self.enabled:
+            return
+
+        def drop():
+            pipe = self.redis.pipeline(transaction=False)
+            for rid in requisition_ids:
+                pipe.delete(self._marker(rid), self._key(rid))
+                # Also abandons any rebuild that read the database before this call
+                pipe.incr(self._epoch(rid))
+                pipe.expire(self._epoch(rid), self.ttl)
+            pipe.execute()
+
+        try:
+            self._call(drop)
+        except LeaderboardUnavailable:
+            pass
+
+    # ----------------------------
+    # Incremental updates
+    # ----------------------------
+    def apply(self, scores: Dict[int, Dict[int, float]], removed: Dict[int, List[int]]):
+        """
+        Write changed scores ({requisition_id: {application_id: overall_score}})
+        and removals into sets that are already built; unbuilt sets are left
+        for their next read to build. Every touched requisition's epoch is
+        bumped, so a rebuild already reading the database starts over.
+        """
+        requisition_ids = set(scores) | set(removed)
+        if not requisition_ids or not self.enabled:
+            return
+
+        def write():
+            ids = sorted(requisition_ids)
+            # Bump the epochs and read the markers atomically: a rebuild
+            # installed before this is seen as built and gets the update, one
+            # installed after fails its WATCH and re-reads the database
+            pipe = self.redis.pipeline(transaction=True)
+            for rid in ids:
+                pipe.incr(self._epoch(rid))
+                pipe.expire(self._epoch(rid), self.ttl)
+            pipe.mget([self._marker(rid) for rid in ids])
+            built = pipe.execute()[-1]
+
+            pipe = self.redis.pipeline(transaction=False)
+            for rid, is_built in zip(ids, built):
+                if not is_built:
+                    continue
+                if scores.get(rid):
+                    pipe.zadd(self._key(rid), {_member(app_id): -score for app_id, score in scores[rid].items()})
+                if removed.get(rid):
+                    pipe.zrem(self._key(rid), *[_member(app_id) for app_id in removed[rid]])
+            pipe.execute()
+
+        try:
+            self._call(write)
+        except LeaderboardUnavailable:
+            # A set that missed an update must not be served; drop it
+            self.invalidate(requisition_ids)
+
+    # ----------------------------
+    # Reads
+    # ----------------------------
+    def page(self, requisition_id: int, offset: int = 0, count: Optional[int] = None,
+             top_k: Optional[int] = None) -> Tuple[List[Tuple[int, float, int]], int]:
+        """
+        (application_id, overall_score, rank) rows by descending score, and the
+        number of rows in scope. Ties share a rank, as with SQL RANK();
+        `top_k` keeps ranks 1..top_k.
+        """
+        self._ensure(requisition_id)
+        key = self._key(requisition_id)
+
+        def read():
+            total = self.redis.zcard(key)
+            if top_k:
+                # Everything scoring at least the K-th score is within rank K
+                kth = self.redis.zrange(key, top_k - 1, top_k - 1, withscores=True)
+                if kth:
+                    total = self.redis.zcount(key, "-inf", kth[0][1])
+            end = total - 1 if count is None else min(total, offset + count) - 1
+            if offset > end:
+                return [], total
+
+            rows = self.redis.zrange(key, offset, end, withscores=True)
+            pipe = self.redis.pipeline(transaction=False)
+            distinct = sorted({score for _, score in rows})
+            for score in distinct:
+                pipe.zcount(key, "-inf", f"({score}")
+            ranks = {score: higher + 1 for score, higher in zip(distinct, pipe.execute())}
+            return [(int(member), -score, ranks[score]) for member, score in rows], total
+
+        return self._call(read)
+
+    def rank(self, requisition_id: int, application_id: int) -> Optional[Tuple[int, float, int]]:
+        """(rank, overall_score, total) of one application, or None if it is not ranked."""
+        self._ensure(requisition_id)
+        key = self._key(requisition_id)
+
+        def read():
+            score = self.redis.zscore(key, _member(application_id))
+            if score is None:
+                return None
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.zcount(key, "-inf", f"({score}")
+            pipe.zcard(key)
+            higher, total = pipe.execute()
+            return higher + 1, -score, total
+
+        return self._call(read)
+
+    def stats(self) -> Dict:
+        return {"enabled": self.enabled, "rebuilds": self.rebuilds, "errors": self.errors}
+
+
+leaderboard = RequisitionLeaderboard()
+
+
+# ----------------------------
+# ORM hooks
+# ----------------------------
+_PENDING_KEY = "leaderboard_pending"
+_STALE_KEY = "leaderboard_stale"
+
+
+def mark_stale(requisition_id: int, session=db.session):
+    """
+    Flag a requisition whose scores were changed by a bulk UPDATE (which the
+    ORM hooks cannot see); its set is dropped once the transaction commits.
+    """
+    session.info.setdefault(_STALE_KEY, set()).add(requisition_id)
+
+
+def _collect_score_changes(session, flush_context, instances):
+    from app.services.shortlist_service import job_weights
+
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    weights = {}
+    with session.no_autoflush:
+        for obj in list(session.new) + list(session.dirty):
+            if not isinstance(obj, Application):
+                continue
+            attrs = inspect(obj).attrs
+            inputs_changed = any(attrs[name].history.has_changes() for name in _SCORE_INPUTS)
+            moved = attrs.requisition_id.history.has_changes()
+            if not (obj in session.new or inputs_changed or moved or attrs.overall_score.history.has_changes()):
+                continue
+
+            # Keep overall_score in step with its inputs unless the caller set it explicitly
+            if (obj in session.new or inputs_changed) and not attrs.overall_score.history.has_changes() \
+                    and obj.requisition_id is not None:
+                if obj.requisition_id not in weights:
+                    job = obj.requisition or session.get(Requisition, obj.requisition_id)
+                    weights[obj.requisition_id] = job_weights(job) if job else None
+                if weights[obj.requisition_id]:
+                    cv_weight, assessment_weight = weights[obj.requisition_id]
+                    obj.overall_score = (
+                        (obj.cv_score or 0) * cv_weight / 100 + (obj.assessment_score or 0) * assessment_weight / 100
+                    )
+
+            # Scores are captured now: after commit the instance is expired
+            changes = pending.setdefault(obj, [])
+            for old_requisition in attrs.requisition_id.history.deleted or ():
+                if old_requisition is not None:
+                    changes.append(("remove", old_requisition, None))
+            if obj.requisition_id is not None:
+                changes.append(("score", obj.requisition_id, obj.overall_score or 0))
+
+        for obj in session.deleted:
+            if isinstance(obj, Application) and obj.requisition_id is not None:
+                pending.setdefault(obj, []).append(("remove", obj.requisition_id, None))
+
+
+def _apply_committed(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    stale = session.info.pop(_STALE_KEY, None) or set()
+    if stale:
+        leaderboard.invalidate(stale)
+    if not pending or not leaderboard.enabled:
+        return
+
+    scores: Dict[int, Dict[int, float]] = {}
+    removed: Dict[int, List[int]] = {}
+    for obj, changes in pending.items():
+        state = inspect(obj)
+        # The identity key, unlike obj.id, needs no refresh of the expired instance
+        if not state.identity:
+            continue
+        application_id = state.identity[0]
+        for action, requisition_id, score in changes:
+            if requisition_id in stale:
+                continue
+            if action == "remove" or state.was_deleted:
+                removed.setdefault(requisition_id, []).append(application_id)
+            else:
+                scores.setdefault(requisition_id, {})[application_id] = score
+    leaderboard.apply(scores, removed)
+
+
+def _discard_pending(session, previous_transaction):
+    session.info.pop(_PENDING_KEY, None)
+    session.info.pop(_STALE_KEY, None)
+
+
+_HOOKS = (
+    ("before_flush", _collect_score_changes),
+    ("after_commit", _apply_committed),
+    ("after_soft_rollback", _discard_pending),
+)
+
+
+def register_leaderboard_hooks(session=db.session):
+    """Keep requisition leaderboards in sync with application scores committed through `session`."""
+    for name, fn in _HOOKS:
+        if not event.contains(session, name, fn):
+            event.listen(session, name, fn)
@@ -0,0 +1,394 @@
+# app/services/llm_client.py
+"""
+Shared LLM HTTP client layer.
+
+- One pooled keep-alive requests.Session per provider
+- A bounded semaphore per provider (bulkhead) capping concurrent calls
+- Exponential backoff with full jitter; sleeps yield to other greenlets under eventlet
+- A circuit breaker so that, once a provider keeps failing, callers fail fast
+  (CircuitOpenError) and fall back to offline analysis instead of waiting
+  through every retry timeout
+"""
+import os
+import sys
+import json
+import time
+import random
+import logging
+import threading
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_API_KEY = os.environ.get("OPENROUTER_API_KEY")
+OPENROUTER_URL = os.environ.get(
+    "OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions"
+)
+OPENROUTER_REFERER = os.environ.get("OPENROUTER_REFERER", "http://localhost:5000")
+
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", 4))
+LLM_QUEUE_TIMEOUT = float(os.environ.get("LLM_QUEUE_TIMEOUT", 30))
+LLM_TIMEOUT = float(os.environ.get("LLM_TIMEOUT", 60))
+LLM_RETRIES = int(os.environ.get("LLM_RETRIES", 3))
+LLM_BACKOFF_BASE = float(os.environ.get("LLM_BACKOFF_BASE", 1))
+LLM_BACKOFF_MAX = float(os.environ.get("LLM_BACKOFF_MAX", 20))
+LLM_BREAKER_THRESHOLD = int(os.environ.get("LLM_BREAKER_THRESHOLD", 5))
+LLM_BREAKER_RESET = float(os.environ.get("LLM_BREAKER_RESET", 60))
+
+# Status codes worth retrying; anything else in 4xx is our request's fault
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+class LLMError(RuntimeError):
+    """A provider call failed (after retries, or with a non-retryable status)."""
+
+
+class CircuitOpenError(LLMError):
+    """The provider's circuit breaker is open; the call was not attempted."""
+
+
+class BulkheadFullError(LLMError):
+    """No concurrency slot became free within the queue timeout."""
+
+
+def cooperative_sleep(seconds: float):
+    """Sleep without blocking the worker: yields to the hub when eventlet is in use."""
+    eventlet = sys.modules.get("eventlet")
+    if eventlet is not None:
+        eventlet.sleep(seconds)
+    else:
+        time.sleep(seconds)
+
+
+# ----------------------------
+# Circuit Breaker
+# ----------------------------
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures;
+    open -> half-open after `reset_timeout` seconds, letting one trial call through;
+    half-open -> closed on success, back to open on failure.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = LLM_BREAKER_THRESHOLD, reset_timeout: float = LLM_BREAKER_RESET):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        return self.state == self.OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def release_trial(self):
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.opened_at is not None or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures}
+
+
+# ----------------------------
+# LLM Client
+# ----------------------------
+class LLMClient:
+    """OpenAI-compatible chat completions client for one provider."""
+
+    def __init__(
+        self,
+        provider: str,
+        url: str,
+        api_key: Optional[str] = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        queue_timeout: float = LLM_QUEUE_TIMEOUT,
+        timeout: float = LLM_TIMEOUT,
+        retries: int = LLM_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        breaker: Optional[CircuitBreaker] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ):
+        self.provider = provider
+        self.url = url
+        self.api_key = api_key
+        self.queue_timeout = queue_timeout
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self.max_concurrency = max_concurrency
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self.in_flight = 0
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Content-Type": "application/json", **(headers or {})})
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.api_key)
+
+    def available(self) -> bool:
+        """True if a call may be attempted now (key set and breaker not open)."""
+        return self.configured and not self.breaker.is_open()
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Full jitter: uniform(0, min(max, base * 2^(attempt-1)))."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1)))
+
+    def chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        timeout: Optional[float] = None,
+        retries: Optional[int] = None,
+        api_key: Optional[str] = None,
+        **extra,
+    ) -> str:
+        """Return the assistant message content, retrying transient failures."""
+        api_key = api_key or self.api_key
+        if not api_key:
+            raise LLMError(f"{self.provider} API key not set")
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.provider} circuit open; skipping call")
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            **extra,
+        }
+        headers = {"Authorization": f"Bearer {api_key}"}
+        retries = self.retries if retries is None else retries
+        timeout = self.timeout if timeout is None else timeout
+
+        last_error = None
+        for attempt in range(1, retries + 1):
+            try:
+                resp = self._post(payload, headers, timeout)
+                if resp.status_code == 200:
+                    try:
+                        content = resp.json()["choices"][0]["message"]["content"]
+                    except (ValueError, KeyError, IndexError, TypeError) as e:
+                        self.breaker.record_failure()
+                        raise LLMError(f"{self.provider} returned an unexpected response: {e}")
+                    self.breaker.record_success()
+                    return content
+
+                last_error = LLMError(f"{self.provider} API error: {resp.status_code} {resp.text[:500]}")
+                if resp.status_code not in RETRYABLE_STATUS:
+                    # Our request is wrong; the provider itself is healthy
+                    self.breaker.record_success()
+                    raise last_error
+                logger.warning("%s returned %s on attempt %d/%d", self.provider, resp.status_code, attempt, retries)
+
+            except LLMError:
+                # Outcome already recorded (or not the provider's fault); free a half-open trial slot
+                self.breaker.release_trial()
+                raise
+            except requests.exceptions.RequestException as e:
+                last_error = e
+                logger.warning("%s request failed on attempt %d/%d: %s", self.provider, attempt, retries, e)
+
+            if attempt < retries:
+                cooperative_sleep(self.backoff_delay(attempt))
+
+        self.breaker.record_failure()
+        raise LLMError(f"{self.provider} call failed after {retries} attempt(s): {last_error}")
+
+    def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: str,
+        temperature: float = 0.7,
+        max_tokens: int = 512,
+        timeout: Optional[float] = None,
+        api_key: Optional[str] = None,
+        **extra,
+    ) -> Iterator[str]:
+        """
+        Yield content deltas as the provider streams them (OpenAI-style SSE).
+        Connection setup is retried like chat_completion; once tokens have been
+        yielded, a failure propagates to the caller. The concurrency slot is
+        held until the stream is exhausted or closed.
+        """
+        api_key = api_key or self.api_key
+        if not api_key:
+            raise LLMError(f"{self.provider} API key not set")
+        if not self.breaker.allow():
+            raise CircuitOpenError(f"{self.provider} circuit open; skipping call")
+
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "stream": True,
+            **extra,
+        }
+        headers = {"Authorization": f"Bearer {api_key}", "Accept": "text/event-stream"}
+        timeout = self.timeout if timeout is None else timeout
+
+        try:
+            self._acquire_slot()
+        except BulkheadFullError:
+            self.breaker.release_trial()
+            raise
+        try:
+            resp = None
+            last_error = None
+            for attempt in range(1, self.retries + 1):
+                try:
+                    resp = self.session.post(self.url, json=payload, headers=headers, timeout=timeout, stream=True)
+                except requests.exceptions.RequestException as e:
+                    last_error = e
+                    resp = None
+                else:
+                    if resp.status_code == 200:
+                        break
+                    last_error = LLMError(f"{self.provider} API error: {resp.status_code} {resp.text[:500]}")
+                    resp.close()
+                    if resp.status_code not in RETRYABLE_STATUS:
+                        self.breaker.record_success()
+                        raise last_error
+                    resp = None
+                logger.warning("%s stream failed on attempt %d/%d: %s", self.provider, attempt, self.retries, last_error)
+                if attempt < self.retries:
+                    cooperative_sleep(self.backoff_delay(attempt))
+
+            if resp is None:
+                self.breaker.record_failure()
+                raise LLMError(f"{self.provider} stream failed after {self.retries} attempt(s): {last_error}")
+
+            with resp:
+                # SSE is always UTF-8; without a charset requests would guess ISO-8859-1
+                resp.encoding = "utf-8"
+                try:
+                    # chunk_size=None hands over each chunk as soon as it arrives
+                    for line in resp.iter_lines(chunk_size=None, decode_unicode=True):
+                        if not line or not line.startswith("data:"):
+                            continue  # blank separators and ": keep-alive" comments
+                        data = line[len("data:"):].strip()
+                        if data == "[DONE]":
+                            break
+                        try:
+                            delta = json.loads(data)["choices"][0].get("delta", {}).get("content")
+                        except (ValueError, KeyError, IndexError, TypeError):
+                            continue
+                        if delta:
+                            yield delta
+                except requests.exceptions.RequestException as e:
+                    # Connection dropped or read timed out mid-stream
+                    self.breaker.record_failure()
+                    raise LLMError(f"{self.provider} stream interrupted: {e}") from e
+            # Only a stream read to the end counts as a healthy call
+            self.breaker.record_success()
+        finally:
+            self.breaker.release_trial()
+            self._release_slot()
+
+    def _acquire_slot(self):
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            raise BulkheadFullError(
+                f"{self.provider}: {self.max_concurrency} calls already in flight"
+            )
+        self.in_flight += 1
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        self._slots.release()
+
+    def _post(self, payload, headers, timeout):
+        self._acquire_slot()
+        try:
+            return self.session.post(self.url, json=payload, headers=headers, timeout=timeout)
+        finally:
+            self._release_slot()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "provider": self.provider,
+            "configured": self.configured,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "breaker": self.breaker.stats(),
+        }
+
+
+# ----------------------------
+# Provider registry
+# ----------------------------
+_clients: Dict[str, LLMClient] = {}
+_clients_lock = threading.Lock()
+
+
+def _build_openrouter():
+    return LLMClient(
+        "openrouter",
+        OPENROUTER_URL,
+        api_key=OPENROUTER_API_KEY,
+        headers={"HTTP-Referer": OPENROUTER_REFERER},
+    )
+
+
+_PROVIDERS = {"openrouter": _build_openrouter}
+
+
+def get_llm_client(provider: str = "openrouter") -> LLMClient:
+    """Process-wide client for `provider` (shared session, bulkhead and breaker)."""
+    client = _clients.get(provider)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(provider)
+            if client is None:
+                client = _clients[provider] = _PROVIDERS[provider]()
+    return client
+
+
+def llm_stats() -> Dict[str, Any]:
+    return {name: client.stats() for name, client in _clients.items()}
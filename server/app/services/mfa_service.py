@@ -1,5 +1,4 @@
 import pyotp
-import qrcode
 import io
 import base64
 from datetime import datetime
@@ -27,6 +26,7 @@ class MFAService:
     @staticmethod
     def generate_qr_code_image(uri):
         """Return a base64-encoded PNG QR code image."""
+        import qrcode  # pulls in PIL; imported on first use
         qr = qrcode.make(uri)
         buffer = io.BytesIO()
         qr.save(buffer, format="PNG")
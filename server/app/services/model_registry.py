@@ -0,0 +1,205 @@
+# app/services/model_registry.py
+import os
+import sys
+import time
+import logging
+import threading
+import subprocess
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+SPACY_MODEL = os.environ.get("SPACY_MODEL", "en_core_web_sm")
+# Keyword extraction only needs POS tags and lemmas; these components are never loaded
+SPACY_EXCLUDE = [c for c in os.environ.get("SPACY_EXCLUDE", "parser,ner,senter").split(",") if c]
+EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+# "torch" (sentence-transformers) or "onnx" (ONNX Runtime export, falls back to torch)
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch").lower()
+EMBEDDING_ONNX_QUANTIZED = os.environ.get("EMBEDDING_ONNX_QUANTIZED", "true").lower() == "true"
+
+
+def _current_rss_bytes() -> int:
+    """Resident set size of this process, used to attribute memory to a model load."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        try:
+            import resource
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak if sys.platform == "darwin" else peak * 1024
+        except Exception:
+            return 0
+
+
+class ModelRegistry:
+    """
+    Process-wide registry of heavy NLP / embedding models.
+
+    Each model is loaded lazily on first use, exactly once per worker process,
+    and shared by every caller. Load time and the RSS growth observed during
+    the load are recorded per model so they can be reported by health checks.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, Dict[str, Any]] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+
+    # ----------------------------
+    # Registration
+    # ----------------------------
+    def register(self, name: str, loader: Callable[[], Any]):
+        """Register a zero-argument loader under `name` (replaces any previous loader)."""
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+            self._models.pop(name, None)
+            self._stats[name] = {
+                "loaded": False,
+                "load_seconds": None,
+                "memory_bytes": None,
+                "error": None,
+            }
+
+    def names(self):
+        return list(self._loaders)
+
+    def annotate(self, name: str, **info):
+        """Attach extra details (e.g. the backend in use) to a model's stats."""
+        with self._registry_lock:
+            self._stats[name].update(info)
+
+    # ----------------------------
+    # Access
+    # ----------------------------
+    def get(self, name: str, retry_failed: bool = False) -> Optional[Any]:
+        """
+        Return the model registered under `name`, loading it on first use.
+        Returns None if the model failed to load; a failed load is not retried
+        unless `retry_failed` is set, so a missing model costs one attempt per process.
+        """
+        if name in self._models:
+            return self._models[name]
+        if name not in self._loaders:
+            raise KeyError(f"Unknown model: {name}")
+
+        stats = self._stats[name]
+        if stats["error"] and not retry_failed:
+            return None
+
+        with self._locks[name]:
+            # Another caller may have finished loading while we waited
+            if name in self._models:
+                return self._models[name]
+
+            rss_before = _current_rss_bytes()
+            started = time.perf_counter()
+            try:
+                model = self._loaders[name]()
+            except Exception as e:
+                stats.update(error=str(e), loaded=False)
+                logger.error(f"Failed to load model '{name}': {e}")
+                return None
+
+            stats.update(
+                loaded=True,
+                error=None,
+                load_seconds=round(time.perf_counter() - started, 3),
+                memory_bytes=max(0, _current_rss_bytes() - rss_before),
+            )
+            self._models[name] = model
+            logger.info(
+                "Model '%s' loaded in %.2fs (~%.1f MB)",
+                name, stats["load_seconds"], stats["memory_bytes"] / (1024 * 1024)
+            )
+            return model
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._models
+
+    # ----------------------------
+    # Warm-up & Readiness
+    # ----------------------------
+    def warm_up(self, names: Optional[Iterable[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """Eagerly load the given models (default: all). Previously failed loads are retried."""
+        for name in list(names or self._loaders):
+            self.get(name, retry_failed=True)
+        return self.stats()
+
+    def ready(self, names: Optional[Iterable[str]] = None) -> bool:
+        """True when every requested model (default: all) is loaded."""
+        return all(self.is_loaded(name) for name in (names or self._loaders))
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {name: dict(stats) for name, stats in self._stats.items()}
+
+
+# ----------------------------
+# Default Loaders
+# ----------------------------
+def _load_spacy():
+    """Load the trimmed spaCy pipeline, downloading the model once if it is not installed."""
+    import spacy
+    try:
+        return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+    except OSError:
+        logger.info(f"{SPACY_MODEL} not found. Downloading...")
+        subprocess.run([sys.executable, "-m", "spacy", "download", SPACY_MODEL], check=True)
+        return spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+
+
+def _load_embedding_model():
+    """
+    Load the embedding model on the configured backend. Both expose
+    SentenceTransformer's `encode()`; if the ONNX export cannot be loaded the
+    PyTorch model is used instead.
+    """
+    if EMBEDDING_BACKEND == "onnx":
+        try:
+            from app.services.onnx_embedding import load_onnx_model
+            model = load_onnx_model(EMBEDDING_MODEL, quantized=EMBEDDING_ONNX_QUANTIZED)
+            model_registry.annotate("embedding", backend=model.backend)
+            return model
+        except Exception as e:
+            logger.warning(f"ONNX embedding backend unavailable ({e}); falling back to PyTorch")
+
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(EMBEDDING_MODEL)
+    model_registry.annotate("embedding", backend="torch")
+    return model
+
+
+model_registry = ModelRegistry()
+model_registry.register("spacy", _load_spacy)
+model_registry.register("embedding", _load_embedding_model)
+
+
+def get_spacy():
+    return model_registry.get("spacy")
+
+
+def get_embedding_model():
+    return model_registry.get("embedding")
+
+
+def embedding_model_tag(load: bool = True) -> str:
+    """
+    Identity stored with persisted embeddings: the model name plus the backend
+    that actually serves it ("torch", "onnx", "onnx-int8"). Backends do not
+    produce bit-identical vectors, so switching EMBEDDING_BACKEND (or falling
+    back to PyTorch) marks existing vectors stale. With `load=False` an
+    unloaded model is not loaded and the configured backend is reported.
+    """
+    model = get_embedding_model() if load or model_registry.is_loaded("embedding") else None
+    if model is not None:
+        backend = getattr(model, "backend", "torch")
+    elif EMBEDDING_BACKEND == "onnx" and EMBEDDING_ONNX_QUANTIZED:
+        backend = "onnx-int8"
+    else:
+        backend = EMBEDDING_BACKEND
+    return f"{EMBEDDING_MODEL}:{backend}"
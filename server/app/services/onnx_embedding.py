@@ -0,0 +1,173 @@
+# app/services/onnx_embedding.py
+"""
+ONNX Runtime backend for the sentence embedding model.
+
+`OnnxEmbeddingModel` runs an ONNX export of EMBEDDING_MODEL (optionally
+int8-quantized) with the same `encode()` interface as SentenceTransformer:
+mean pooling over the token embeddings, then optional L2 normalisation.
+It needs only `onnxruntime`, `tokenizers` and numpy at runtime; torch and
+transformers are only needed once, to export the model (`flask
+export-embedding-onnx`).
+
+Parity with the PyTorch model and encode throughput are checked with
+scripts/benchmark_embedding_backends.py.
+"""
+import os
+import json
+import logging
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_ONNX_DIR = os.environ.get("EMBEDDING_ONNX_DIR", "instance/embedding_onnx")
+EMBEDDING_ONNX_THREADS = int(os.environ.get("EMBEDDING_ONNX_THREADS", 0))  # 0 = onnxruntime default
+EMBEDDING_MAX_SEQ_LENGTH = int(os.environ.get("EMBEDDING_MAX_SEQ_LENGTH", 256))
+
+MODEL_FILE = "model.onnx"
+QUANTIZED_MODEL_FILE = "model.int8.onnx"
+TOKENIZER_FILE = "tokenizer.json"
+META_FILE = "export.json"
+
+
+def export_dir(model_name: str, root: str = EMBEDDING_ONNX_DIR) -> str:
+    return os.path.join(root, model_name.replace("/", "__"))
+
+
+class OnnxEmbeddingModel:
+    """Drop-in replacement for `SentenceTransformer.encode` backed by ONNX Runtime."""
+
+    def __init__(
+        self,
+        model_dir: str,
+        quantized: bool = False,
+        max_seq_length: int = EMBEDDING_MAX_SEQ_LENGTH,
+        threads: int = EMBEDDING_ONNX_THREADS,
+    ):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_file = QUANTIZED_MODEL_FILE if quantized else MODEL_FILE
+        model_path = os.path.join(model_dir, model_file)
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"No ONNX export at {model_path}; run `flask export-embedding-onnx`")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, TOKENIZER_FILE))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding()
+
+        self.backend = "onnx-int8" if quantized else "onnx"
+        self.max_seq_length = max_seq_length
+        dimension = self.session.get_outputs()[0].shape[-1]
+        self.dimension = dimension if isinstance(dimension, int) else int(self._encode_batch(["probe"]).shape[1])
+
+    def _encode_batch(self, texts: List[str]):
+        import numpy as np
+
+        encodings = self.tokenizer.encode_batch(texts)
+        input_ids = np.array([e.ids for e in encodings], dtype=np.int64)
+        attention_mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {"input_ids": input_ids, "attention_mask": attention_mask}
+        if "token_type_ids" in self.input_names:
+            feeds["token_type_ids"] = np.zeros_like(input_ids)
+
+        token_embeddings = self.session.run(None, feeds)[0]
+        # Mean pooling over real (non-padding) tokens, as sentence-transformers does
+        mask = attention_mask[..., None].astype(np.float32)
+        summed = (token_embeddings * mask).sum(axis=1)
+        return summed / np.clip(mask.sum(axis=1), 1e-9, None)
+
+    def encode(
+        self,
+        sentences,
+        batch_size: int = 32,
+        convert_to_numpy: bool = True,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False,
+        **kwargs,
+    ):
+        import numpy as np
+
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else [text or "" for text in sentences]
+        if not texts:
+            return np.zeros((0, self.dimension), dtype=np.float32)
+
+        # Length-sorted batches keep padding (and wasted compute) to a minimum
+        order = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+        vectors = np.empty((len(texts), self.dimension), dtype=np.float32)
+        for start in range(0, len(order), batch_size):
+            batch = order[start:start + batch_size]
+            vectors[batch] = self._encode_batch([texts[i] for i in batch])
+
+        if normalize_embeddings:
+            vectors /= np.clip(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12, None)
+        return vectors[0] if single else vectors
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+
+def load_onnx_model(model_name: str, quantized: bool = False, root: str = EMBEDDING_ONNX_DIR) -> OnnxEmbeddingModel:
+    """Load the ONNX export of `model_name`, refusing exports of a different model."""
+    model_dir = export_dir(model_name, root)
+    meta_path = os.path.join(model_dir, META_FILE)
+    if os.path.exists(meta_path):
+        with open(meta_path) as f:
+            exported = json.load(f).get("model")
+        if exported != model_name:
+            raise ValueError(f"ONNX export in {model_dir} is for '{exported}', not '{model_name}'")
+    return OnnxEmbeddingModel(model_dir, quantized=quantized)
+
+
+def export_onnx(model_name: str, root: str = EMBEDDING_ONNX_DIR, quantize: bool = True,
+                opset: int = 14) -> Optional[str]:
+    """
+    Export the transformer behind `model_name` to ONNX (plus an int8 dynamic
+    quantization when `quantize` is set). Requires torch and transformers.
+    Returns the export directory.
+    """
+    import torch
+    from transformers import AutoModel, AutoTokenizer
+
+    hub_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    model_dir = export_dir(model_name, root)
+    os.makedirs(model_dir, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(hub_name)
+    model = AutoModel.from_pretrained(hub_name).eval()
+    model.config.return_dict = False  # plain tuple outputs; [0] is the token embeddings
+    tokenizer.backend_tokenizer.save(os.path.join(model_dir, TOKENIZER_FILE))
+
+    sample = tokenizer(["export sample"], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["token_embeddings"] = {0: "batch", 1: "sequence"}
+
+    model_path = os.path.join(model_dir, MODEL_FILE)
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(sample[name] for name in input_names),
+            model_path,
+            input_names=input_names,
+            output_names=["token_embeddings"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+        )
+    logger.info(f"Exported {hub_name} to {model_path}")
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(model_path, os.path.join(model_dir, QUANTIZED_MODEL_FILE), weight_type=QuantType.QInt8)
+        logger.info(f"Wrote int8 quantized model to {os.path.join(model_dir, QUANTIZED_MODEL_FILE)}")
+
+    with open(os.path.join(model_dir, META_FILE), "w") as f:
+        json.dump({"model": model_name, "hub_name": hub_name, "opset": opset, "quantized": quantize}, f)
+    return model_dir
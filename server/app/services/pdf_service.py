@@ -1,5 +1,4 @@
 # app/services/pdf_service.py
-from fpdf import FPDF
 import tempfile
 import cloudinary.uploader
 import os
@@ -17,6 +16,8 @@ class PDFService:
         candidate_name = getattr(offer.application.candidate, 'full_name', 'Candidate')
         job_title = getattr(offer.application.requisition, 'title', 'Position')
 
+        from fpdf import FPDF  # pulls in PIL; imported on first use
+
         pdf = FPDF()
         pdf.add_page()
 
@@ -0,0 +1,170 @@
+# app/services/powerbi_export.py
+"""
+Streaming Power BI export of applications.
+
+One statement joins each application to its candidate, user and requisition,
+takes the first assessment recommendation, and rolls interviews up per
+application (count and `array_agg` of scheduled times; `group_concat` on
+SQLite). Rows are fetched through a server-side cursor (`yield_per`) and
+serialised one at a time as a JSON array, NDJSON or CSV, so memory stays
+flat and the first row is sent as soon as the database returns it.
+"""
+import io
+import csv
+import json
+import os
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Application, AssessmentResult, Candidate, Interview, Requisition, User
+
+logger = logging.getLogger(__name__)
+
+POWERBI_EXPORT_BATCH_SIZE = int(os.environ.get("POWERBI_EXPORT_BATCH_SIZE", 1000))
+
+EXPORT_FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+EXPORT_COLUMNS = (
+    "application_id", "application_status", "cv_score", "assessment_score", "overall_score",
+    "recommendation", "candidate_id", "candidate_name", "candidate_email", "candidate_verified",
+    "job_id", "job_title", "job_category", "interview_count", "interview_dates",
+)
+
+
+def _interview_rollup(dialect: str):
+    """Per-application interview count and scheduled times, as a subquery."""
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import aggregate_order_by
+        dates = func.array_agg(aggregate_order_by(Interview.scheduled_time, Interview.id))
+    else:
+        dates = func.group_concat(Interview.scheduled_time, ",")
+    return (
+        select(
+            Interview.application_id,
+            func.count().label("interview_count"),
+            dates.label("interview_dates"),
+        )
+        .where(Interview.application_id.isnot(None))
+        .group_by(Interview.application_id)
+        .subquery()
+    )
+
+
+def export_statement(
+    job_id: Optional[int] = None,
+    candidate_id: Optional[int] = None,
+    status: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+):
+    """The single SELECT behind the export, with the endpoint's filters applied."""
+    interviews = _interview_rollup(db.engine.dialect.name)
+    recommendation = (
+        select(AssessmentResult.recommendation)
+        .where(AssessmentResult.application_id == Application.id)
+        .order_by(AssessmentResult.id)
+        .limit(1)
+        .scalar_subquery()
+    )
+
+    stmt = (
+        select(
+            Application.id.label("application_id"),
+            Application.status.label("application_status"),
+            Application.cv_score,
+            Application.assessment_score,
+            Application.overall_score,
+            recommendation.label("recommendation"),
+            Candidate.id.label("candidate_id"),
+            Candidate.full_name.label("candidate_name"),
+            User.email.label("candidate_email"),
+            User.is_verified.label("candidate_verified"),
+            Requisition.id.label("job_id"),
+            Requisition.title.label("job_title"),
+            Requisition.category.label("job_category"),
+            func.coalesce(interviews.c.interview_count, 0).label("interview_count"),
+            interviews.c.interview_dates,
+        )
+        .outerjoin(Candidate, Candidate.id == Application.candidate_id)
+        .outerjoin(User, User.id == Candidate.user_id)
+        .outerjoin(Requisition, Requisition.id == Application.requisition_id)
+        .outerjoin(interviews, interviews.c.application_id == Application.id)
+        .order_by(Application.id)
+    )
+
+    if job_id:
+        stmt = stmt.where(Application.requisition_id == job_id)
+    if candidate_id:
+        stmt = stmt.where(Application.candidate_id == candidate_id)
+    if status:
+        stmt = stmt.where(Application.status == status)
+    if start_date:
+        stmt = stmt.where(Application.created_at >= start_date)
+    if end_date:
+        stmt = stmt.where(Application.created_at <= end_date)
+    return stmt
+
+
+def _interview_dates(value) -> list:
+    if not value:
+        return []
+    if isinstance(value, str):
+        # group_concat on SQLite
+        return [datetime.fromisoformat(part).isoformat() for part in value.split(",")]
+    return [scheduled.isoformat() for scheduled in value if scheduled is not None]
+
+
+def iter_export_rows(stmt, batch_size: int = POWERBI_EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+    """Rows of `stmt` as export dicts, fetched `batch_size` at a time from a server-side cursor."""
+    result = db.session.execute(stmt.execution_options(yield_per=batch_size))
+    for row in result.mappings():
+        row = dict(row)
+        row["interview_dates"] = _interview_dates(row["interview_dates"])
+        yield row
+
+
+# ----------------------------
+# Serialisation
+# ----------------------------
+def _json_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    yield "["
+    for index, row in enumerate(rows):
+        yield ("," if index else "") + json.dumps(row)
+    yield "]"
+
+
+def _ndjson_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(row) + "\n"
+
+
+def _csv_rows(rows: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_COLUMNS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow({**row, "interview_dates": ";".join(row["interview_dates"])})
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+_SERIALISERS = {"json": _json_rows, "ndjson": _ndjson_rows, "csv": _csv_rows}
+
+
+def stream_export(stmt, fmt: str = "json", batch_size: int = POWERBI_EXPORT_BATCH_SIZE) -> Iterator[str]:
+    """Serialised export chunks of `stmt` in `fmt` (one of EXPORT_FORMATS)."""
+    try:
+        yield from _SERIALISERS[fmt](iter_export_rows(stmt, batch_size))
+    except Exception:
+        # Headers are already sent; the truncated body is the only signal left
+        logger.exception("Power BI export stream failed")
+        raise
@@ -0,0 +1,273 @@
+# app/services/prompt_compaction.py
+"""
+Prompt compaction for CV-vs-job LLM calls.
+
+The CV is split into sections (summary, experience, education, skills, ...),
+boilerplate and duplicate lines are dropped, and sections are kept in
+priority order until the token budget is spent; the kept sections are then
+re-assembled in their original order. Token counts use tiktoken when it is
+installed and a fast regex approximation otherwise.
+"""
+import os
+import re
+import logging
+import threading
+from typing import Any, Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CV_TOKEN_BUDGET = int(os.environ.get("PROMPT_CV_TOKEN_BUDGET", 1500))
+PROMPT_JOB_TOKEN_BUDGET = int(os.environ.get("PROMPT_JOB_TOKEN_BUDGET", 600))
+PROMPT_TOKENIZER = os.environ.get("PROMPT_TOKENIZER", "cl100k_base")
+
+# ----------------------------
+# Tokenizer
+# ----------------------------
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+_encoding = None
+_encoding_loaded = False
+
+
+def _get_encoding():
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        _encoding_loaded = True
+        try:
+            import tiktoken
+            _encoding = tiktoken.get_encoding(PROMPT_TOKENIZER)
+        except Exception:
+            logger.info("tiktoken unavailable; using regex token estimate for prompt budgets")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count of `text` (tiktoken if available, else words + punctuation)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return len(_TOKEN_RE.findall(text))
+
+
+# ----------------------------
+# Sectioning
+# ----------------------------
+SECTION_HEADINGS = {
+    "summary": r"summary|profile|professional summary|objective|about me|career objective",
+    "experience": r"experience|work experience|professional experience|employment( history)?|work history|career history",
+    "education": r"education|academic background|qualifications|academic qualifications",
+    "skills": r"skills|technical skills|core competencies|key skills|competencies|technologies|tools",
+    "certifications": r"certifications?|certificates|licenses?( and certifications)?|courses|training",
+    "projects": r"projects|key projects|personal projects",
+    "languages": r"languages",
+    "achievements": r"achievements|awards|honou?rs",
+    "references": r"references|referees",
+    "interests": r"interests|hobbies( and interests)?|hobbies",
+}
+_HEADING_RE = {
+    name: re.compile(rf"^\s*(?:{pattern})\s*:?\s*$", re.IGNORECASE)
+    for name, pattern in SECTION_HEADINGS.items()
+}
+
+# Higher first; "header" is the text before the first heading (name, contact details)
+SECTION_PRIORITY = [
+    "skills", "experience", "summary", "header", "education",
+    "certifications", "projects", "achievements", "languages", "other",
+]
+# Sections that never help a CV-vs-job comparison
+DROPPED_SECTIONS = {"references", "interests"}
+
+_BOILERPLATE_RE = re.compile(
+    r"^(curriculum vitae|resume|r[ée]sum[ée]|cv|page \d+( of \d+)?|references available( up)?on request\.?"
+    r"|[\W_]+)$",
+    re.IGNORECASE,
+)
+
+
+def _heading(line: str):
+    if len(line) > 40:
+        return None
+    for name, pattern in _HEADING_RE.items():
+        if pattern.match(line):
+            return name
+    return None
+
+
+def split_sections(text: str) -> List[Tuple[str, List[str]]]:
+    """Split CV text into (section_name, lines), dropping boilerplate and repeated lines."""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    seen = set()
+    for raw in (text or "").splitlines():
+        line = " ".join(raw.split())
+        if not line or _BOILERPLATE_RE.match(line):
+            continue
+        name = _heading(line)
+        if name:
+            sections.append((name, [line]))
+            continue
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        sections[-1][1].append(line)
+    return [(name, lines) for name, lines in sections if lines]
+
+
+def truncate_tokens(text: str, budget: int) -> str:
+    """The longest prefix of `text` within `budget` tokens, cut back to a word boundary where possible."""
+    if budget <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= budget:
+            return text
+        prefix = encoding.decode(tokens[:budget]).rstrip("\ufffd")
+    else:
+        matches = list(_TOKEN_RE.finditer(text))
+        if len(matches) <= budget:
+            return text
+        prefix = text[:matches[budget - 1].end()]
+    # Don't end on half a word when there is an earlier word break to cut at
+    head, space, _ = prefix.rpartition(" ")
+    return (head if space and head else prefix).rstrip()
+
+
+def _take_lines(lines: List[str], budget: int, truncate: bool = True) -> Tuple[List[str], int]:
+    """
+    Whole lines that fit in `budget` tokens. With `truncate`, the first line
+    that does not fit is cut to the budget left rather than dropped, so one
+    over-long line (e.g. a CV extracted without line breaks) still yields text.
+    """
+    kept, used = [], 0
+    for line in lines:
+        cost = count_tokens(line) + 1  # newline
+        if used + cost > budget:
+            if truncate:
+                partial = truncate_tokens(line, budget - used - 1)
+                if partial:
+                    kept.append(partial)
+                    used += count_tokens(partial) + 1
+            break
+        kept.append(line)
+        used += cost
+    return kept, used
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def compact_cv(text: str, budget: int = PROMPT_CV_TOKEN_BUDGET) -> Dict[str, Any]:
+    """
+    Fit a CV into `budget` tokens. Returns {"text", "tokens_before", "tokens_after",
+    "sections_kept", "sections_dropped"}.
+    """
+    tokens_before = count_tokens(text)
+    sections = [
+        (index, name, lines) for index, (name, lines) in enumerate(split_sections(text))
+        if name not in DROPPED_SECTIONS
+    ]
+
+    def priority(section):
+        name = section[1]
+        return SECTION_PRIORITY.index(name) if name in SECTION_PRIORITY else len(SECTION_PRIORITY)
+
+    ordered = sorted(sections, key=priority)
+    kept: Dict[int, List[str]] = {index: [] for index, _, _ in sections}
+    remaining = budget
+
+    # Pass 1: every section gets up to an equal share, so one long section
+    # (usually experience) cannot crowd out education or the summary.
+    # Pass 2: whatever is left extends sections in priority order.
+    share = budget // max(len(sections), 1)
+    for limit in (share, None):
+        for index, name, lines in ordered:
+            if remaining <= 0:
+                break
+            allowance = remaining if limit is None else min(limit, remaining)
+            # Only the final pass cuts lines, so a share-limited line is not
+            # truncated when pass 2 could still fit it whole
+            taken, used = _take_lines(lines[len(kept[index]):], allowance, truncate=limit is None)
+            kept[index].extend(taken)
+            remaining -= used
+
+    # A heading on its own is noise
+    kept = {
+        index: lines for index, lines in kept.items()
+        if len(lines) > (1 if lines and _heading(lines[0]) else 0)
+    }
+
+    compacted = "\n".join(line for index in sorted(kept) for line in kept[index])
+    return {
+        "text": compacted,
+        "tokens_before": tokens_before,
+        "tokens_after": count_tokens(compacted),
+        "sections_kept": [name for index, name, _ in sections if index in kept],
+        "sections_dropped": [name for index, name, _ in sections if index not in kept],
+    }
+
+
+def compact_text(text: str, budget: int) -> Dict[str, Any]:
+    """Deduplicate lines and trim plain text (e.g. a job description) to `budget` tokens."""
+    tokens_before = count_tokens(text)
+    lines = [line for _, section_lines in split_sections(text) for line in section_lines]
+    taken, _ = _take_lines(lines, budget)
+    compacted = "\n".join(taken)
+    return {"text": compacted, "tokens_before": tokens_before, "tokens_after": count_tokens(compacted)}
+
+
+# ----------------------------
+# Savings metrics
+# ----------------------------
+class CompactionStats:
+    """Per-call-site counters of prompt tokens before/after compaction and LLM latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, label: str, tokens_before: int, tokens_after: int, seconds: float = None):
+        with self._lock:
+            stats = self._stats.setdefault(label, {
+                "calls": 0, "tokens_before": 0, "tokens_after": 0, "tokens_saved": 0, "llm_seconds": 0.0,
+            })
+            stats["calls"] += 1
+            stats["tokens_before"] += tokens_before
+            stats["tokens_after"] += tokens_after
+            stats["tokens_saved"] += tokens_before - tokens_after
+            if seconds is not None:
+                stats["llm_seconds"] += seconds
+        logger.info(
+            "Prompt compaction [%s]: %d -> %d tokens (saved %d)%s",
+            label, tokens_before, tokens_after, tokens_before - tokens_after,
+            f", LLM call {seconds:.2f}s" if seconds is not None else "",
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            result = {}
+            for label, stats in self._stats.items():
+                stats = dict(stats)
+                stats["avg_llm_seconds"] = round(stats["llm_seconds"] / stats["calls"], 3) if stats["calls"] else 0.0
+                result[label] = stats
+            return result
+
+
+compaction_stats = CompactionStats()
+
+
+def compact_prompt_inputs(
+    cv_text: str,
+    job_description: str,
+    cv_budget: int = PROMPT_CV_TOKEN_BUDGET,
+    job_budget: int = PROMPT_JOB_TOKEN_BUDGET,
+) -> Tuple[str, str, Dict[str, int]]:
+    """Compact both sides of a CV-vs-job prompt. Returns (cv, job, token counts)."""
+    cv = compact_cv(cv_text, cv_budget)
+    job = compact_text(job_description, job_budget)
+    return cv["text"], job["text"], {
+        "tokens_before": cv["tokens_before"] + job["tokens_before"],
+        "tokens_after": cv["tokens_after"] + job["tokens_after"],
+    }
+
@@ -0,0 +1,144 @@
+# app/services/rescoring_service.py
+import os
+import logging
+import threading
+from typing import Any, Dict, Optional
+
+from flask import current_app
+from sqlalchemy import case, update
+
+from app.extensions import db, socketio
+from app.models import Application, Candidate, Requisition
+from app.services.embedding_service import encode_texts, get_job_embedding
+from app.services.keyword_extractor import get_keyword_extractor
+from app.services.leaderboard import mark_stale
+from app.services.rollups import rebuild_rollups
+from app.services.shortlist_service import job_weights, overall_score_expression
+
+logger = logging.getLogger(__name__)
+
+RESCORE_BATCH_SIZE = int(os.environ.get("RESCORE_BATCH_SIZE", 64))
+
+
+def _emit(user_id, event, payload):
+    if user_id is None:
+        return
+    try:
+        socketio.emit(event, payload, room=f"user_{user_id}")
+    except Exception as e:
+        logger.warning(f"Failed to push {event} to user {user_id}: {e}")
+
+
+def rescore_requisition(
+    job_id: int,
+    user_id: Optional[int] = None,
+    rescore_cv: bool = True,
+    batch_size: int = RESCORE_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """
+    Recompute cv_score and overall_score for every application of a requisition.
+
+    CVs are encoded `batch_size` at a time and scored against the stored job
+    embedding (one matrix-vector product per batch); without an embedding model
+    the offline keyword score is used. All scores are written back in a single
+    UPDATE. With rescore_cv=False only overall_score is recomputed, in SQL.
+    Progress is pushed to the `user_{id}` room as `rescore_progress` events.
+    """
+    job = db.session.get(Requisition, job_id)
+    if not job:
+        raise ValueError(f"Requisition {job_id} not found")
+
+    cv_weight, assessment_weight = job_weights(job)
+
+    if not rescore_cv:
+        result = db.session.execute(
+            update(Application)
+            .where(Application.requisition_id == job.id)
+            .values(overall_score=overall_score_expression(cv_weight, assessment_weight))
+        )
+        mark_stale(job.id)
+        db.session.commit()
+        summary = {"job_id": job.id, "total": result.rowcount, "updated": result.rowcount, "rescored_cv": False}
+        _emit(user_id, "rescore_completed", summary)
+        return summary
+
+    rows = (
+        db.session.query(Application.id, Application.assessment_score, Candidate.cv_text)
+        .join(Candidate, Candidate.id == Application.candidate_id)
+        .filter(Application.requisition_id == job.id)
+        .filter(Candidate.cv_text.isnot(None), Candidate.cv_text != "")
+        .order_by(Application.id)
+        .all()
+    )
+    total = len(rows)
+    _emit(user_id, "rescore_progress", {"job_id": job.id, "processed": 0, "total": total})
+
+    job_embedding = get_job_embedding(job)
+    extractor = get_keyword_extractor()
+
+    cv_scores: Dict[int, float] = {}
+    overall_scores: Dict[int, float] = {}
+    for start in range(0, total, batch_size):
+        batch = rows[start:start + batch_size]
+
+        vectors = encode_texts([cv_text for _, _, cv_text in batch], batch_size=batch_size) \
+            if job_embedding is not None else None
+        if vectors is not None:
+            # Rows and job vector are L2-normalised: one mat-vec gives every cosine similarity
+            scores = [int(s * 100) for s in (vectors @ job_embedding)]
+        else:
+            scores = [
+                result["match_score"]
+                for result in extractor.score_resumes([cv_text for _, _, cv_text in batch], job=job)
+            ]
+
+        for (application_id, assessment_score, _), cv_score in zip(batch, scores):
+            cv_scores[application_id] = cv_score
+            overall_scores[application_id] = (
+                cv_score * cv_weight / 100 + (assessment_score or 0) * assessment_weight / 100
+            )
+
+        _emit(user_id, "rescore_progress", {
+            "job_id": job.id,
+            "processed": min(start + batch_size, total),
+            "total": total,
+        })
+
+    if cv_scores:
+        db.session.execute(
+            update(Application)
+            .where(Application.id.in_(list(cv_scores)))
+            .values(
+                cv_score=case(cv_scores, value=Application.id),
+                overall_score=case(overall_scores, value=Application.id),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        mark_stale(job.id)
+        # cv_score bands changed outside the ORM hooks
+        rebuild_rollups(requisition_id=job.id)
+        db.session.commit()
+
+    summary = {"job_id": job.id, "total": total, "updated": len(cv_scores), "rescored_cv": True}
+    _emit(user_id, "rescore_completed", summary)
+    return summary
+
+
+def start_rescore(job_id: int, user_id: Optional[int] = None, rescore_cv: bool = True) -> threading.Thread:
+    """Run rescore_requisition on a background thread with its own app context."""
+    app = current_app._get_current_object()
+
+    def worker():
+        with app.app_context():
+            try:
+                rescore_requisition(job_id, user_id=user_id, rescore_cv=rescore_cv)
+            except Exception as e:
+                db.session.rollback()
+                logger.error(f"Re-scoring requisition {job_id} failed: {e}", exc_info=True)
+                _emit(user_id, "rescore_failed", {"job_id": job_id, "error": str(e)})
+            finally:
+                db.session.remove()
+
+    thread = threading.Thread(target=worker, name=f"rescore-job-{job_id}", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,444 @@
+# app/services/rollups.py
+"""
+Daily analytics rollups for applications, assessment results and interviews.
+
+Each source row contributes +1 (and its score band / score sum) to one row
+of a daily rollup table keyed by its created day and dimensions:
+
+    application_daily_rollups   day, requisition_id, status
+    assessment_daily_rollups    day, requisition_id, recommendation
+    interview_daily_rollups     day, status, interview_type  (created / scheduled day)
+
+Rollups are kept current from the ORM: `before_flush` reads the old values
+of changed or deleted rows, `after_flush` adds the new ones, and the net
+deltas are upserted inside the same transaction, so they commit or roll back
+with the change itself. Bulk UPDATEs bypass the ORM; their callers rebuild
+the affected requisition with `rebuild_rollups(requisition_id=...)`.
+`flask rebuild-rollups` backfills everything (or a day range).
+
+Analytics endpoints then aggregate O(days) rollup rows instead of scanning
+the source tables. Until a full rebuild has recorded a RollupBackfill row for
+a table, its rows only hold the deltas flushed since deploy; `rollup_view`
+then substitutes the rebuild query over the source table, so reads are
+correct (if slower) before the backfill has run.
+"""
+import logging
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, case, delete, event, func, inspect, insert, literal, select, union_all
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models import (
+    Application, ApplicationDailyRollup, AssessmentDailyRollup, AssessmentResult,
+    Interview, InterviewDailyRollup, RollupBackfill,
+)
+
+logger = logging.getLogger(__name__)
+
+# Inclusive bounds, as used by the admin analytics score distributions
+SCORE_BANDS = (("0-20", 0, 20), ("21-40", 21, 40), ("41-60", 41, 60), ("61-80", 61, 80), ("81-100", 81, 100))
+PASS_PERCENTAGE = 50
+
+# Source columns whose change moves a row between rollup buckets
+_TRACKED = {
+    Application: ("created_at", "requisition_id", "status", "cv_score"),
+    AssessmentResult: ("created_at", "application_id", "recommendation", "percentage_score"),
+    Interview: ("created_at", "scheduled_time", "status", "interview_type"),
+}
+_KEYS = {
+    ApplicationDailyRollup: ("day", "requisition_id", "status"),
+    AssessmentDailyRollup: ("day", "requisition_id", "recommendation"),
+    InterviewDailyRollup: ("day", "status", "interview_type"),
+}
+
+
+def band_column(prefix: str, label: str) -> str:
+    """Rollup column of a score band, e.g. ("cv", "21-40") -> "cv_21_40"."""
+    return f"{prefix}_{label.replace('-', '_')}"
+
+
+def _band(score) -> Optional[str]:
+    if score is None:
+        return None
+    for label, low, high in SCORE_BANDS:
+        if low <= score <= high:
+            return label
+    return None
+
+
+def _day(value) -> Optional[date]:
+    return value.date() if isinstance(value, datetime) else value
+
+
+# ----------------------------
+# Contributions
+# ----------------------------
+def _contributions(model, values: Dict[str, Any]) -> List[Tuple[Any, Tuple, Dict[str, float]]]:
+    """(rollup model, key, column increments) a source row with `values` adds to the rollups."""
+    if model is Application:
+        day = _day(values["created_at"])
+        if day is None:
+            return []
+        columns = {"applications": 1}
+        band = _band(values["cv_score"])
+        if band:
+            columns[band_column("cv", band)] = 1
+        key = (day, values["requisition_id"] or 0, values["status"] or "")
+        return [(ApplicationDailyRollup, key, columns)]
+
+    if model is AssessmentResult:
+        day = _day(values["created_at"])
+        if day is None:
+            return []
+        percentage = values["percentage_score"]
+        columns = {"assessments": 1}
+        if percentage is not None:
+            columns.update(scored=1, percentage_sum=percentage)
+            if percentage >= PASS_PERCENTAGE:
+                columns["passed"] = 1
+        band = _band(percentage)
+        if band:
+            columns[band_column("pct", band)] = 1
+        key = (day, values["requisition_id"] or 0, values["recommendation"] or "")
+        return [(AssessmentDailyRollup, key, columns)]
+
+    rows = []
+    dimensions = (values["status"] or "", values["interview_type"] or "")
+    for column, attr in (("created", "created_at"), ("scheduled", "scheduled_time")):
+        day = _day(values[attr])
+        if day is not None:
+            rows.append((InterviewDailyRollup, (day,) + dimensions, {column: 1}))
+    return rows
+
+
+def _add(deltas, model, values, sign: int):
+    for rollup, key, columns in _contributions(model, values):
+        bucket = deltas[rollup][key]
+        for column, amount in columns.items():
+            bucket[column] += sign * amount
+
+
+def _stored_values(session, model, ids: Sequence[int]) -> Dict[int, Dict[str, Any]]:
+    """Committed values of the tracked columns (plus requisition_id for assessments) by id."""
+    columns = [getattr(model, name) for name in _TRACKED[model]]
+    query = select(model.id, *columns)
+    if model is AssessmentResult:
+        query = select(model.id, *columns, Application.requisition_id) \
+            .outerjoin(Application, Application.id == AssessmentResult.application_id)
+    rows = session.execute(query.where(model.id.in_(ids))).mappings().all()
+    return {row["id"]: dict(row) for row in rows}
+
+
+# ----------------------------
+# ORM hooks
+# ----------------------------
+_PENDING_KEY = "rollup_pending"
+
+
+def _collect_old_values(session, flush_context, instances):
+    """Subtract the stored contribution of rows about to change or be deleted."""
+    deltas = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
+    changed = []
+    moved_results = set()
+    with session.no_autoflush:
+        stale_ids = defaultdict(set)
+        moved_applications = []
+        for obj in list(session.dirty) + list(session.deleted):
+            model = type(obj)
+            if model not in _TRACKED:
+                continue
+            state = inspect(obj)
+            if not state.identity:
+                continue
+            if obj in session.deleted or any(state.attrs[name].history.has_changes() for name in _TRACKED[model]):
+                stale_ids[model].add(state.identity[0])
+                if obj not in session.deleted:
+                    changed.append(obj)
+            if model is Application and obj not in session.deleted and state.attrs.requisition_id.history.has_changes():
+                moved_applications.append(state.identity[0])
+
+        if moved_applications:
+            # Assessment rollups are keyed by their application's requisition
+            moved_results = set(session.execute(
+                select(AssessmentResult.id).where(AssessmentResult.application_id.in_(moved_applications))
+            ).scalars()) - stale_ids[AssessmentResult]
+            stale_ids[AssessmentResult] |= moved_results
+
+        for model, ids in stale_ids.items():
+            if ids:
+                for values in _stored_values(session, model, list(ids)).values():
+                    _add(deltas, model, values, -1)
+
+    changed.extend(obj for obj in session.new if type(obj) in _TRACKED)
+    session.info[_PENDING_KEY] = (deltas, changed, moved_results)
+
+
+def _apply_deltas(session, flush_context):
+    """Add the new contribution of inserted / updated rows and upsert the net deltas."""
+    deltas, changed, moved_results = session.info.pop(_PENDING_KEY, (None, None, None))
+    if deltas is None:
+        return
+
+    if moved_results:
+        with session.no_autoflush:
+            for values in _stored_values(session, AssessmentResult, list(moved_results)).values():
+                _add(deltas, AssessmentResult, values, +1)
+
+    requisitions = {}
+    application_ids = {obj.application_id for obj in changed if isinstance(obj, AssessmentResult)}
+    if application_ids:
+        requisitions = dict(session.connection().execute(
+            select(Application.id, Application.requisition_id).where(Application.id.in_(application_ids))
+        ).all())
+
+    for obj in changed:
+        model = type(obj)
+        values = {name: getattr(obj, name) for name in _TRACKED[model]}
+        if model is AssessmentResult:
+            values["requisition_id"] = requisitions.get(obj.application_id)
+        _add(deltas, model, values, +1)
+
+    for rollup, buckets in deltas.items():
+        rows = [(key, columns) for key, columns in buckets.items() if any(columns.values())]
+        if rows:
+            _upsert(session.connection(), rollup, rows)
+
+
+def _upsert(connection, rollup, rows: List[Tuple[Tuple, Dict[str, float]]]):
+    """Increment rollup rows, inserting the ones that do not exist yet."""
+    if connection.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert as dialect_insert
+    elif connection.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert as dialect_insert
+    else:
+        raise RuntimeError(f"Rollups need ON CONFLICT support; {connection.dialect.name} is not supported")
+
+    table = rollup.__table__
+    keys = _KEYS[rollup]
+    value_columns = sorted({column for _, columns in rows for column in columns})
+    stmt = dialect_insert(table)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={column: table.c[column] + stmt.excluded[column] for column in value_columns},
+    )
+    connection.execute(stmt, [
+        {**dict(zip(keys, key)), **{column: columns.get(column, 0) for column in value_columns}}
+        for key, columns in rows
+    ])
+
+
+_HOOKS = (
+    ("before_flush", _collect_old_values),
+    ("after_flush", _apply_deltas),
+)
+
+
+def register_rollup_hooks(session=db.session):
+    """Keep the daily rollup tables in step with rows flushed through `session`."""
+    for name, fn in _HOOKS:
+        if not event.contains(session, name, fn):
+            event.listen(session, name, fn)
+
+
+# ----------------------------
+# Backfill / rebuild
+# ----------------------------
+def _band_sums(column, prefix: str):
+    return [
+        func.sum(case((and_(column >= low, column <= high), 1), else_=0)).label(band_column(prefix, label))
+        for label, low, high in SCORE_BANDS
+    ]
+
+
+def _date_range(column, start: Optional[date], end: Optional[date]):
+    conditions = [column.isnot(None)]
+    if start:
+        conditions.append(column >= datetime.combine(start, datetime.min.time()))
+    if end:
+        conditions.append(column < datetime.combine(end + timedelta(days=1), datetime.min.time()))
+    return conditions
+
+
+def _rollup_range(rollup, start: Optional[date], end: Optional[date]):
+    conditions = []
+    if start:
+        conditions.append(rollup.day >= start)
+    if end:
+        conditions.append(rollup.day <= end)
+    return conditions
+
+
+def _rebuild(rollup, source, rollup_filters) -> int:
+    db.session.execute(delete(rollup).where(*rollup_filters))
+    columns = [column.name for column in source.selected_columns]
+    result = db.session.execute(insert(rollup).from_select(columns, source))
+    return result.rowcount
+
+
+def _sources(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    requisition_id: Optional[int] = None,
+) -> Dict[Any, Tuple[Any, List]]:
+    """
+    {rollup: (SELECT over the source table producing its rows, filters on the
+    rollup covering the same rows)}. Interview rollups have no requisition and
+    are left out when `requisition_id` is given.
+    """
+    day = func.date(Application.created_at)
+    applications = (
+        select(
+            day.label("day"),
+            func.coalesce(Application.requisition_id, 0).label("requisition_id"),
+            func.coalesce(Application.status, "").label("status"),
+            func.count().label("applications"),
+            *_band_sums(Application.cv_score, "cv"),
+        )
+        .where(*_date_range(Application.created_at, start, end))
+        .group_by(day, func.coalesce(Application.requisition_id, 0), func.coalesce(Application.status, ""))
+    )
+    application_filters = _rollup_range(ApplicationDailyRollup, start, end)
+
+    day = func.date(AssessmentResult.created_at)
+    percentage = AssessmentResult.percentage_score
+    assessments = (
+        select(
+            day.label("day"),
+            func.coalesce(Application.requisition_id, 0).label("requisition_id"),
+            func.coalesce(AssessmentResult.recommendation, "").label("recommendation"),
+            func.count().label("assessments"),
+            func.sum(case((percentage >= PASS_PERCENTAGE, 1), else_=0)).label("passed"),
+            func.count(percentage).label("scored"),
+            func.coalesce(func.sum(percentage), 0).label("percentage_sum"),
+            *_band_sums(percentage, "pct"),
+        )
+        .outerjoin(Application, Application.id == AssessmentResult.application_id)
+        .where(*_date_range(AssessmentResult.created_at, start, end))
+        .group_by(
+            day, func.coalesce(Application.requisition_id, 0), func.coalesce(AssessmentResult.recommendation, "")
+        )
+    )
+    assessment_filters = _rollup_range(AssessmentDailyRollup, start, end)
+
+    if requisition_id is not None:
+        applications = applications.where(Application.requisition_id == requisition_id)
+        application_filters.append(ApplicationDailyRollup.requisition_id == requisition_id)
+        assessments = assessments.where(Application.requisition_id == requisition_id)
+        assessment_filters.append(AssessmentDailyRollup.requisition_id == requisition_id)
+
+    sources = {
+        ApplicationDailyRollup: (applications, application_filters),
+        AssessmentDailyRollup: (assessments, assessment_filters),
+    }
+
+    if requisition_id is None:
+        # Each interview counts once on its created day and once on its scheduled day
+        dimensions = (
+            func.coalesce(Interview.status, "").label("status"),
+            func.coalesce(Interview.interview_type, "").label("interview_type"),
+        )
+        events = union_all(
+            select(func.date(Interview.created_at).label("day"), *dimensions,
+                   literal(1).label("created"), literal(0).label("scheduled"))
+            .where(*_date_range(Interview.created_at, start, end)),
+            select(func.date(Interview.scheduled_time).label("day"), *dimensions,
+                   literal(0).label("created"), literal(1).label("scheduled"))
+            .where(*_date_range(Interview.scheduled_time, start, end)),
+        ).subquery()
+        interviews = select(
+            events.c.day, events.c.status, events.c.interview_type,
+            func.sum(events.c.created).label("created"),
+            func.sum(events.c.scheduled).label("scheduled"),
+        ).group_by(events.c.day, events.c.status, events.c.interview_type)
+        sources[InterviewDailyRollup] = (interviews, _rollup_range(InterviewDailyRollup, start, end))
+
+    return sources
+
+
+_NAMES = {ApplicationDailyRollup: "applications", AssessmentDailyRollup: "assessments", InterviewDailyRollup: "interviews"}
+
+
+def rebuild_rollups(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    requisition_id: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    Recompute rollup rows from the source tables with one INSERT ... SELECT
+    per table (caller commits). Limit to days `start`..`end` and/or one
+    requisition; interview rollups have no requisition and are skipped then.
+    A rebuild of everything also marks the tables as backfilled.
+    Returns the number of rollup rows written per table.
+    """
+    written = {
+        _NAMES[rollup]: _rebuild(rollup, source, filters)
+        for rollup, (source, filters) in _sources(start, end, requisition_id).items()
+    }
+    if start is None and end is None and requisition_id is None:
+        for rollup in _NAMES:
+            db.session.merge(RollupBackfill(rollup=rollup.__tablename__, completed_at=datetime.utcnow()))
+    return written
+
+
+# Tables known to be backfilled in this process (the flag is never cleared)
+_backfilled = set()
+
+
+def is_backfilled(rollup) -> bool:
+    if rollup not in _backfilled and db.session.get(RollupBackfill, rollup.__tablename__) is not None:
+        _backfilled.add(rollup)
+    return rollup in _backfilled
+
+
+def rollup_view(rollup):
+    """
+    `rollup` itself once it has been backfilled, otherwise an alias of it
+    over the rebuild query on the source table, with the same columns. Build
+    filters and joins against the returned entity.
+    """
+    if is_backfilled(rollup):
+        return rollup
+    source, _ = _sources()[rollup]
+    return aliased(rollup, source.subquery(), adapt_on_names=True)
+
+
+# ----------------------------
+# Reads
+# ----------------------------
+def rollup_totals(rollup, group_by: Iterable[str] = (), columns: Iterable[str] = (),
+                  filters: Iterable = ()) -> List[Dict[str, Any]]:
+    """SUM of `columns` over rollup rows matching `filters`, grouped by `group_by` columns."""
+    group_by = [getattr(rollup, name) for name in group_by]
+    sums = [func.coalesce(func.sum(getattr(rollup, name)), 0).label(name) for name in columns]
+    query = select(*group_by, *sums).where(*filters)
+    if group_by:
+        query = query.group_by(*group_by).order_by(*group_by)
+    return [dict(row) for row in db.session.execute(query).mappings()]
+
+
+def by_month(rows: Iterable[Dict[str, Any]], columns: Sequence[str]) -> List[Dict[str, Any]]:
+    """Fold per-day totals into "%Y-%m" months, in order."""
+    months: Dict[str, Dict[str, Any]] = {}
+    for row in rows:
+        day = row["day"]
+        if isinstance(day, str):
+            day = date.fromisoformat(day)
+        month = months.setdefault(day.strftime("%Y-%m"), {column: 0 for column in columns})
+        for column in columns:
+            month[column] += row[column] or 0
+    return [{"month": month, **totals} for month, totals in sorted(months.items())]
+
+
+def band_distribution(totals: Dict[str, Any], prefix: str) -> List[Dict[str, Any]]:
+    """[{"range": "0-20", "count": n}, ...] from summed band columns."""
+    return [
+        {"range": label, "count": int(totals.get(band_column(prefix, label)) or 0)}
+        for label, _, _ in SCORE_BANDS
+    ]
+
+
+def band_columns(prefix: str) -> List[str]:
+    return [band_column(prefix, label) for label, _, _ in SCORE_BANDS]
@@ -0,0 +1,243 @@
+# app/services/shortlist_service.py
+"""
+Set-based shortlisting for a requisition.
+
+overall_score is recomputed for every application with one UPDATE (from the
+requisition's `weightings`), and the ranked shortlist is read back with
+`RANK() OVER (ORDER BY overall_score DESC)`, so a requisition with tens of
+thousands of applications costs two statements instead of one query (and
+one commit) per application.
+
+When the Redis leaderboard is enabled (LEADERBOARD_REDIS_URL), scores are
+kept current incrementally and shortlist views read ranks from it instead,
+fetching only the rows of the requested page.
+"""
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, select, update
+
+from app.extensions import db
+from app.models import Application, Candidate, Requisition
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CV_WEIGHT = 60
+DEFAULT_ASSESSMENT_WEIGHT = 40
+
+
+def job_weights(job: Requisition) -> Tuple[float, float]:
+    """(cv, assessment) percentage weights of a requisition, with the defaults filled in."""
+    weightings = job.weightings or {}
+    try:
+        return (
+            float(weightings.get("cv", DEFAULT_CV_WEIGHT)),
+            float(weightings.get("assessment", DEFAULT_ASSESSMENT_WEIGHT)),
+        )
+    except (TypeError, ValueError):
+        logger.warning(f"Invalid weightings on requisition {job.id}: {weightings!r}; using defaults")
+        return float(DEFAULT_CV_WEIGHT), float(DEFAULT_ASSESSMENT_WEIGHT)
+
+
+def overall_score_expression(cv_weight: float, assessment_weight: float):
+    """SQL expression for an application's weighted overall score."""
+    return (
+        func.coalesce(Application.cv_score, 0) * cv_weight / 100
+        + func.coalesce(Application.assessment_score, 0) * assessment_weight / 100
+    )
+
+
+def overall_score_update(requisition_id: int, cv_weight: float, assessment_weight: float):
+    """UPDATE of a requisition's overall_scores that skips rows already current."""
+    overall = overall_score_expression(cv_weight, assessment_weight)
+    return (
+        update(Application)
+        .where(Application.requisition_id == requisition_id)
+        .where(Application.overall_score.is_distinct_from(overall))
+        .values(overall_score=overall)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def refresh_overall_scores(requisition_id: int, cv_weight: float, assessment_weight: float) -> int:
+    """
+    Recompute overall_score for every application of a requisition in one
+    UPDATE (caller commits). Rows whose score is already current are not
+    rewritten, and the requisition's leaderboard is rebuilt after commit if
+    any changed. Returns the number of rows changed.
+    """
+    from app.services.leaderboard import mark_stale
+
+    result = db.session.execute(overall_score_update(requisition_id, cv_weight, assessment_weight))
+    if result.rowcount:
+        mark_stale(requisition_id)
+    return result.rowcount
+
+
+def ranked_applications(
+    requisition_id: int,
+    top_k: Optional[int] = None,
+    page: int = 1,
+    per_page: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Applications of a requisition ranked by overall_score (ties share a rank,
+    as with RANK()). `top_k` keeps ranks 1..top_k; `page` / `per_page` page
+    through what remains. Returns (rows, total rows before paging).
+    """
+    ranked = (
+        select(
+            Application.id.label("application_id"),
+            Application.candidate_id,
+            Candidate.full_name,
+            Application.cv_score,
+            Application.assessment_score,
+            Application.overall_score,
+            Application.status,
+            func.rank().over(order_by=Application.overall_score.desc()).label("rank"),
+        )
+        .outerjoin(Candidate, Candidate.id == Application.candidate_id)
+        .where(Application.requisition_id == requisition_id)
+        .subquery()
+    )
+
+    query = select(ranked, func.count().over().label("total"))
+    if top_k:
+        query = query.where(ranked.c.rank <= top_k)
+    query = query.order_by(ranked.c.rank, ranked.c.application_id)
+    if per_page:
+        query = query.limit(per_page).offset((max(page, 1) - 1) * per_page)
+
+    rows = db.session.execute(query).mappings().all()
+    total = rows[0]["total"] if rows else 0
+    if not rows and per_page and page > 1:
+        # Past the last page: the window count is empty, so count separately
+        total = db.session.execute(
+            select(func.count()).select_from(ranked).where(ranked.c.rank <= top_k) if top_k
+            else select(func.count()).select_from(ranked)
+        ).scalar()
+
+    return [_shortlist_row(row, row["rank"]) for row in rows], total
+
+
+def _shortlist_row(row, rank: int) -> Dict[str, Any]:
+    return {
+        "application_id": row["application_id"],
+        "candidate_id": row["candidate_id"],
+        "full_name": row["full_name"],
+        "cv_score": row["cv_score"] or 0,
+        "assessment_score": row["assessment_score"] or 0,
+        "overall_score": row["overall_score"] or 0,
+        "status": row["status"],
+        "rank": rank,
+    }
+
+
+def leaderboard_applications(
+    requisition_id: int,
+    top_k: Optional[int] = None,
+    page: int = 1,
+    per_page: Optional[int] = None,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Same result as `ranked_applications`, with ranks read from the Redis
+    leaderboard and only the page's rows loaded from the database.
+    Raises LeaderboardUnavailable when Redis cannot be used.
+    """
+    from app.services.leaderboard import leaderboard
+
+    offset = (max(page, 1) - 1) * per_page if per_page else 0
+    ranked, total = leaderboard.page(requisition_id, offset=offset, count=per_page, top_k=top_k)
+    if not ranked:
+        return [], total
+
+    ids = [application_id for application_id, _, _ in ranked]
+    rows = {
+        row["application_id"]: row
+        for row in db.session.execute(
+            select(
+                Application.id.label("application_id"),
+                Application.candidate_id,
+                Candidate.full_name,
+                Application.cv_score,
+                Application.assessment_score,
+                Application.overall_score,
+                Application.status,
+            )
+            .outerjoin(Candidate, Candidate.id == Application.candidate_id)
+            .where(Application.id.in_(ids))
+        ).mappings()
+    }
+    return [
+        _shortlist_row(rows[application_id], rank)
+        for application_id, _, rank in ranked
+        if application_id in rows
+    ], total
+
+
+def application_rank(requisition_id: int, application_id: int) -> Optional[Dict[str, Any]]:
+    """Rank of one application within its requisition ({"rank", "overall_score", "total"})."""
+    from app.services.leaderboard import leaderboard, LeaderboardUnavailable
+
+    if leaderboard.enabled:
+        try:
+            found = leaderboard.rank(requisition_id, application_id)
+            if found is None:
+                return None
+            rank, score, total = found
+            return {"application_id": application_id, "rank": rank, "overall_score": score, "total": total}
+        except LeaderboardUnavailable:
+            pass
+
+    score = db.session.execute(
+        select(Application.overall_score)
+        .where(Application.id == application_id, Application.requisition_id == requisition_id)
+    ).first()
+    if score is None:
+        return None
+    score = score[0] or 0
+    higher, total = db.session.execute(
+        select(
+            func.count().filter(func.coalesce(Application.overall_score, 0) > score),
+            func.count(),
+        ).where(Application.requisition_id == requisition_id)
+    ).one()
+    return {"application_id": application_id, "rank": higher + 1, "overall_score": score, "total": total}
+
+
+def shortlist(
+    job: Requisition,
+    top_k: Optional[int] = None,
+    page: int = 1,
+    per_page: Optional[int] = None,
+    cv_weight: Optional[float] = None,
+    assessment_weight: Optional[float] = None,
+    refresh: bool = False,
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Ranked shortlist of a requisition (see `ranked_applications`).
+
+    With the leaderboard enabled, scores are kept current by the ORM hooks
+    (and recomputed once whenever a set is rebuilt, for rows that predate
+    them) and are read from it; `refresh` (or explicit weights) first
+    recomputes every overall_score in bulk. Without it, scores are always refreshed from the
+    requisition's weightings (or the given weights) and ranked in SQL.
+    """
+    from app.services.leaderboard import leaderboard, LeaderboardUnavailable
+
+    weights_given = cv_weight is not None or assessment_weight is not None
+    if refresh or weights_given or not leaderboard.enabled:
+        default_cv, default_assessment = job_weights(job)
+        refresh_overall_scores(
+            job.id,
+            default_cv if cv_weight is None else cv_weight,
+            default_assessment if assessment_weight is None else assessment_weight,
+        )
+        db.session.commit()
+
+    if leaderboard.enabled:
+        try:
+            return leaderboard_applications(job.id, top_k=top_k, page=page, per_page=per_page)
+        except LeaderboardUnavailable:
+            pass
+    return ranked_applications(job.id, top_k=top_k, page=page, per_page=per_page)
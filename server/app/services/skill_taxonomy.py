@@ -0,0 +1,281 @@
+# app/services/skill_taxonomy.py
+"""
+Skill taxonomy and single-pass skill extraction.
+
+The taxonomy (app/data/skill_taxonomy.json, or SKILL_TAXONOMY_PATH) maps each
+canonical skill to its aliases, e.g. "JavaScript" <- "js", "ecmascript". All
+names are compiled once into an Aho-Corasick automaton, so extracting every
+known skill from a CV is one linear scan of the text regardless of how many
+skills the taxonomy holds.
+
+Matches must sit on word boundaries ("Java" does not match inside
+"JavaScript", "C" does not match inside "C++"); where they overlap, the
+longest leftmost match wins ("Spring Boot" over "Spring"). Aliases written
+as "=Go" only match with that exact case, for names that are also common
+words, and not when joined to the next or previous word by "-", "&" or an
+apostrophe ("Go-to-market", "R&D", "C-suite").
+"""
+import os
+import re
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TAXONOMY_PATH = Path(__file__).resolve().parent.parent / "data" / "skill_taxonomy.json"
+SKILL_TAXONOMY_PATH = os.environ.get("SKILL_TAXONOMY_PATH", str(DEFAULT_TAXONOMY_PATH))
+
+CASE_SENSITIVE_PREFIX = "="
+# Taxonomy category holding spoken languages rather than skills
+LANGUAGES_CATEGORY = "Languages"
+# Characters that continue a token; "+" and "#" keep "C" out of "C++" / "C#"
+_WORD_CHARS = frozenset("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_+#")
+# Characters that join an exact-case name into a larger phrase ("Go-to-market", "R&D")
+_EXACT_JOINERS = frozenset("-&'\u2019")
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def _normalize(text: str) -> str:
+    return _WHITESPACE_RE.sub(" ", text or "").strip()
+
+
+def _lower(text: str) -> str:
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        return lowered
+    # A few characters (e.g. "İ") grow when lowercased; keep offsets aligned
+    return "".join(ch.lower() if len(ch.lower()) == 1 else ch for ch in text)
+
+
+class SkillTaxonomy:
+    """
+    Compiled matcher over a {category: {canonical: [aliases]}} dictionary.
+    Build once (see `get_skill_taxonomy`) and share; matching is thread-safe.
+    """
+
+    def __init__(self, entries: Dict[str, Dict[str, List[str]]], version: str = ""):
+        self.version = version
+        self.skills: List[str] = []
+        self.categories: Dict[str, str] = {}
+        self._lookup: Dict[str, int] = {}
+
+        # Automaton: goto tables, failure links, and per-state outputs of
+        # (pattern length, skill index, exact-case form or None)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[Tuple[int, int, Optional[str]]]] = [[]]
+
+        for category, skills in entries.items():
+            for canonical, aliases in skills.items():
+                self._add_skill(category, canonical, aliases or [])
+        self._build_failure_links()
+
+    # ----------------------------
+    # Compilation
+    # ----------------------------
+    def _add_skill(self, category: str, canonical: str, aliases: Iterable[str]):
+        index = self._lookup.get(canonical.lower())
+        if index is None:
+            index = len(self.skills)
+            self.skills.append(canonical)
+            self.categories[canonical] = category
+
+        aliases = list(aliases)
+        # An exact-case alias of the canonical name replaces its case-insensitive form
+        names = [] if CASE_SENSITIVE_PREFIX + canonical in aliases else [canonical]
+        seen = set()
+        for name in names + aliases:
+            exact = name.startswith(CASE_SENSITIVE_PREFIX)
+            pattern = _normalize(name[1:] if exact else name)
+            if not pattern or (pattern, exact) in seen:
+                continue
+            seen.add((pattern, exact))
+            self._lookup.setdefault(pattern.lower(), index)
+            self._add_pattern(pattern, index, pattern if exact else None)
+
+    def _add_pattern(self, pattern: str, index: int, exact: Optional[str]):
+        state = 0
+        for ch in _lower(pattern):
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(pattern), index, exact))
+
+    def _build_failure_links(self):
+        # Breadth-first, so a state's failure target is always finished first
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, nxt in self._goto[state].items():
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                # Inherit the outputs of the longest proper suffix that is a pattern
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                queue.append(nxt)
+
+    # ----------------------------
+    # Matching
+    # ----------------------------
+    def _matches(self, text: str) -> List[Tuple[int, int, int]]:
+        """(start, end, skill index) for every boundary-respecting match, longest leftmost first."""
+        text = _normalize(text)
+        lowered = _lower(text)
+        goto, fail, out = self._goto, self._fail, self._out
+        length = len(text)
+        found = []
+
+        state = 0
+        for end, ch in enumerate(lowered, 1):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if not out[state]:
+                continue
+            # Every pattern ending here shares its last character
+            if end < length and text[end] in _WORD_CHARS and lowered[end - 1] in _WORD_CHARS:
+                continue
+            for size, index, exact in out[state]:
+                start = end - size
+                if start and text[start - 1] in _WORD_CHARS and lowered[start] in _WORD_CHARS:
+                    continue
+                if exact is not None and (
+                    text[start:end] != exact
+                    or (start and text[start - 1] in _EXACT_JOINERS)
+                    or (end < length and text[end] in _EXACT_JOINERS)
+                ):
+                    continue
+                found.append((start, end, index))
+
+        # Longest leftmost, non-overlapping
+        found.sort(key=lambda match: (match[0], match[0] - match[1]))
+        selected, covered = [], 0
+        for start, end, index in found:
+            if start >= covered:
+                selected.append((start, end, index))
+                covered = end
+        return selected
+
+    def extract(self, text: str) -> List[str]:
+        """Canonical skills mentioned in `text`, in order of first mention."""
+        skills, seen = [], set()
+        for _, _, index in self._matches(text):
+            if index not in seen:
+                seen.add(index)
+                skills.append(self.skills[index])
+        return skills
+
+    def count(self, text: str) -> Dict[str, int]:
+        """Mentions per canonical skill."""
+        counts: Dict[str, int] = {}
+        for _, _, index in self._matches(text):
+            skill = self.skills[index]
+            counts[skill] = counts.get(skill, 0) + 1
+        return counts
+
+    def normalize(self, name: str) -> str:
+        """Canonical form of a single skill name; unknown names are returned trimmed."""
+        name = _normalize(name)
+        index = self._lookup.get(name.lower())
+        return self.skills[index] if index is not None else name
+
+    def normalize_many(self, names: Iterable[str]) -> List[str]:
+        """Canonical, de-duplicated forms of free-form skill names (e.g. Candidate.skills)."""
+        result, seen = [], set()
+        for name in names or []:
+            if not isinstance(name, str) or not name.strip():
+                continue
+            skill = self.normalize(name)
+            if skill.lower() not in seen:
+                seen.add(skill.lower())
+                result.append(skill)
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "skills": len(self.skills),
+            "names": len(self._lookup),
+            "states": len(self._goto),
+        }
+
+    def __len__(self):
+        return len(self.skills)
+
+
+# ----------------------------
+# Loading
+# ----------------------------
+_lock = threading.Lock()
+_taxonomies: Dict[str, SkillTaxonomy] = {}
+
+
+def load_taxonomies(path: str = SKILL_TAXONOMY_PATH) -> Dict[str, SkillTaxonomy]:
+    """Compile the "skills" and "degrees" sections of a taxonomy file."""
+    with open(path, "rb") as f:
+        raw = f.read()
+    data = json.loads(raw)
+    version = "{}:{}".format(data.get("version", 0), hashlib.blake2b(raw, digest_size=8).hexdigest())
+    taxonomies = {
+        section: SkillTaxonomy(data.get(section) or {}, version=version)
+        for section in ("skills", "degrees")
+    }
+    logger.info(
+        "Skill taxonomy loaded from %s: %s", path,
+        {section: taxonomy.stats() for section, taxonomy in taxonomies.items()},
+    )
+    return taxonomies
+
+
+def _get(section: str) -> SkillTaxonomy:
+    if not _taxonomies:
+        with _lock:
+            if not _taxonomies:
+                _taxonomies.update(load_taxonomies())
+    return _taxonomies[section]
+
+
+def get_skill_taxonomy() -> SkillTaxonomy:
+    """Process-wide compiled skill matcher (compiled on first use)."""
+    return _get("skills")
+
+
+def get_degree_taxonomy() -> SkillTaxonomy:
+    """Process-wide compiled matcher for degree / qualification names."""
+    return _get("degrees")
+
+
+def extract_skills(text: str) -> List[str]:
+    return get_skill_taxonomy().extract(text)
+
+
+def compare_skills(resume_skills: Iterable[str], job_skills: List[str]) -> Dict:
+    """Overlap of canonical skill lists: {"match_score", "matched_skills", "missing_skills"}."""
+    resume_skills = set(resume_skills)
+    matched = [skill for skill in job_skills if skill in resume_skills]
+    missing = [skill for skill in job_skills if skill not in resume_skills]
+    return {
+        "match_score": int(len(matched) / len(job_skills) * 100) if job_skills else 0,
+        "matched_skills": matched,
+        "missing_skills": missing,
+    }
+
+
+def skill_gap(resume_text: str, job_text: str) -> Optional[Dict]:
+    """
+    Taxonomy-based skill overlap between a resume and a job (see `compare_skills`).
+    Returns None when the job text names no known skills.
+    """
+    taxonomy = get_skill_taxonomy()
+    job_skills = taxonomy.extract(job_text)
+    if not job_skills:
+        return None
+    return compare_skills(taxonomy.extract(resume_text), job_skills)
@@ -0,0 +1,202 @@
+# app/services/text_extraction.py
+"""
+Single entry point for CV text extraction.
+
+Uploads are read in place from their stream (no temp files) and handed to
+the fastest backend per format: PyMuPDF for PDF (pdfplumber only if PyMuPDF
+is missing), python-docx for DOCX, plain decode for TXT. Byte and page limits
+cap memory; `iter_text` yields text page by page for very large documents.
+
+Results are cached by BLAKE2 hash of the file bytes, so re-uploads of the same
+CV (enrollment, resume uploads on applications) skip extraction entirely.
+"""
+import io
+import os
+import hashlib
+import logging
+from typing import Any, Dict, Iterator, Optional
+
+from app.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+CV_MAX_BYTES = int(os.environ.get("CV_MAX_BYTES", 10 * 1024 * 1024))
+CV_MAX_PAGES = int(os.environ.get("CV_MAX_PAGES", 50))
+TEXT_CACHE_MAX_ENTRIES = int(os.environ.get("TEXT_CACHE_MAX_ENTRIES", 1024))
+TEXT_CACHE_MAX_BYTES = int(os.environ.get("TEXT_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+
+PDF = "pdf"
+DOCX = "docx"
+TXT = "txt"
+SUPPORTED_FORMATS = (PDF, DOCX, TXT)
+
+
+class ExtractionLimitError(ValueError):
+    """Raised when an upload exceeds CV_MAX_BYTES."""
+
+
+class UnsupportedFormatError(ValueError):
+    """Raised for formats no backend can read."""
+
+
+# ----------------------------
+# Input handling
+# ----------------------------
+def read_upload(file, max_bytes: int = CV_MAX_BYTES) -> bytes:
+    """
+    Read an upload (werkzeug FileStorage, file object or bytes) into memory once,
+    rewinding first so a stream already consumed by e.g. Cloudinary still works.
+    """
+    if isinstance(file, (bytes, bytearray, memoryview)):
+        data = bytes(file)
+    else:
+        stream = getattr(file, "stream", file)
+        if hasattr(stream, "seek"):
+            stream.seek(0)
+        data = stream.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise ExtractionLimitError(f"File exceeds the {max_bytes // (1024 * 1024)}MB extraction limit")
+    return data
+
+
+def detect_format(data: bytes, filename: Optional[str] = None) -> str:
+    """Format from the filename extension, falling back to magic bytes."""
+    name = (filename or "").lower()
+    for fmt in SUPPORTED_FORMATS:
+        if name.endswith("." + fmt):
+            return fmt
+    if data[:5] == b"%PDF-":
+        return PDF
+    if data[:4] == b"PK\x03\x04":
+        return DOCX
+    if name and "." in name:
+        raise UnsupportedFormatError(f"Unsupported CV format: {name.rsplit('.', 1)[-1]}")
+    return TXT
+
+
+# ----------------------------
+# Backends (each yields text in document order)
+# ----------------------------
+def _iter_pdf_pymupdf(data: bytes, max_pages: int) -> Iterator[str]:
+    import fitz
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        for index, page in enumerate(doc):
+            if index >= max_pages:
+                break
+            yield page.get_text()
+
+
+def _iter_pdf_pdfplumber(data: bytes, max_pages: int) -> Iterator[str]:
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages[:max_pages]:
+            yield page.extract_text() or ""
+
+
+def _iter_docx(data: bytes, max_pages: int) -> Iterator[str]:
+    # DOCX has no reliable page boundaries; the page limit does not apply
+    import docx
+    document = docx.Document(io.BytesIO(data))
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+
+
+def _iter_txt(data: bytes, max_pages: int) -> Iterator[str]:
+    yield data.decode("utf-8", errors="ignore")
+
+
+def _pdf_backend():
+    try:
+        import fitz  # noqa: F401
+        return _iter_pdf_pymupdf
+    except ImportError:
+        logger.warning("PyMuPDF not installed; falling back to pdfplumber")
+        return _iter_pdf_pdfplumber
+
+
+BACKENDS = {
+    "pymupdf": _iter_pdf_pymupdf,
+    "pdfplumber": _iter_pdf_pdfplumber,
+    "python-docx": _iter_docx,
+    "text": _iter_txt,
+}
+
+
+def _backend_for(fmt: str):
+    if fmt == PDF:
+        return _pdf_backend()
+    if fmt == DOCX:
+        return _iter_docx
+    return _iter_txt
+
+
+# ----------------------------
+# Extracted-text cache
+# ----------------------------
+# Bounded by entry count and by total UTF-8 size of cached text
+text_cache = LRUCache(
+    maxsize=TEXT_CACHE_MAX_ENTRIES,
+    max_weight=TEXT_CACHE_MAX_BYTES,
+    weigh=lambda document: len(document["text"].encode("utf-8")),
+)
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def _cache_key(digest: str, fmt: str, max_pages: int) -> str:
+    # The page limit changes the output for long PDFs, so it is part of the key
+    return f"{digest}:{fmt}:{max_pages if fmt == PDF else 0}"
+
+
+# ----------------------------
+# Public API
+# ----------------------------
+def iter_text(file, filename: Optional[str] = None,
+              max_bytes: int = CV_MAX_BYTES, max_pages: int = CV_MAX_PAGES) -> Iterator[str]:
+    """
+    Yield extracted text incrementally (one PDF page / DOCX paragraph at a time).
+    A cached document is yielded whole; streamed documents are not cached.
+    """
+    data = read_upload(file, max_bytes)
+    fmt = detect_format(data, filename or getattr(file, "filename", None))
+    cached = text_cache.get(_cache_key(content_hash(data), fmt, max_pages))
+    if cached is not None:
+        yield cached["text"]
+        return
+    yield from _backend_for(fmt)(data, max_pages)
+
+
+def extract_document(file, filename: Optional[str] = None,
+                     max_bytes: int = CV_MAX_BYTES, max_pages: int = CV_MAX_PAGES) -> Dict[str, Any]:
+    """
+    Extract a whole document. Returns {"text", "format", "pages", "bytes",
+    "page_limit_reached", "content_hash"} where `pages` counts PDF pages read
+    (DOCX paragraphs / 1 for TXT). Served from the content-hash cache when possible.
+    """
+    data = read_upload(file, max_bytes)
+    fmt = detect_format(data, filename or getattr(file, "filename", None))
+    digest = content_hash(data)
+    key = _cache_key(digest, fmt, max_pages)
+
+    document = text_cache.get(key)
+    if document is None:
+        parts = list(_backend_for(fmt)(data, max_pages))
+        separator = "\n" if fmt != TXT else ""
+        document = {
+            "text": separator.join(parts).strip(),
+            "format": fmt,
+            "pages": len(parts),
+            "bytes": len(data),
+            "page_limit_reached": fmt == PDF and len(parts) >= max_pages,
+            "content_hash": digest,
+        }
+        text_cache.set(key, document)
+    return dict(document)
+
+
+def extract_text(file, filename: Optional[str] = None,
+                 max_bytes: int = CV_MAX_BYTES, max_pages: int = CV_MAX_PAGES) -> str:
+    """Extracted text of a PDF, DOCX or TXT upload."""
+    return extract_document(file, filename, max_bytes, max_pages)["text"]
@@ -0,0 +1,208 @@
+# app/utils/cache.py
+"""
+Small caching primitives shared by the service layer:
+
+- LRUCache:    thread-safe in-process LRU with optional TTL and size budget
+- RedisCache:  JSON values in Redis with a key prefix and TTL
+- TieredCache: LRU in front of Redis (L1 -> L2), with hit/miss counters per tier
+"""
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class LRUCache:
+    """
+    In-process LRU cache. `ttl` is in seconds (None = no expiry). With
+    `max_weight`, entries are also evicted once the sum of `weigh(value)`
+    (e.g. bytes of text) exceeds the budget.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        max_weight: Optional[int] = None,
+        weigh: Optional[Callable[[Any], int]] = None,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_weight = max_weight
+        self.weigh = weigh or (lambda value: 1)
+        self.weight = 0
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+
+            value, expires_at, weight = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                self.weight -= weight
+                self.misses += 1
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl else None
+        weight = self.weigh(value)
+        if self.max_weight is not None and weight > self.max_weight:
+            return  # would evict everything else and still not fit
+        with self._lock:
+            previous = self._data.pop(key, None)
+            if previous is not None:
+                self.weight -= previous[2]
+            self._data[key] = (value, expires_at, weight)
+            self.weight += weight
+            while len(self._data) > self.maxsize or (
+                self.max_weight is not None and self.weight > self.max_weight
+            ):
+                _, evicted = self._data.popitem(last=False)
+                self.weight -= evicted[2]
+                self.evictions += 1
+
+    def delete(self, key: str):
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self.weight -= entry[2]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.weight = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "weight": self.weight,
+            "max_weight": self.max_weight,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class RedisCache:
+    """JSON-serialised values in Redis. Connection errors are logged and treated as misses."""
+
+    def __init__(self, url: str, prefix: str = "cache:", ttl: Optional[int] = None):
+        import redis
+        self.redis = redis.Redis.from_url(url, decode_responses=True)
+        self.prefix = prefix
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            raw = self.redis.get(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache get failed: {e}")
+            raw = None
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return json.loads(raw)
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None):
+        ttl = self.ttl if ttl is None else ttl
+        try:
+            self.redis.set(self.prefix + key, json.dumps(value), ex=int(ttl) if ttl else None)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache set failed: {e}")
+
+    def delete(self, key: str):
+        try:
+            self.redis.delete(self.prefix + key)
+        except Exception as e:
+            self.errors += 1
+            logger.warning(f"Redis cache delete failed: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class TieredCache:
+    """LRU (L1) in front of an optional Redis (L2). L2 hits are copied into L1."""
+
+    def __init__(self, local: LRUCache, remote: Optional[RedisCache] = None):
+        self.local = local
+        self.remote = remote
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.remote is not None:
+            value = self.remote.get(key, _MISSING)
+            if value is not _MISSING:
+                self.local.set(key, value)
+                return value
+        return default
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        self.local.set(key, value, ttl)
+        if self.remote is not None:
+            self.remote.set(key, value, ttl)
+
+    def delete(self, key: str):
+        self.local.delete(key)
+        if self.remote is not None:
+            self.remote.delete(key)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Any],
+        cacheable: Optional[Callable[[Any], bool]] = None,
+    ) -> Any:
+        """Return the cached value for `key`, computing and storing it on a miss."""
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        if cacheable is None or cacheable(value):
+            self.set(key, value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "local": self.local.stats(),
+            "redis": self.remote.stats() if self.remote is not None else None,
+        }
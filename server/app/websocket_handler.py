@@ -359,6 +359,30 @@ def register_websocket_handlers(app):
             current_app.logger.error(f"❌ Error sending message: {e}")
             emit('error', {'message': f'Failed to send message: {str(e)}'})
     
+    @socketio.on('ai_chat')
+    @socket_auth_required
+    def handle_ai_chat(data: Dict[str, Any]):
+        """Stream an AI assistant reply as ai_chat_delta events, then ai_chat_done"""
+        from app.services.ai_chat_service import stream_chat
+
+        user_id = request.user_id
+        message = (data.get('message') or '').strip()
+        request_id = data.get('request_id')
+        if not message:
+            emit('ai_chat_error', {'request_id': request_id, 'error': 'Message required'})
+            return
+
+        try:
+            for event, payload in stream_chat(message, user_id=user_id):
+                if event == 'delta':
+                    emit('ai_chat_delta', {'request_id': request_id, 'delta': payload})
+                    socketio.sleep(0)  # flush each chunk to the client
+                else:
+                    emit('ai_chat_done', {'request_id': request_id, **payload})
+        except Exception as e:
+            current_app.logger.error(f"❌ AI chat stream failed for user {user_id}: {e}")
+            emit('ai_chat_error', {'request_id': request_id, 'error': 'AI chat failed', 'details': str(e)})
+    
     @socketio.on('mark_read')
     @socket_auth_required
     def handle_mark_read(data: Dict[str, Any]):
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Embedding backend parity check and throughput benchmark
+
+Encodes the same corpus with the PyTorch model (sentence-transformers) and
+the ONNX Runtime export(s), then reports cosine agreement per text against
+the PyTorch vectors and encode throughput per backend and batch size:
+
+    flask export-embedding-onnx                      # once
+    python scripts/benchmark_embedding_backends.py --generate 256
+    python scripts/benchmark_embedding_backends.py path/to/cvs --batch-sizes 8,32
+
+Exits 1 when the minimum cosine agreement of a backend falls below its
+tolerance (--tolerance for fp32, --int8-tolerance for the quantized model),
+so it can gate a deployment that switches EMBEDDING_BACKEND to onnx.
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.model_registry import EMBEDDING_MODEL
+from app.services.onnx_embedding import EMBEDDING_ONNX_DIR, load_onnx_model
+
+WORDS = (
+    "python java react sql docker kubernetes aws azure agile scrum leadership "
+    "analysis reporting finance payroll recruitment customer service sales "
+    "engineering design testing automation machine learning data pipelines "
+    "stakeholders delivered improved managed built led mentored migrated"
+).split()
+
+
+def generate_corpus(count, seed=7):
+    rng = random.Random(seed)
+    # Mix of short (job titles / queries) and long (CV-sized, truncated) texts
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.choice((4, 16, 64, 400))))
+        for _ in range(count)
+    ]
+
+
+def read_corpus(directory):
+    from app.services.text_extraction import extract_text
+
+    corpus = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() in (".pdf", ".docx", ".txt"):
+            corpus.append(extract_text(path.read_bytes(), filename=path.name))
+    return corpus
+
+
+def encode(model, corpus, batch_size):
+    return model.encode(
+        corpus,
+        batch_size=batch_size,
+        convert_to_numpy=True,
+        normalize_embeddings=True,
+        show_progress_bar=False,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", help="Directory of sample CVs (.pdf / .docx / .txt)")
+    parser.add_argument("--generate", type=int, default=0, help="Generate N synthetic texts")
+    parser.add_argument("--batch-sizes", default="1,16,64", help="Comma-separated batch sizes to time")
+    parser.add_argument("--repeat", type=int, default=2, help="Timed runs per batch size")
+    parser.add_argument("--onnx-dir", default=EMBEDDING_ONNX_DIR, help="ONNX export root")
+    parser.add_argument("--tolerance", type=float, default=0.99, help="Minimum cosine for the fp32 ONNX model")
+    parser.add_argument("--int8-tolerance", type=float, default=0.97, help="Minimum cosine for the int8 model")
+    args = parser.parse_args()
+
+    if args.generate:
+        corpus = generate_corpus(args.generate)
+    elif args.corpus:
+        corpus = read_corpus(args.corpus)
+    else:
+        parser.error("pass a corpus directory or --generate N")
+    if not corpus:
+        print("❌ No texts found")
+        return
+    batch_sizes = [int(size) for size in args.batch_sizes.split(",") if size]
+
+    from sentence_transformers import SentenceTransformer
+
+    backends = [("torch", SentenceTransformer(EMBEDDING_MODEL), None)]
+    for quantized, tolerance in ((False, args.tolerance), (True, args.int8_tolerance)):
+        try:
+            model = load_onnx_model(EMBEDDING_MODEL, quantized=quantized, root=args.onnx_dir)
+        except Exception as e:
+            print(f"⚠️  Skipping {'onnx-int8' if quantized else 'onnx'}: {e}")
+            continue
+        backends.append((model.backend, model, tolerance))
+
+    print(f"🧠 {EMBEDDING_MODEL}: {len(corpus)} texts, "
+          f"{sum(len(text) for text in corpus) // len(corpus)} chars/text\n")
+
+    # Parity against the PyTorch vectors (all normalised, so dot = cosine)
+    reference = encode(backends[0][1], corpus, 32)
+    failed = False
+    print(f"{'backend':<12} {'min cos':>8} {'mean cos':>9} {'tolerance':>10}")
+    for name, model, tolerance in backends[1:]:
+        cosine = (encode(model, corpus, 32) * reference).sum(axis=1)
+        ok = cosine.min() >= tolerance
+        failed = failed or not ok
+        print(f"{name:<12} {cosine.min():>8.4f} {cosine.mean():>9.4f} {tolerance:>10.2f} {'✅' if ok else '❌'}")
+
+    print(f"\n{'backend':<12} {'batch':>6} {'texts/sec':>10} {'ms/text':>8}")
+    for name, model, _ in backends:
+        encode(model, corpus[:8], 8)  # warm-up
+        for batch_size in batch_sizes:
+            started = time.perf_counter()
+            for _ in range(args.repeat):
+                encode(model, corpus, batch_size)
+            elapsed = time.perf_counter() - started
+            runs = len(corpus) * args.repeat
+            print(f"{name:<12} {batch_size:>6} {runs / elapsed:>10.1f} {elapsed / runs * 1000:>8.2f}")
+
+    if len(backends) == 1:
+        print("\n⚠️  No ONNX export found; run `flask export-embedding-onnx` first")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
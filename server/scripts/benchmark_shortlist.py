@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Shortlisting benchmark
+
+Seeds one requisition with N applications (each with its own candidate) and
+times the old per-application loop against the set-based shortlist (bulk
+UPDATE + RANK() OVER):
+
+    python scripts/benchmark_shortlist.py                   # 50k, in-memory SQLite
+    python scripts/benchmark_shortlist.py --applications 5000 --top-k 50
+    DATABASE_URL=postgresql://... python scripts/benchmark_shortlist.py --keep
+
+Uses DATABASE_URL when set (tables are created if missing); seeded rows are
+deleted afterwards unless --keep is given.
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import event, insert
+
+from app import create_app
+from app.extensions import db
+from app.models import Application, Candidate, Requisition
+from app.services.shortlist_service import job_weights, shortlist
+
+
+def seed(count, seed_value=7):
+    rng = random.Random(seed_value)
+    job = Requisition(title="Shortlist benchmark", weightings={"cv": 70, "assessment": 30})
+    db.session.add(job)
+    db.session.flush()
+
+    candidate_ids = []
+    for start in range(0, count, 5000):
+        size = min(5000, count - start)
+        rows = [{"full_name": f"Candidate {start + i}"} for i in range(size)]
+        first = db.session.execute(insert(Candidate).returning(Candidate.id), rows).scalars().all()
+        candidate_ids.extend(first)
+
+    db.session.execute(insert(Application), [
+        {
+            "candidate_id": candidate_id,
+            "requisition_id": job.id,
+            "status": "applied",
+            "cv_score": rng.randint(0, 100),
+            "assessment_score": rng.randint(0, 100),
+            "overall_score": 0,
+        }
+        for candidate_id in candidate_ids
+    ])
+    db.session.commit()
+    return job.id, candidate_ids
+
+
+def legacy_shortlist(job):
+    """The previous admin_routes.shortlist_candidates loop (lazy candidate load per row)."""
+    cv_weight, assessment_weight = job_weights(job)
+    shortlisted = []
+    for app in Application.query.filter_by(requisition_id=job.id).all():
+        overall = (app.cv_score or 0) * cv_weight / 100 + (app.assessment_score or 0) * assessment_weight / 100
+        app.overall_score = overall
+        shortlisted.append({
+            "application_id": app.id,
+            "candidate_id": app.candidate_id,
+            "full_name": app.candidate.full_name,
+            "overall_score": overall,
+            "status": app.status,
+        })
+    db.session.commit()
+    return sorted(shortlisted, key=lambda x: x["overall_score"], reverse=True)
+
+
+def timed(label, fn, statements):
+    statements[0] = 0
+    db.session.expire_all()
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"{label:<28} {elapsed * 1000:>10.1f} {statements[0]:>11}")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--applications", type=int, default=50000, help="Applications to seed")
+    parser.add_argument("--top-k", type=int, default=100, help="Top-K for the ranked read")
+    parser.add_argument("--per-page", type=int, default=50, help="Page size for the paged read")
+    parser.add_argument("--skip-legacy", action="store_true", help="Skip the per-application loop")
+    parser.add_argument("--keep", action="store_true", help="Keep the seeded rows")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        statements = [0]
+
+        @event.listens_for(db.engine, "before_cursor_execute")
+        def count_statement(*_):
+            statements[0] += 1
+
+        started = time.perf_counter()
+        job_id, candidate_ids = seed(args.applications)
+        print(f"🌱 Seeded {args.applications} applications in {time.perf_counter() - started:.1f}s "
+              f"({db.engine.dialect.name})\n")
+        job = db.session.get(Requisition, job_id)
+
+        print(f"{'method':<28} {'ms':>10} {'statements':>11}")
+        if not args.skip_legacy:
+            legacy = timed("legacy loop (all rows)", lambda: legacy_shortlist(job), statements)
+        ranked, total = timed("set-based (all rows)", lambda: shortlist(job), statements)
+        timed(f"set-based top {args.top_k}", lambda: shortlist(job, top_k=args.top_k), statements)
+        timed(f"set-based page 3 x {args.per_page}",
+              lambda: shortlist(job, page=3, per_page=args.per_page), statements)
+
+        if not args.skip_legacy:
+            same = [row["overall_score"] for row in legacy] == [row["overall_score"] for row in ranked]
+            print(f"\n{'✅' if same else '❌'} Orderings agree on {total} rows")
+
+        if not args.keep:
+            db.session.query(Application).filter_by(requisition_id=job_id).delete(synchronize_session=False)
+            for start in range(0, len(candidate_ids), 5000):
+                db.session.query(Candidate).filter(
+                    Candidate.id.in_(candidate_ids[start:start + 5000])
+                ).delete(synchronize_session=False)
+            db.session.delete(job)
+            db.session.commit()
+
+
+if __name__ == "__main__":
+    main()
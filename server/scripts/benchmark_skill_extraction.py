@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Skill extraction throughput benchmark
+
+Measures CVs/sec for the compiled skill taxonomy against the naive approach
+of one regex search per skill name:
+
+    python scripts/benchmark_skill_extraction.py --generate 500
+    python scripts/benchmark_skill_extraction.py path/to/cvs --pad 5000
+
+--pad N adds N synthetic skills (with two aliases each) to the taxonomy, to
+show that automaton throughput does not depend on dictionary size while the
+per-skill regex approach degrades linearly.
+"""
+
+import re
+import sys
+import time
+import json
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.skill_taxonomy import SkillTaxonomy, SKILL_TAXONOMY_PATH, CASE_SENSITIVE_PREFIX
+
+FILLER = (
+    "Responsible for delivering features end to end, working closely with product "
+    "owners and stakeholders, mentoring junior engineers and improving reliability."
+).split()
+
+
+def load_entries(path, pad):
+    with open(path) as f:
+        entries = json.load(f)["skills"]
+    if pad:
+        entries = dict(entries)
+        entries["Synthetic"] = {
+            f"Skill{i:05d}": [f"skill-{i:05d}", f"sk {i:05d}"] for i in range(pad)
+        }
+    return entries
+
+
+def generate_corpus(entries, count, words, seed=7):
+    rng = random.Random(seed)
+    names = [
+        name.lstrip(CASE_SENSITIVE_PREFIX)
+        for skills in entries.values()
+        for canonical, aliases in skills.items()
+        for name in [canonical] + aliases
+    ]
+    corpus = []
+    for _ in range(count):
+        tokens = []
+        while len(tokens) < words:
+            tokens.extend(rng.sample(FILLER, 6))
+            tokens.append(rng.choice(names) + ",")
+        corpus.append(" ".join(tokens))
+    return corpus
+
+
+def read_corpus(directory):
+    from app.services.text_extraction import extract_text
+
+    corpus = []
+    for path in sorted(Path(directory).iterdir()):
+        if path.suffix.lower() in (".pdf", ".docx", ".txt"):
+            corpus.append(extract_text(path.read_bytes(), filename=path.name))
+    return corpus
+
+
+def compile_regexes(entries):
+    """Old AIParser.offline_extract approach, generalised to every taxonomy name."""
+    patterns = []
+    for skills in entries.values():
+        for canonical, aliases in skills.items():
+            for name in [canonical] + aliases:
+                exact = name.startswith(CASE_SENSITIVE_PREFIX)
+                name = name.lstrip(CASE_SENSITIVE_PREFIX)
+                flags = 0 if exact else re.I
+                patterns.append((canonical, re.compile(rf"(?<![\w+#]){re.escape(name)}(?![\w+#])", flags)))
+    return patterns
+
+
+def regex_extract(patterns, text):
+    found = []
+    for canonical, pattern in patterns:
+        if canonical not in found and pattern.search(text):
+            found.append(canonical)
+    return found
+
+
+def timed(fn, corpus, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in corpus:
+            fn(text)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", help="Directory of sample CVs (.pdf / .docx / .txt)")
+    parser.add_argument("--generate", type=int, default=0, help="Generate N synthetic CVs")
+    parser.add_argument("--words", type=int, default=700, help="Words per generated CV")
+    parser.add_argument("--pad", type=int, default=0, help="Add N synthetic skills to the taxonomy")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs over the corpus")
+    parser.add_argument("--taxonomy", default=SKILL_TAXONOMY_PATH, help="Taxonomy JSON file")
+    parser.add_argument("--skip-regex", action="store_true", help="Skip the per-skill regex baseline")
+    args = parser.parse_args()
+
+    entries = load_entries(args.taxonomy, args.pad)
+
+    if args.generate:
+        corpus = generate_corpus(entries, args.generate, args.words)
+    elif args.corpus:
+        corpus = read_corpus(args.corpus)
+    else:
+        parser.error("pass a corpus directory or --generate N")
+    if not corpus:
+        print("❌ No CVs found")
+        return
+
+    started = time.perf_counter()
+    taxonomy = SkillTaxonomy(entries)
+    compile_seconds = time.perf_counter() - started
+    stats = taxonomy.stats()
+    total_chars = sum(len(text) for text in corpus)
+
+    print(f"📚 Taxonomy: {stats['skills']} skills, {stats['names']} names, {stats['states']} states "
+          f"(compiled in {compile_seconds * 1000:.0f}ms)")
+    print(f"📄 {len(corpus)} CVs, {total_chars // len(corpus)} chars/CV, {args.repeat} run(s)\n")
+    print(f"{'method':<16} {'CVs/sec':>10} {'ms/CV':>8} {'MB/s':>7} {'skills/CV':>10}")
+
+    methods = [("aho-corasick", taxonomy.extract)]
+    if not args.skip_regex:
+        started = time.perf_counter()
+        patterns = compile_regexes(entries)
+        print(f"   (regex baseline: {len(patterns)} patterns compiled in "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms)")
+        methods.append(("regex-per-skill", lambda text: regex_extract(patterns, text)))
+
+    for name, fn in methods:
+        skills = sum(len(fn(text)) for text in corpus)
+        elapsed = timed(fn, corpus, args.repeat)
+        runs = len(corpus) * args.repeat
+        print(
+            f"{name:<16} {runs / elapsed:>10.1f} {elapsed / runs * 1000:>8.2f} "
+            f"{total_chars * args.repeat / elapsed / 1e6:>7.2f} {skills / len(corpus):>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+CV text extraction benchmark
+
+Compares the extraction backends on a corpus of sample CVs:
+
+    python scripts/benchmark_text_extraction.py path/to/cvs
+    python scripts/benchmark_text_extraction.py --generate 20 --pages 3
+
+With --generate, synthetic PDF and DOCX CVs are written to a temp directory.
+"legacy-tempfile" reproduces the old save-to-temp-file + pdfplumber path.
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.text_extraction import BACKENDS, CV_MAX_PAGES, detect_format, PDF, DOCX
+
+SAMPLE_LINES = [
+    "Jane Doe - Senior Software Engineer",
+    "jane.doe@example.com | +27 82 123 4567 | Johannesburg",
+    "Experience: 7 years building Python, Flask and PostgreSQL services on AWS.",
+    "Led a team of five engineers delivering a recruitment platform with React and Node.",
+    "Education: BSc Computer Science, University of the Witwatersrand.",
+    "Skills: Python, SQL, Docker, Kubernetes, Machine Learning, Flutter, Dart.",
+]
+
+
+def generate_corpus(directory, count, pages):
+    import fitz
+    import docx
+
+    for i in range(count):
+        pdf = fitz.open()
+        for page_no in range(pages):
+            page = pdf.new_page()
+            text = "\n".join(SAMPLE_LINES * 8)
+            page.insert_textbox(fitz.Rect(40, 40, 560, 800), f"CV {i} page {page_no + 1}\n{text}", fontsize=9)
+        pdf.save(os.path.join(directory, f"cv_{i}.pdf"))
+        pdf.close()
+
+        document = docx.Document()
+        for _ in range(pages * 8):
+            for line in SAMPLE_LINES:
+                document.add_paragraph(line)
+        document.save(os.path.join(directory, f"cv_{i}.docx"))
+
+
+def legacy_tempfile(data, filename):
+    """Old AIParser.read_cv_file behaviour: write to a temp file, then parse from disk."""
+    import pdfplumber
+    import docx
+
+    temp_path = os.path.join(tempfile.gettempdir(), os.path.basename(filename))
+    with open(temp_path, "wb") as f:
+        f.write(data)
+    try:
+        if filename.lower().endswith(".pdf"):
+            with pdfplumber.open(temp_path) as pdf:
+                return "\n".join(page.extract_text() or "" for page in pdf.pages)
+        doc = docx.Document(temp_path)
+        return "\n".join(p.text for p in doc.paragraphs)
+    finally:
+        os.remove(temp_path)
+
+
+def run(corpus, repeat):
+    files = sorted(p for p in Path(corpus).iterdir() if p.suffix.lower() in (".pdf", ".docx"))
+    if not files:
+        print(f"❌ No .pdf or .docx files found in {corpus}")
+        return
+
+    documents = [(p.name, p.read_bytes()) for p in files]
+    candidates = {
+        PDF: ["pymupdf", "pdfplumber", "legacy-tempfile"],
+        DOCX: ["python-docx", "legacy-tempfile"],
+    }
+
+    print(f"📄 {len(documents)} documents, {repeat} run(s) each\n")
+    print(f"{'format':<6} {'backend':<16} {'docs':>5} {'ms/doc':>9} {'MB/s':>8} {'chars/doc':>10}")
+
+    for fmt, backends in candidates.items():
+        subset = [(name, data) for name, data in documents if detect_format(data, name) == fmt]
+        if not subset:
+            continue
+        total_bytes = sum(len(data) for _, data in subset)
+
+        for backend in backends:
+            chars = 0
+            started = time.perf_counter()
+            for _ in range(repeat):
+                for name, data in subset:
+                    if backend == "legacy-tempfile":
+                        text = legacy_tempfile(data, name)
+                    else:
+                        text = "\n".join(BACKENDS[backend](data, CV_MAX_PAGES))
+                    chars += len(text)
+            elapsed = time.perf_counter() - started
+
+            runs = len(subset) * repeat
+            print(
+                f"{fmt:<6} {backend:<16} {len(subset):>5} "
+                f"{elapsed / runs * 1000:>9.2f} {total_bytes * repeat / elapsed / 1e6:>8.2f} {chars // runs:>10}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", help="Directory of sample CVs (.pdf / .docx)")
+    parser.add_argument("--generate", type=int, default=0, help="Generate N synthetic PDF + DOCX CVs")
+    parser.add_argument("--pages", type=int, default=2, help="Pages per generated CV")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per document")
+    args = parser.parse_args()
+
+    if args.generate:
+        with tempfile.TemporaryDirectory() as directory:
+            print(f"🔧 Generating {args.generate} sample CVs per format...")
+            generate_corpus(directory, args.generate, args.pages)
+            run(directory, args.repeat)
+    elif args.corpus:
+        run(args.corpus, args.repeat)
+    else:
+        parser.error("pass a corpus directory or --generate N")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Startup import-time profiler
+
+Runs the app import (or create_app()) in a fresh interpreter with
+`python -X importtime` and reports where the time goes:
+
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --target create_app --top 30
+    python scripts/profile_startup.py --budget 1.0      # exit 1 if slower
+
+Heavy optional stacks (spaCy, torch, firebase, Google APIs, ...) should be
+imported lazily on first use; any that appear at startup are flagged.
+"""
+
+import os
+import re
+import sys
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+SERVER_DIR = Path(__file__).parent.parent
+
+TARGETS = {
+    "app": "import app",
+    "create_app": "from app import create_app; create_app()",
+}
+
+# Modules that must not be imported until a request actually needs them
+HEAVY_MODULES = [
+    "spacy", "torch", "sentence_transformers", "transformers", "onnxruntime",
+    "firebase_admin", "googleapiclient.discovery", "google_auth_oauthlib",
+    "pdfplumber", "pymongo", "qrcode", "PIL.Image", "numpy",
+]
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def profile(code, env):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=SERVER_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        print(result.stderr[-2000:])
+        raise SystemExit(f"❌ Startup failed (exit {result.returncode})")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append((name, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return wall, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=sorted(TARGETS), default="create_app", help="What to time")
+    parser.add_argument("--top", type=int, default=20, help="Rows per table")
+    parser.add_argument("--budget", type=float, help="Fail if wall-clock startup exceeds this many seconds")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite://")
+    wall, modules = profile(TARGETS[args.target], env)
+
+    total_us = sum(self_us for _, self_us, _, _ in modules)
+    print(f"⏱️  {args.target}: {wall:.2f}s wall, {total_us / 1e6:.2f}s importing {len(modules)} modules\n")
+
+    # Cumulative time of top-level packages (first-level imports of each root)
+    packages = {}
+    for name, self_us, _, _ in modules:
+        root = name.split(".")[0]
+        packages[root] = packages.get(root, 0) + self_us
+    print(f"{'package':<32} {'ms':>8} {'share':>7}")
+    for root, self_us in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"{root:<32} {self_us / 1000:>8.1f} {self_us / total_us:>7.1%}")
+
+    # Slowest app modules, including everything they pull in
+    app_modules = [m for m in modules if m[0].startswith("app.") or m[0] == "app"]
+    print(f"\n{'app module (cumulative)':<48} {'ms':>8}")
+    for name, _, cumulative_us, _ in sorted(app_modules, key=lambda m: -m[2])[:args.top]:
+        print(f"{name:<48} {cumulative_us / 1000:>8.1f}")
+
+    loaded = {name for name, _, _, _ in modules}
+    eager = [name for name in HEAVY_MODULES if name in loaded]
+    print()
+    if eager:
+        print(f"⚠️  Heavy modules imported at startup: {', '.join(eager)}")
+    else:
+        print("✅ No heavy modules imported at startup")
+
+    if args.budget is not None and wall > args.budget:
+        print(f"❌ Startup took {wall:.2f}s, over the {args.budget:.2f}s budget")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()